@@ -16,3 +16,13 @@ AUDIT_TYPE_PASSWORD_RESET_FAILED = "PASSWORD_RESET_FAILED"
 AUDIT_TYPE_USER_CREATED = "USER_CREATED"
 AUDIT_TYPE_EMAIL_VERIFIED = "EMAIL_VERIFIED"
 AUDIT_TYPE_ORGANISATION_MERGED = "ORGANISATION_MERGED"
+
+# Delivery status of the notifications recorded by NOTIFY audits
+DELIVERY_STATUS_PENDING = "pending"
+DELIVERY_STATUS_UNKNOWN = "unknown"
+DELIVERY_FINAL_STATUSES = (
+    "delivered",
+    "permanent-failure",
+    "temporary-failure",
+    "technical-failure",
+)
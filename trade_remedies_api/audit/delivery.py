@@ -0,0 +1,145 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from dateutil import parser
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from audit import (
+    AUDIT_TYPE_DELIVERED,
+    DELIVERY_FINAL_STATUSES,
+    DELIVERY_STATUS_PENDING,
+    DELIVERY_STATUS_UNKNOWN,
+)
+from audit.models import Audit
+from audit.utils import bulk_audit_log
+from core.notifier import get_client
+
+logger = logging.getLogger(__name__)
+
+# Notifications are created by Notify shortly before their audit record is saved
+CREATED_AT_MARGIN = timedelta(hours=1)
+
+
+class DeliveryStatusReconciler:
+    """
+    Reconcile the delivery status of sent notifications with Notify.
+
+    Rather than querying Notify for every pending notification, email notifications
+    are listed a page at a time, newest first, following an `older_than` cursor until
+    the oldest pending notification is reached. Notifications are matched against the
+    pending NOTIFY audits in memory, and the DELIVERED audits of those with a final status
+    are written in bulk. Notifications still pending after AUDIT_EMAIL_GIVE_UP_SECONDS
+    are given up on with an `unknown` status.
+    """
+
+    def __init__(self, client=None, max_pages=None):
+        self.client = client or get_client()
+        self.max_pages = max_pages
+
+    def pending_audits(self):
+        """
+        Return the pending NOTIFY audits keyed by their Notify notification id.
+        """
+        audits = Audit.objects.filter(delivery_status=DELIVERY_STATUS_PENDING).only(
+            "id", "created_at", "created_by_id", "case_id", "model_id", "content_type_id", "data"
+        )
+        return {str(audit.data["send_report"]["id"]): audit for audit in audits}
+
+    def notifications(self, created_after):
+        """
+        Yield email notifications from Notify, newest first, until reaching
+        notifications created before `created_after`.
+        """
+        older_than = None
+        page_count = 0
+        while True:
+            page = self.client.get_all_notifications(template_type="email", older_than=older_than)
+            notifications = page.get("notifications") or []
+            yield from notifications
+            page_count += 1
+            if (
+                not notifications
+                or not page.get("links", {}).get("next")
+                or parser.isoparse(notifications[-1]["created_at"]) < created_after
+                or (self.max_pages and page_count >= self.max_pages)
+            ):
+                return
+            older_than = notifications[-1]["id"]
+
+    def reconcile(self):
+        """
+        Record the delivery status of all pending notifications available.
+        Returns a dict of the number of notifications updated by status.
+        """
+        pending = self.pending_audits()
+        if not pending:
+            return {}
+        resolved = {}
+        created_after = min(audit.created_at for audit in pending.values()) - CREATED_AT_MARGIN
+        for notification in self.notifications(created_after):
+            if notification["id"] in pending and notification["status"] in DELIVERY_FINAL_STATUSES:
+                resolved[notification["id"]] = (pending.pop(notification["id"]), notification)
+                if not pending:
+                    break
+        give_up_before = timezone.now() - timedelta(seconds=settings.AUDIT_EMAIL_GIVE_UP_SECONDS)
+        for delivery_id, audit in pending.items():
+            if audit.created_at < give_up_before:
+                resolved[delivery_id] = (audit, {"status": DELIVERY_STATUS_UNKNOWN})
+        return self.record(resolved.values())
+
+    @transaction.atomic
+    def record(self, resolved):
+        """
+        Write the DELIVERED audits for a list of (audit, notification) tuples
+        and update the delivery status of their NOTIFY audits.
+
+        A NOTIFY audit may already have a DELIVERED audit, recorded with a status which was
+        not final yet (e.g. `sending`) before delivery statuses were reconciled: it is updated
+        rather than duplicated.
+        """
+        resolved = list(resolved)
+        existing = {
+            delivery.parent_id: delivery
+            for delivery in Audit.objects.filter(
+                parent_id__in=[audit.id for audit, _ in resolved], type=AUDIT_TYPE_DELIVERED
+            ).only("id", "parent_id", "data")
+        }
+        audit_ids_by_status = defaultdict(list)
+        deliveries = []
+        updated_deliveries = []
+        for audit, notification in resolved:
+            audit_ids_by_status[notification["status"]].append(audit.id)
+            data = {
+                "status": notification["status"],
+                "sent_at": notification.get("sent_at"),
+                "completed_at": notification.get("completed_at"),
+            }
+            delivery = existing.get(audit.id)
+            if delivery:
+                delivery.data = {**(delivery.data or {}), **data}
+                updated_deliveries.append(delivery)
+                continue
+            deliveries.append(
+                {
+                    "type": AUDIT_TYPE_DELIVERED,
+                    "parent_id": audit.id,
+                    "created_by_id": audit.created_by_id,
+                    "case_id": audit.case_id,
+                    "model_id": audit.model_id,
+                    "content_type_id": audit.content_type_id,
+                    "data": data,
+                }
+            )
+        bulk_audit_log(deliveries)
+        Audit.objects.bulk_update(updated_deliveries, ["data"], batch_size=500)
+        for delivery_status, audit_ids in audit_ids_by_status.items():
+            Audit.objects.filter(id__in=audit_ids).update(delivery_status=delivery_status)
+        counts = {
+            delivery_status: len(audit_ids)
+            for delivery_status, audit_ids in audit_ids_by_status.items()
+        }
+        logger.info(f"Notify delivery statuses recorded: {counts}")
+        return counts
@@ -3,39 +3,51 @@ import logging
 
 from django.db import migrations
 
-from audit.models import Audit
-
 
 logger = logging.getLogger(__name__)
 
+# The live Audit model (and its save) cannot be used here, as it relies on columns added by
+# later migrations: the case titles are precomputed in SQL, as "<sequence>: <name>" of the case
+SET_CASE_TITLE_SQL = """
+    UPDATE audit_audit audit
+    SET data = COALESCE(audit.data, '{}'::jsonb) || jsonb_build_object(
+        'case_title',
+        COALESCE(
+            (
+                SELECT COALESCE(c.sequence::text, 'None') || ': ' || COALESCE(c.name, 'None')
+                FROM cases_case c
+                WHERE c.id = audit.case_id
+            ),
+            ''
+        )
+    )
+    WHERE NOT (COALESCE(audit.data, '{}'::jsonb) ? 'case_title')
+"""
+
+UNSET_CASE_TITLE_SQL = """
+    UPDATE audit_audit SET data = data - 'case_title' WHERE data ? 'case_title'
+"""
+
 
 def set_case_title(apps, schema_editor):  # noqa
-    logger.info(f"Found {Audit.objects.all().count()} audit log entries")
-    audits = Audit.objects.all().iterator()
-    titled = 0
-    logger.info(f"Patching audit log case titles...")
-    for audit in audits:
-        if audit.case_title:
-            titled += 1
-        audit.save()
-    logger.info(f"Precomputed case titles for {titled} audit log entries")
+    with schema_editor.connection.cursor() as cursor:
+        logger.info(f"Patching audit log case titles...")
+        cursor.execute(SET_CASE_TITLE_SQL)
+        logger.info(f"Precomputed case titles for {cursor.rowcount} audit log entries")
 
 
 def unset_case_title(apps, schema_editor):  # noqa
-    count = Audit.objects.all().count()
-    logger.info(f"Found {count} audit log entries")
-    audits = Audit.objects.all().iterator()
-    logger.info(f"Removing precomputed audit log case titles...")
-    for audit in audits:
-        audit.data.pop("case_title", "")
-        audit.save()
-    logger.info(f"Removed case titles for {count} audit log entries")
+    with schema_editor.connection.cursor() as cursor:
+        logger.info(f"Removing precomputed audit log case titles...")
+        cursor.execute(UNSET_CASE_TITLE_SQL)
+        logger.info(f"Removed case titles for {cursor.rowcount} audit log entries")
 
 
 class Migration(migrations.Migration):
 
     dependencies = [
         ('audit', '0009_auto_20200212_1428'),
+        ('cases', '0001_initial'),
     ]
 
     operations = [
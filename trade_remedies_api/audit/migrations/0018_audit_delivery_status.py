@@ -0,0 +1,44 @@
+# Generated by Django 4.2.21 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("audit", "0017_alter_audit_type"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="audit",
+            name="delivery_status",
+            field=models.CharField(blank=True, db_index=True, max_length=30, null=True),
+        ),
+        migrations.RunSQL(
+            sql=[
+                # Notifications sent and awaiting a delivery status
+                """
+                UPDATE audit_audit SET delivery_status = 'pending'
+                WHERE type = 'NOTIFY'
+                AND parent_id IS NULL
+                AND data -> 'send_report' ->> 'id' IS NOT NULL
+                """,
+                # Notifications with a final delivery status already recorded
+                """
+                UPDATE audit_audit parent SET delivery_status = child.data ->> 'status'
+                FROM audit_audit child
+                WHERE child.parent_id = parent.id
+                AND child.type = 'DELIVERED'
+                AND parent.delivery_status = 'pending'
+                AND child.data ->> 'status' IN (
+                    'delivered',
+                    'unknown',
+                    'permanent-failure',
+                    'temporary-failure',
+                    'technical-failure'
+                )
+                """,
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
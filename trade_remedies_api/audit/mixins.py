@@ -59,6 +59,7 @@ class AuditableMixin(object):
         """
         diff = {}
         exclude_fields = {"created_at", "last_modified", "created_by"}
+        exclude_fields.update(getattr(self, "audit_exclude_fields", ()))
         for key in set(changes.keys()) - exclude_fields:
             _from_value = self._normalise_diff_value(changes[key])
             _to_value = self._normalise_diff_value(getattr(self, key))
@@ -28,6 +28,7 @@ from . import (
     AUDIT_TYPE_PASSWORD_RESET_FAILED,
     AUDIT_TYPE_USER_CREATED,
     AUDIT_TYPE_EMAIL_VERIFIED,
+    DELIVERY_STATUS_PENDING,
 )
 
 
@@ -106,6 +107,8 @@ class Audit(models.Model):
     milestone = models.BooleanField(default=False)
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.PROTECT)
     data: dict = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # Delivery status of the notification sent, for NOTIFY audits
+    delivery_status = models.CharField(max_length=30, null=True, blank=True, db_index=True)
 
     def _case_title(self):
         if not self.data:
@@ -146,6 +149,7 @@ class Audit(models.Model):
         """
         self.case_title  # noqa
         self.serialise_data()
+        self.set_delivery_status()
         super().save(*args, **kwargs)
 
     def get_model(self):
@@ -238,6 +242,16 @@ class Audit(models.Model):
         merged = map(lambda i: (columns[i], values[i]), range(len(columns)))
         return [item for item in merged]
 
+    def set_delivery_status(self):
+        """
+        Mark the NOTIFY audit of a notification accepted by Notify as pending delivery,
+        to be picked up by the delivery status reconciliation.
+        """
+        if self.type == AUDIT_TYPE_NOTIFY and not self.parent_id and not self.delivery_status:
+            send_report = self.data.get("send_report") if isinstance(self.data, dict) else None
+            if isinstance(send_report, dict) and send_report.get("id"):
+                self.delivery_status = DELIVERY_STATUS_PENDING
+
     def serialise_data(self):
         if self.data:
             for key, value in self.data.items():
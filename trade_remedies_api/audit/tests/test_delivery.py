@@ -0,0 +1,96 @@
+import uuid
+from datetime import timedelta
+from unittest.mock import Mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from audit import AUDIT_TYPE_DELIVERED, AUDIT_TYPE_NOTIFY, DELIVERY_STATUS_PENDING
+from audit.delivery import DeliveryStatusReconciler
+from audit.models import Audit
+from audit.utils import bulk_audit_log, new_audit_record_to_dict
+
+
+def notification(delivery_id, status, created_at=None):
+    created_at = created_at or timezone.now()
+    return {
+        "id": delivery_id,
+        "status": status,
+        "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "sent_at": None,
+        "completed_at": None,
+    }
+
+
+class DeliveryStatusReconcilerTest(TestCase):
+    def setUp(self):
+        self.delivery_ids = [str(uuid.uuid4()) for _ in range(3)]
+        bulk_audit_log(
+            [
+                new_audit_record_to_dict(
+                    AUDIT_TYPE_NOTIFY, data={"send_report": {"id": delivery_id}}
+                )
+                for delivery_id in self.delivery_ids
+            ]
+        )
+        self.client = Mock()
+
+    def delivery_status(self, delivery_id):
+        return Audit.objects.get(data__send_report__id=delivery_id).delivery_status
+
+    def test_notify_audits_are_pending(self):
+        self.assertEqual(Audit.objects.filter(delivery_status=DELIVERY_STATUS_PENDING).count(), 3)
+
+    def test_reconcile_pages(self):
+        other_id = str(uuid.uuid4())
+        self.client.get_all_notifications.side_effect = [
+            {
+                "notifications": [
+                    notification(self.delivery_ids[0], "delivered"),
+                    notification(other_id, "delivered"),
+                ],
+                "links": {"next": "next-page"},
+            },
+            {
+                "notifications": [
+                    notification(self.delivery_ids[1], "permanent-failure"),
+                    notification(self.delivery_ids[2], "sending"),
+                ],
+                "links": {},
+            },
+        ]
+        counts = DeliveryStatusReconciler(client=self.client).reconcile()
+
+        self.assertEqual(counts, {"delivered": 1, "permanent-failure": 1})
+        self.assertEqual(self.client.get_all_notifications.call_count, 2)
+        self.assertEqual(self.client.get_all_notifications.call_args.kwargs["older_than"], other_id)
+        self.assertEqual(self.delivery_status(self.delivery_ids[0]), "delivered")
+        self.assertEqual(self.delivery_status(self.delivery_ids[1]), "permanent-failure")
+        self.assertEqual(self.delivery_status(self.delivery_ids[2]), DELIVERY_STATUS_PENDING)
+        delivered = Audit.objects.get(type=AUDIT_TYPE_DELIVERED, data__status="delivered")
+        self.assertEqual(delivered.parent.data["send_report"]["id"], self.delivery_ids[0])
+
+    def test_reconcile_gives_up(self):
+        Audit.objects.filter(data__send_report__id=self.delivery_ids[0]).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        self.client.get_all_notifications.return_value = {"notifications": [], "links": {}}
+        counts = DeliveryStatusReconciler(client=self.client).reconcile()
+
+        self.assertEqual(counts, {"unknown": 1})
+        self.assertEqual(self.delivery_status(self.delivery_ids[0]), "unknown")
+        self.assertEqual(Audit.objects.filter(type=AUDIT_TYPE_DELIVERED).count(), 1)
+
+    def test_reconcile_updates_existing_delivery(self):
+        parent = Audit.objects.get(data__send_report__id=self.delivery_ids[0])
+        Audit.objects.create(type=AUDIT_TYPE_DELIVERED, parent=parent, data={"status": "sending"})
+        self.client.get_all_notifications.return_value = {
+            "notifications": [notification(self.delivery_ids[0], "delivered")],
+            "links": {},
+        }
+        counts = DeliveryStatusReconciler(client=self.client).reconcile()
+
+        self.assertEqual(counts, {"delivered": 1})
+        delivered = Audit.objects.get(type=AUDIT_TYPE_DELIVERED)
+        self.assertEqual(delivered.parent_id, parent.id)
+        self.assertEqual(delivered.data["status"], "delivered")
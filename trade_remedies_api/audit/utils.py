@@ -70,6 +70,34 @@ def audit_log(
         audit_log_task(audit_dict)
 
 
+def bulk_audit_log(audit_dicts, batch_size=500):
+    """
+    Create many audit records at once.
+
+    Unlike `audit_log` records are written synchronously using batched inserts,
+    which is preferable when a single operation produces an audit entry per item.
+
+    :param audit_dicts: An iterable of dicts as returned by `new_audit_record_to_dict`.
+    :param int batch_size: The number of records inserted per statement.
+    :return: The list of created Audit instances.
+    """
+    from cases.models import Case
+
+    audits = [Audit(**audit_dict) for audit_dict in audit_dicts]
+    # Populate the precomputed case titles `Audit.save` would, loading all cases at once
+    case_ids = {audit.case_id for audit in audits if audit.case_id}
+    case_titles = {
+        str(case.id): str(case)
+        for case in Case.objects.filter(id__in=case_ids).only("id", "sequence", "name")
+    }
+    for audit in audits:
+        audit.data = audit.data or {}
+        audit.data.setdefault("case_title", case_titles.get(str(audit.case_id), ""))
+        audit.serialise_data()
+        audit.set_delivery_status()
+    return Audit.objects.bulk_create(audits, batch_size=batch_size)
+
+
 def get_notify_fail_report(case=None, detail=False):
     audits = Audit.objects.filter(
         type=AUDIT_TYPE_DELIVERED, data__status__in=["permanent-failure", "temporary-failure"]
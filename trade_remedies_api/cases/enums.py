@@ -0,0 +1,176 @@
+"""
+The case enums bundle: reference data sets (roles, case types, stages, submission
+statuses, sectors, countries etc.) returned by the CaseEnumsAPI.
+
+The reference part of the bundle rarely changes, so it is computed once per bundle version
+and stored in the cache together with a strong ETag. Saving or deleting any of the
+underlying reference models bumps the bundle version (see cases.receivers), which
+invalidates every cached bundle at once.
+The case specific part (available submission and review types) is computed on its own
+for each request as it depends on the state of the case.
+"""
+
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django_countries import countries
+
+from cases.constants import CASE_MILESTONE_DATES, DIRECTION_BOTH, DIRECTION_TRA_TO_PUBLIC
+from cases.models import (
+    ArchiveReason,
+    CaseStage,
+    CaseType,
+    Sector,
+    SubmissionStatus,
+    SubmissionType,
+)
+from core.constants import SAFE_COLOURS
+from core.models import SystemParameter
+from core.utils import deep_index_items_by, key_by
+from security.models import CaseRole
+
+ENUMS_VERSION_CACHE_KEY = "case_enums_version"
+ENUMS_BUNDLE_CACHE_KEY = "case_enums_bundle:{version}:{direction}"
+ENUMS_BUNDLE_TIMEOUT = 60 * 60 * 24
+
+
+def make_etag(*parts):
+    """
+    Return a strong ETag for the given JSON serialisable parts.
+    """
+    checksum = hashlib.sha256()
+    for part in parts:
+        checksum.update(json.dumps(part, sort_keys=True, cls=DjangoJSONEncoder).encode("utf8"))
+    return f'"{checksum.hexdigest()}"'
+
+
+def get_enums_version():
+    version = cache.get(ENUMS_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(ENUMS_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+def invalidate_case_enums(*args, **kwargs):
+    """
+    Invalidate all cached enum bundles by moving to a new bundle version.
+    Can be connected directly as a signal receiver.
+    """
+    cache.set(ENUMS_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def submission_type_enums(submission_types, case=None):
+    """
+    Return the submission type related enums for a list of submission types.
+    If a case is provided, requirements are evaluated against it.
+    """
+    _submission_types = [
+        submission_type.to_dict(case=case) for submission_type in submission_types
+    ]
+    return {
+        "submission_types": _submission_types,
+        "case_worker_allowed_submission_types": [
+            submission_type.to_dict()
+            for submission_type in submission_types
+            if submission_type.direction == DIRECTION_TRA_TO_PUBLIC
+        ],
+        "public_submission_types": [
+            submission_type.to_dict()
+            for submission_type in submission_types
+            if submission_type.direction == DIRECTION_BOTH
+        ],
+        "available_submission_types": {
+            subtype["id"]: subtype["has_requirement"] for subtype in _submission_types
+        },
+        "response_submission_types": [
+            submission_type
+            for submission_type in _submission_types
+            if submission_type.get("requires")
+        ],
+    }
+
+
+def direction_filter(direction=None):
+    return {"direction__in": [int(direction), DIRECTION_BOTH]} if direction is not None else {}
+
+
+def build_reference_enums(direction=None):
+    """
+    Build the reference (non case specific) part of the enums bundle.
+    """
+    roles = [role.to_dict() for role in CaseRole.objects.all().order_by("id")]
+    submission_statuses = [
+        sub_status.to_dict()
+        for sub_status in SubmissionStatus.objects.select_related("type").all().order_by("id")
+    ]
+    submission_types = list(
+        SubmissionType.objects.select_related("requires")
+        .filter(**direction_filter(direction))
+        .order_by("order", "name")
+    )
+    enums = {
+        "roles": roles,
+        "role_index": key_by(roles, "key"),
+        "approval_role_id": SystemParameter.get("AWAITING_APPROVAL_ROLE_ID"),
+        "case_types": [
+            case_type.to_dict()
+            for case_type in CaseType.objects.select_related("workflow")
+            .all()
+            .order_by("order", "name")
+        ],
+        "case_stages": [
+            case_stage.to_dict()
+            for case_stage in CaseStage.objects.select_related("type")
+            .all()
+            .order_by("order", "name")
+        ],
+        "statuses_by_type": deep_index_items_by(submission_statuses, "type/key"),
+        "submission_statuses": submission_statuses,
+        "sectors": [sector.to_dict() for sector in Sector.objects.all().order_by("id")],
+        "countries": list(countries),
+        "submission_status_map": SubmissionType.submission_status_map(),
+        "archive_reasons": [
+            archive_reason.to_dict()
+            for archive_reason in ArchiveReason.objects.all().order_by("name")
+        ],
+        "milestone_types": [
+            (ms_type, CASE_MILESTONE_DATES[ms_type]) for ms_type in CASE_MILESTONE_DATES
+        ],
+        "available_review_types": [],
+        "safe_colours": SAFE_COLOURS,
+    }
+    enums.update(submission_type_enums(submission_types))
+    return enums
+
+
+def get_reference_enums(direction=None):
+    """
+    Return a tuple of the cached reference enums bundle and its ETag,
+    building and caching them if required.
+    """
+    cache_key = ENUMS_BUNDLE_CACHE_KEY.format(version=get_enums_version(), direction=direction)
+    bundle = cache.get(cache_key)
+    if bundle is None:
+        enums = build_reference_enums(direction=direction)
+        bundle = (enums, make_etag(enums))
+        cache.set(cache_key, bundle, ENUMS_BUNDLE_TIMEOUT)
+    return bundle
+
+
+def build_case_enums(case, direction=None):
+    """
+    Build the case specific part of the enums bundle:
+    the submission types available to the case and its available review types.
+    """
+    submission_types = list(
+        SubmissionType.objects.get_available_submission_types_for_case(
+            case, direction_filter(direction)
+        ).select_related("requires")
+    )
+    enums = submission_type_enums(submission_types, case=case)
+    enums["available_review_types"] = case.available_case_review_types()
+    return enums
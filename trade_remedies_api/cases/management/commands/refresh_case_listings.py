@@ -0,0 +1,25 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from cases.models import Case, CaseListing
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalised case listing rows for all (or the given) cases."
+
+    def add_arguments(self, parser):
+        parser.add_argument("case_ids", nargs="*", help="Only refresh these case ids")
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        case_ids = options["case_ids"] or list(
+            Case.objects.order_by("sequence").values_list("id", flat=True)
+        )
+        batch_size = options["batch_size"]
+        logger.info("+ Refreshing %s case listings", len(case_ids))
+        for offset in range(0, len(case_ids), batch_size):
+            CaseListing.objects.refresh_cases(case_ids[offset : offset + batch_size])
+        logger.info("+ Completed refreshing case listings")
@@ -0,0 +1,197 @@
+# Generated by Django 4.2.21 on 2026-10-19 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from cases.constants import (
+    ALL_COUNTRY_CASE_TYPES,
+    DIRECTION_PUBLIC_TO_TRA,
+    DIRECTION_TRA_TO_PUBLIC,
+    SUBMISSION_APPLICATION_TYPES,
+)
+
+
+def sql_list(values):
+    return ", ".join(str(int(value)) for value in values)
+
+
+# The listings of the existing cases, with the columns which can be computed from the tables
+# (see CaseListingManager.refresh_cases). The next action and notice are computed by the
+# workflow engine of the live models, which cannot be used in a migration: the listings are
+# marked as never refreshed (cases.models.listing.UNREFRESHED_AT), and refreshed when the
+# listings are first read (see CaseListingManager.investigator_listings).
+CREATE_LISTINGS_SQL = f"""
+    INSERT INTO cases_caselisting (
+        case_id, sequence, initiated_sequence, reference, name, type_id, stage_id,
+        applicant_id, applicant_name, registration_deadline, participant_count,
+        submission_count, case_created_at, initiated_at, archived_at, deleted_at, initiated,
+        partially_created, refreshed_at
+    )
+    SELECT
+        c.id,
+        c.sequence,
+        c.initiated_sequence,
+        CASE
+            WHEN COALESCE(c.initiated_sequence, 0) != 0 THEN t.acronym || lpad(
+                c.initiated_sequence::text, greatest(4, length(c.initiated_sequence::text)), '0'
+            )
+            ELSE lpad(c.sequence::text, greatest(4, length(c.sequence::text)), '0')
+        END,
+        c.name,
+        c.type_id,
+        c.stage_id,
+        applicant.id,
+        applicant.name,
+        c.initiated_at + make_interval(days => {int(settings.CASE_REGISTRATION_DURATION)}),
+        (
+            SELECT COUNT(DISTINCT ocr.id)
+            FROM security_organisationcaserole ocr
+            LEFT JOIN security_caserole cr ON cr.id = ocr.role_id
+            WHERE ocr.case_id = c.id AND cr.key IS DISTINCT FROM 'preparing'
+        ),
+        (
+            SELECT COUNT(DISTINCT s.id)
+            FROM cases_submission s
+            JOIN cases_submissionstatus ss ON ss.id = s.status_id
+            JOIN cases_submissiontype st ON st.id = s.type_id
+            WHERE s.case_id = c.id
+            AND NOT s.archived
+            AND NOT ss.sent
+            AND NOT ss.draft
+            AND st.direction IN ({sql_list([DIRECTION_TRA_TO_PUBLIC, DIRECTION_PUBLIC_TO_TRA])})
+            AND (s.type_id IN ({sql_list(SUBMISSION_APPLICATION_TYPES)}) OR NOT ss."default")
+        ),
+        c.created_at,
+        c.initiated_at,
+        c.archived_at,
+        c.deleted_at,
+        c.initiated_at IS NOT NULL,
+        NOT (
+            EXISTS (SELECT 1 FROM cases_product p WHERE p.case_id = c.id)
+            AND EXISTS (SELECT 1 FROM security_organisationcaserole r WHERE r.case_id = c.id)
+            AND (
+                EXISTS (SELECT 1 FROM cases_exportsource e WHERE e.case_id = c.id)
+                OR COALESCE(c.type_id IN ({sql_list(ALL_COUNTRY_CASE_TYPES)}), false)
+            )
+        ),
+        '1970-01-01 00:00:00+00'
+    FROM cases_case c
+    LEFT JOIN cases_casetype t ON t.id = c.type_id
+    LEFT JOIN LATERAL (
+        SELECT s.organisation_id
+        FROM cases_submission s
+        WHERE s.case_id = c.id
+        AND NOT s.archived
+        AND s.type_id IN ({sql_list(SUBMISSION_APPLICATION_TYPES)})
+        ORDER BY s.created_at
+        LIMIT 1
+    ) application ON true
+    -- the organisation of the first application submission, if it has a role in the case
+    LEFT JOIN organisations_organisation applicant
+    ON applicant.id = application.organisation_id
+    AND EXISTS (
+        SELECT 1 FROM security_organisationcaserole r
+        WHERE r.case_id = c.id AND r.organisation_id = applicant.id
+    )
+    ON CONFLICT (case_id) DO NOTHING
+"""
+
+
+def create_listings(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_LISTINGS_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organisations", "0032_auto_20230620_1007"),
+        ("cases", "0067_auto_20230605_1447"),
+        ("security", "0008_alter_organisationcaserole_unique_together"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaseListing",
+            fields=[
+                (
+                    "case",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="listing",
+                        serialize=False,
+                        to="cases.case",
+                    ),
+                ),
+                ("sequence", models.IntegerField(blank=True, null=True)),
+                ("initiated_sequence", models.IntegerField(blank=True, null=True)),
+                (
+                    "reference",
+                    models.CharField(blank=True, db_index=True, max_length=20, null=True),
+                ),
+                ("name", models.CharField(blank=True, max_length=250, null=True)),
+                ("next_action", models.CharField(blank=True, max_length=250, null=True)),
+                ("next_action_due", models.CharField(blank=True, max_length=50, null=True)),
+                ("next_notice", models.CharField(blank=True, max_length=250, null=True)),
+                ("next_notice_due", models.CharField(blank=True, max_length=50, null=True)),
+                ("applicant_name", models.CharField(blank=True, max_length=250, null=True)),
+                ("registration_deadline", models.DateTimeField(blank=True, null=True)),
+                ("participant_count", models.IntegerField(default=0)),
+                ("submission_count", models.IntegerField(default=0)),
+                ("case_created_at", models.DateTimeField(blank=True, null=True)),
+                ("initiated_at", models.DateTimeField(blank=True, null=True)),
+                ("archived_at", models.DateTimeField(blank=True, null=True)),
+                ("deleted_at", models.DateTimeField(blank=True, null=True)),
+                ("initiated", models.BooleanField(default=False)),
+                ("partially_created", models.BooleanField(default=True)),
+                ("refreshed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "applicant",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="organisations.organisation",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="cases.casestage",
+                    ),
+                ),
+                (
+                    "type",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="cases.casetype",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("deleted_at__isnull", True), ("partially_created", False)),
+                        fields=["archived_at", "sequence"],
+                        name="caselisting_archived_seq_idx",
+                    ),
+                    models.Index(
+                        fields=["initiated", "sequence"], name="caselisting_initiated_seq_idx"
+                    ),
+                    models.Index(fields=["stage", "sequence"], name="caselisting_stage_seq_idx"),
+                    models.Index(fields=["applicant_name"], name="caselisting_applicant_idx"),
+                    models.Index(fields=["refreshed_at"], name="caselisting_refreshed_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(create_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.21 on 2026-10-19 11:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cases", "0068_caselisting"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE SEQUENCE IF NOT EXISTS cases_case_sequence_seq",
+                "CREATE SEQUENCE IF NOT EXISTS cases_case_initiated_sequence_seq",
+                # Seed both sequences so the next values follow the current highest numbers
+                """
+                SELECT setval(
+                    'cases_case_sequence_seq',
+                    COALESCE((SELECT MAX(sequence) FROM cases_case), 0) + 1,
+                    false
+                )
+                """,
+                """
+                SELECT setval(
+                    'cases_case_initiated_sequence_seq',
+                    COALESCE((SELECT MAX(initiated_sequence) FROM cases_case), 0) + 1,
+                    false
+                )
+                """,
+            ],
+            reverse_sql=[
+                "DROP SEQUENCE IF EXISTS cases_case_sequence_seq",
+                "DROP SEQUENCE IF EXISTS cases_case_initiated_sequence_seq",
+            ],
+        ),
+    ]
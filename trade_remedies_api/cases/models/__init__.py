@@ -9,6 +9,7 @@ from .submissiondocument import SubmissionDocument, SubmissionDocumentType
 from .submission import Submission
 from .workflow import CaseWorkflow, CaseWorkflowState
 from .timegate import TimeGateStatus
+from .listing import CaseListing
 from .product import (
     Product,
     Sector,
@@ -14,7 +14,7 @@ class ArchiveReason(models.Model):
     def __str__(self):
         return self.name
 
-    @method_cache
+    @method_cache(shared=False)
     def to_dict(self):
         return {
             "id": str(self.id),
@@ -3,7 +3,7 @@ import logging
 
 from dateutil.parser import parse
 from django.conf import settings
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.db.models import Q, OuterRef, Exists, QuerySet
 from django.utils import timezone
 from v2_api_client.shared.logging import audit_logger
@@ -31,7 +31,7 @@ from cases.constants import (
 from contacts.models import Contact
 from core.base import BaseModel
 from core.models import SystemParameter
-from core.tasks import send_mail
+from core.tasks import send_bulk_mail
 from core.utils import public_login_url
 from organisations.models import Organisation, get_organisation
 from security.constants import (
@@ -52,10 +52,14 @@ from .casestage import CaseStage
 from .casetype import CaseType
 from .submission import SubmissionType, Submission
 from .submissiondocument import SubmissionDocumentType
-from .workflow import CaseWorkflow, CaseWorkflowState
+from .workflow import CaseWorkflow, CaseWorkflowState, StateValueDate, StateValueText
 
 logger = logging.getLogger(__name__)
 
+# Postgres sequences allocating case numbers (see migration 0069_case_sequences)
+CASE_SEQUENCE = "cases_case_sequence_seq"
+CASE_INITIATED_SEQUENCE = "cases_case_initiated_sequence_seq"
+
 
 class CaseOrNotice:
     """An object that has many of the same qualities as a Case but may not be one.
@@ -311,12 +315,8 @@ class CaseManager(models.Manager):
         ).select_related(
             "case", "case__stage", "case__created_by", "case__archive_reason", "case__workflow"
         )
-        for user_case in user_cases:
-            org_role = (
-                user_case.case.organisationcaserole_set.filter(organisation=user_case.organisation)
-                .select_related("role", "organisation", "case")
-                .first()
-            )
+        for user_case in user_cases.with_organisation_case_roles():
+            org_role = user_case.organisation_case_role
             if org_role and org_role.approved_at:
                 user_case.case.set_organisation_context(org_role.organisation)
                 user_case.case.set_user_context([user])
@@ -328,6 +328,8 @@ class CaseManager(models.Manager):
         """
         Retrieve all cases for a given organisation, including those no directly associated,
         but connected through a third-party representation.
+        Each user case is annotated with the id of its organisation's case role; use
+        `with_organisation_case_roles()` on the result to resolve the roles in bulk.
         """
         user_filter = {"user__in": user.organisation_users}
         user_cases = UserCase.objects.filter(
@@ -339,7 +341,7 @@ class CaseManager(models.Manager):
             "case__archive_reason",
             "case__workflow",
             "organisation",
-        )
+        ).annotate_organisation_case_role()
         return user_cases
 
     def investigator_cases(self, user=None, current=None, exclude_partially_created=True):
@@ -376,6 +378,91 @@ class CaseManager(models.Manager):
             )
         return cases
 
+    def next_sequence_value(self, sequence_name):
+        """
+        Allocate the next value of a case numbering sequence.
+        Values are allocated atomically by Postgres outside of the current transaction,
+        so concurrent allocations never clash (though a rolled back transaction
+        leaves a gap).
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s)", [sequence_name])
+            return cursor.fetchone()[0]
+
+    def measures_expired_cases(self, expired_stage, on_date=None):
+        """
+        Return all initiated, archived cases whose LATEST_MEASURE_EXPIRY date has passed
+        and which can still move to the given expired stage.
+        The expiry date is cast from the workflow state in SQL so the whole sweep
+        is evaluated as a single query. Cases that are flow restricted to a stage
+        ordered after the expired stage are excluded, mirroring `Case.set_stage`.
+
+        :param CaseStage expired_stage: The stage expired cases would move to.
+        :param date on_date: The date to compare expiry against. Defaults to today.
+        """
+        on_date = on_date or timezone.now().date()
+        expired = (
+            CaseWorkflowState.objects.filter(
+                case=OuterRef("pk"),
+                key="LATEST_MEASURE_EXPIRY",
+                deleted_at__isnull=True,
+            )
+            .annotate(expiry=StateValueDate("value"))
+            .filter(expiry__lte=on_date)
+        )
+        later_stage_ids = [
+            str(stage_id)
+            for stage_id in CaseStage.objects.filter(order__gt=expired_stage.order).values_list(
+                "id", flat=True
+            )
+        ]
+        restricted = (
+            CaseWorkflowState.objects.filter(
+                case=OuterRef("pk"),
+                key="LAST_RESTRICTED_FLOW_STAGE_ID",
+            )
+            .annotate(stage_id=StateValueText("value"))
+            .filter(stage_id__in=later_stage_ids)
+        )
+        return (
+            self.filter(initiated_at__isnull=False, archived_at__isnull=False)
+            .exclude(stage=expired_stage)
+            .filter(Exists(expired))
+            .exclude(Exists(restricted))
+        )
+
+    @transaction.atomic
+    def bulk_set_stage(self, case_ids, stage):
+        """
+        Move a set of cases to a stage using set based updates.
+        Unlike `Case.set_stage` no flow restriction is checked here, callers are expected
+        to have filtered the cases beforehand. If the stage is flow restricted, the
+        LAST_RESTRICTED_FLOW_STAGE_ID state of each case is updated or created.
+        Returns the number of cases updated.
+        """
+        from .listing import CaseListing
+
+        case_ids = list(case_ids)
+        now = timezone.now()
+        updated = self.filter(id__in=case_ids).update(stage=stage, last_modified=now)
+        if stage.flow_restrict:
+            restricted = CaseWorkflowState.objects.filter(
+                case_id__in=case_ids, key="LAST_RESTRICTED_FLOW_STAGE_ID"
+            )
+            restricted.update(value=str(stage.id), last_modified=now)
+            existing = set(restricted.values_list("case_id", flat=True))
+            CaseWorkflowState.objects.bulk_create(
+                [
+                    CaseWorkflowState(
+                        case_id=case_id, key="LAST_RESTRICTED_FLOW_STAGE_ID", value=str(stage.id)
+                    )
+                    for case_id in case_ids
+                    if case_id not in existing
+                ]
+            )
+        CaseListing.objects.refresh_on_commit(*case_ids)
+        return updated
+
     def public_cases(self):
         """
         Return all publicly available cases.
@@ -419,6 +506,9 @@ class Case(BaseModel, CaseOrNotice):
 
     objects = CaseManager()
 
+    # workflow state keys making up the case status, mapped to their status dict key
+    STATUS_KEYS = {"CURRENT_ACTION": "next_action", "NEXT_NOTICE": "next_notice"}
+
     class Meta:
         permissions = (
             ("create_ex_oficio", "Can create an ex-oficio case"),
@@ -439,14 +529,10 @@ class Case(BaseModel, CaseOrNotice):
         return f"{self.sequence}: {self.name}"
 
     def get_next_sequence(self):
-        current_sequence = Case.objects.aggregate(sequence=models.Max("sequence"))
-        return (current_sequence.get("sequence") or 0) + 1
+        return Case.objects.next_sequence_value(CASE_SEQUENCE)
 
     def get_next_initiated_sequence(self):
-        current_sequence = Case.objects.filter(initiated_sequence__isnull=False).aggregate(
-            sequence=models.Max("initiated_sequence")
-        )
-        return (current_sequence.get("sequence") or 0) + 1
+        return Case.objects.next_sequence_value(CASE_INITIATED_SEQUENCE)
 
     def set_organisation_context(self, organisation):
         self._organisation = organisation
@@ -574,6 +660,24 @@ class Case(BaseModel, CaseOrNotice):
     def get_status(self):
         """Return a status dict for this case
 
+        Returns:
+            dict -- dict detailing the current stage, action ane notice of the case
+        """
+        _value_index = CaseWorkflowState.objects.value_index(
+            case=self, keys=list(self.STATUS_KEYS)
+        )
+        _action_index = CaseWorkflowState.objects.value_index(
+            case=self, keys=[v[0] for k, v in _value_index.items()]
+        )
+        return self.build_status(_value_index, _action_index)
+
+    def build_status(self, value_index, action_index):
+        """Return a status dict for this case from pre-fetched workflow state indexes
+
+        Arguments:
+            value_index {dict} -- CURRENT_ACTION/NEXT_NOTICE state index of (value, due_date)
+            action_index {dict} -- state index of the keys the above values point to
+
         Returns:
             dict -- dict detailing the current stage, action ane notice of the case
         """
@@ -584,20 +688,15 @@ class Case(BaseModel, CaseOrNotice):
             "next_notice": None,
             "next_notice_due": None,
         }
-        keys = {"CURRENT_ACTION": "next_action", "NEXT_NOTICE": "next_notice"}
-        _value_index = CaseWorkflowState.objects.value_index(case=self, keys=list(keys))
-        _action_index = CaseWorkflowState.objects.value_index(
-            case=self, keys=[v[0] for k, v in _value_index.items()]
-        )
         workflow = self.workflow.as_workflow()
         workflow_key_index = workflow.key_index
-        for key, name in keys.items():
-            _value = _value_index.get(key, [None, None])[0]
+        for key, name in self.STATUS_KEYS.items():
+            _value = value_index.get(key, [None, None])[0]
             if not _value:
                 continue
             action_node = workflow_key_index.get(_value)
             status[name] = action_node.get("label") if action_node else None
-            action_due_date = _action_index.get(_value, [None, None])[1]
+            action_due_date = action_index.get(_value, [None, None])[1]
             if action_due_date:  # action_obj and action_obj.due_date:
                 status[f"{name}_due"] = action_due_date.strftime(settings.API_DATETIME_FORMAT)
         return status
@@ -735,7 +834,15 @@ class Case(BaseModel, CaseOrNotice):
         return _dict
 
     # @method_cache
-    def _to_embedded_dict(self, organisation=None, user=None, is_primary_contact=False):
+    def _to_embedded_dict(
+        self, organisation=None, user=None, is_primary_contact=False, summary=None
+    ):
+        """
+        An embedded dict representation of this case.
+        `summary` can provide values pre-fetched in bulk by the CaseSummaryBuilder
+        (case_status, user_organisations and primary) to avoid per case queries.
+        """
+        summary = summary or {}
         if hasattr(self, "_organisation") and not organisation:
             organisation = self._organisation
         if not user and self.user_context:
@@ -764,18 +871,28 @@ class Case(BaseModel, CaseOrNotice):
                     else None
                 ),
                 "registration_deadline": self.registration_deadline,
-                "case_status": self.get_status(),
-                "organisation": organisation.to_dict() if organisation else _applicant_dict,
+                "case_status": summary.get("case_status") or self.get_status(),
+                "organisation": (
+                    summary.get("organisation") or organisation.to_dict()
+                    if organisation
+                    else _applicant_dict
+                ),
             }
         )
         if hasattr(self, "_caserole"):
             _dict["caserole"] = self._caserole.to_embedded_dict()
         if user and not user.is_tra():
-            _dict["user_organisations"] = self.get_user_organisation_state(user)
+            if "user_organisations" in summary:
+                _dict["user_organisations"] = summary["user_organisations"]
+            else:
+                _dict["user_organisations"] = self.get_user_organisation_state(user)
             if is_primary_contact:
-                _dict["primary"] = self.casecontact_set.filter(
-                    contact=user.contact, primary=True
-                ).exists()
+                if "primary" in summary:
+                    _dict["primary"] = summary["primary"]
+                else:
+                    _dict["primary"] = self.casecontact_set.filter(
+                        contact=user.contact, primary=True
+                    ).exists()
         return _dict
 
     def _to_minimal_dict(self, attrs=None):
@@ -955,19 +1072,8 @@ class Case(BaseModel, CaseOrNotice):
         # We flag all submissions that sent by the TRA and are not locked -
         # because the customer has to do some more work on them
         org_subs = (
-            self.submission_set.filter(
-                organisation=organisation,
-                deleted_at__isnull=True,
-                status__locking=False,
-                status__default=False,
-            )
-            .filter(
-                Q(status__sent=True)
-                | Q(status__version=True)
-                | Q(status__draft=True)  # sadly, this is our only way to detect deficiency notices
-            )
-            .filter(Q(archived=False))
-            .filter(Q(type__direction=DIRECTION_TRA_TO_PUBLIC) | Q(due_at__isnull=False))
+            Submission.objects.customer_action_required()
+            .filter(case=self, organisation=organisation)
             .order_by("due_at")
         )
         count = org_subs.count()
@@ -1141,24 +1247,26 @@ class Case(BaseModel, CaseOrNotice):
         if organisation_id:
             user_cases = user_cases.filter(organisation=organisation_id)
 
+        recipients = []
         for user_case in user_cases:
             contact = user_case.user.contact
             organisation = user_case.organisation
-            _user_contact = context.copy()
-            _user_contact["full_name"] = contact.name.strip()
-            _user_contact["company_name"] = organisation.name if organisation else ""
-            audit_kwargs = {
-                "audit_type": AUDIT_TYPE_NOTIFY,
-                "case": self,
-                "user": sent_by,
-                "model": contact,
-            }
-            send_mail(
-                email=contact.email,
-                context=_user_contact,
-                template_id=notify_template_id,
-                audit_kwargs=audit_kwargs,
+            recipients.append(
+                {
+                    "email": contact.email,
+                    "context": {
+                        "full_name": contact.name.strip(),
+                        "company_name": organisation.name if organisation else "",
+                    },
+                    "model": contact,
+                }
             )
+        send_bulk_mail(
+            recipients,
+            notify_template_id,
+            context=context,
+            audit_kwargs={"audit_type": AUDIT_TYPE_NOTIFY, "case": self, "user": sent_by},
+        )
 
     def set_next_action(self, next_action):
         if next_action:
@@ -1270,6 +1378,9 @@ class Case(BaseModel, CaseOrNotice):
     @property
     def date_last_submission_made_public(self):
         """Gets the date the last submission was made public"""
+        if hasattr(self, "last_issued_at"):
+            # annotated by CaseSerializer.eager_load_queryset
+            return self.last_issued_at or self.last_modified
         if public_submission := self.submission_set.exclude(issued_at__isnull=True).order_by(
             "-issued_at"
         ):
@@ -27,7 +27,8 @@ class CaseStage(models.Model):
         locking_indicator = "*" if self.locking else ""
         return f"{self.name}{locking_indicator}"
 
-    @method_cache
+    # the case type's dict includes its workflow (dependencies are not transitive)
+    @method_cache(invalidated_by=["cases.CaseType", "workflow.WorkflowTemplate"])
     def to_dict(self):
         return {
             "id": str(self.id),
@@ -39,7 +40,7 @@ class CaseStage(models.Model):
             "type": self.type.to_dict() if self.type else None,
         }
 
-    @method_cache
+    @method_cache(shared=False)
     def to_embedded_dict(self):
         return {
             "id": str(self.id),
@@ -24,7 +24,7 @@ class CaseType(models.Model):
     def __str__(self):
         return self.name
 
-    @method_cache
+    @method_cache(invalidated_by=["workflow.WorkflowTemplate"])
     def to_dict(self):
         return {
             "id": str(self.id),
@@ -0,0 +1,295 @@
+import datetime
+import threading
+import weakref
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from cases.constants import (
+    ALL_COUNTRY_CASE_TYPES,
+    DIRECTION_PUBLIC_TO_TRA,
+    DIRECTION_TRA_TO_PUBLIC,
+    SUBMISSION_APPLICATION_TYPES,
+)
+from security.constants import SECURITY_GROUPS_TRA_TOP_LEVEL
+from security.models import OrganisationCaseRole
+from .case import Case
+from .product import ExportSource, Product
+
+
+# Listings created by migration 0068 without their workflow-derived columns (next action and
+# notice) are marked with this refreshed_at, and refreshed when first read
+UNREFRESHED_AT = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# The refresh pending for the current transaction of each database (connections are per
+# thread), referenced weakly: its only strong reference is its on_commit callback, so it goes
+# away when the callback is run, or discarded by a rollback
+_pending = threading.local()
+
+
+class PendingCaseListings:
+    """
+    The cases whose listings are to be refreshed when the current transaction commits.
+    """
+
+    def __init__(self, case_ids):
+        self.case_ids = case_ids
+        self.refreshed = False
+
+    def refresh(self):
+        from cases.tasks import refresh_case_listings
+
+        self.refreshed = True
+        case_ids = sorted(self.case_ids)
+        if settings.RUN_ASYNC:
+            refresh_case_listings.delay(case_ids)
+        else:
+            refresh_case_listings(case_ids)
+
+
+class CaseListingManager(models.Manager):
+    def refresh_on_commit(self, *case_ids):
+        """
+        Refresh the listings of the given cases once the current transaction commits,
+        as a celery task when running asynchronously.
+        The cases to refresh are collected per transaction, so saving many records of the
+        same cases refreshes their listings once, in one task.
+        """
+        case_ids = {str(case_id) for case_id in case_ids if case_id}
+        if not case_ids:
+            return
+        pending_ref = getattr(_pending, self.db, None)
+        pending = pending_ref() if pending_ref else None
+        if pending is not None and not pending.refreshed:
+            pending.case_ids |= case_ids
+            return
+        pending = PendingCaseListings(case_ids)
+        setattr(_pending, self.db, weakref.ref(pending))
+        transaction.on_commit(pending.refresh, using=self.db)
+
+    def refresh_unrefreshed(self, batch_size=200):
+        """
+        Refresh the listings created by migration 0068, which are yet to be refreshed
+        (see UNREFRESHED_AT). Returns the number of listings refreshed.
+        """
+        case_ids = list(self.filter(refreshed_at=UNREFRESHED_AT).values_list("case_id", flat=True))
+        for offset in range(0, len(case_ids), batch_size):
+            self.refresh_cases(case_ids[offset : offset + batch_size])
+        return len(case_ids)
+
+    def refresh_cases(self, case_ids):
+        """
+        Recompute the listing rows of the given cases.
+        All related data is loaded in bulk so the number of queries does not depend
+        on the number of cases. Rows of cases which no longer exist are removed.
+        Returns the number of listings written.
+        """
+        from cases.summary import CaseSummaryBuilder
+
+        case_ids = set(case_ids)
+        if not case_ids:
+            return 0
+        cases = list(
+            Case.objects.filter(id__in=case_ids)
+            .select_related("type", "stage", "workflow")
+            .annotate(
+                _participant_count=Count(
+                    "organisationcaserole",
+                    filter=~Q(organisationcaserole__role__key="preparing"),
+                    distinct=True,
+                ),
+                _submission_count=Count(
+                    "submission",
+                    filter=Q(
+                        submission__archived=False,
+                        submission__status__sent=False,
+                        submission__status__draft=False,
+                        submission__type__direction__in=[
+                            DIRECTION_TRA_TO_PUBLIC,
+                            DIRECTION_PUBLIC_TO_TRA,
+                        ],
+                    )
+                    & (
+                        Q(submission__type__in=SUBMISSION_APPLICATION_TYPES)
+                        | Q(submission__status__default=False)
+                    ),
+                    distinct=True,
+                ),
+                _has_product=Exists(Product.objects.filter(case=OuterRef("pk"))),
+                _has_case_role=Exists(OrganisationCaseRole.objects.filter(case=OuterRef("pk"))),
+                _has_source=Exists(ExportSource.objects.filter(case=OuterRef("pk"))),
+            )
+        )
+        builder = CaseSummaryBuilder(cases)
+        status_indexes = builder.status_indexes()
+        applicants = builder.applicants()
+        listings = []
+        for case in cases:
+            applicant = applicants.get(case.id)
+            value_index, action_index = status_indexes.get(case.id, ({}, {}))
+            try:
+                status = case.build_status(value_index, action_index)
+            except Case.workflow.RelatedObjectDoesNotExist:
+                status = {}
+            listings.append(
+                CaseListing(
+                    case=case,
+                    sequence=case.sequence,
+                    initiated_sequence=case.initiated_sequence,
+                    reference=case.reference,
+                    name=case.name,
+                    type=case.type,
+                    stage=case.stage,
+                    next_action=status.get("next_action"),
+                    next_action_due=status.get("next_action_due"),
+                    next_notice=status.get("next_notice"),
+                    next_notice_due=status.get("next_notice_due"),
+                    applicant=applicant.organisation if applicant else None,
+                    applicant_name=applicant.organisation.name if applicant else None,
+                    registration_deadline=case.registration_deadline,
+                    participant_count=case._participant_count,
+                    submission_count=case._submission_count,
+                    case_created_at=case.created_at,
+                    initiated_at=case.initiated_at,
+                    archived_at=case.archived_at,
+                    deleted_at=case.deleted_at,
+                    initiated=bool(case.initiated_at),
+                    partially_created=not (
+                        case._has_product
+                        and case._has_case_role
+                        and (case._has_source or case.type_id in ALL_COUNTRY_CASE_TYPES)
+                    ),
+                )
+            )
+        self.filter(case_id__in=case_ids).exclude(case_id__in=[case.id for case in cases]).delete()
+        self.bulk_create(
+            listings,
+            update_conflicts=True,
+            unique_fields=["case"],
+            update_fields=[
+                field.name for field in CaseListing._meta.concrete_fields if not field.primary_key
+            ],
+        )
+        return len(listings)
+
+    def investigator_listings(self, user=None, current=None, exclude_partially_created=True):
+        """
+        Return a listing queryset for an investigator, equivalent to
+        `CaseManager.investigator_cases` but read from the precomputed listing.
+
+        :param core.User user: The user performing the request.
+        :param bool current: If False, only archived cases will be returned.
+            If True, only non-archived cases will be returned.
+            If None, both archived and non-archived cases are returned.
+        :param bool exclude_partially_created: If True, cases that have
+            yet to be fully created will be excluded from the results.
+
+        Listings yet to be refreshed since migration 0068 are refreshed first.
+        """
+        self.refresh_unrefreshed()
+        listings = self.filter(deleted_at__isnull=True)
+        if user and not user.is_tra(with_role=SECURITY_GROUPS_TRA_TOP_LEVEL):
+            listings = listings.filter(case__usercase__user=user).distinct()
+        if current is not None:
+            listings = listings.filter(archived_at__isnull=current)
+        if exclude_partially_created:
+            listings = listings.filter(partially_created=False)
+        return listings.select_related("type", "stage", "applicant").order_by("sequence")
+
+
+class CaseListing(models.Model):
+    """
+    A denormalised, read only representation of a case holding the precomputed
+    columns needed by the case lists (reference, stage, status, applicant, counts etc.).
+    Rows are refreshed whenever the case or its related records change (see cases.receivers),
+    so that case lists can be filtered and sorted on indexed columns
+    without any further queries.
+    """
+
+    case = models.OneToOneField(
+        "cases.Case", primary_key=True, related_name="listing", on_delete=models.CASCADE
+    )
+    sequence = models.IntegerField(null=True, blank=True)
+    initiated_sequence = models.IntegerField(null=True, blank=True)
+    reference = models.CharField(max_length=20, null=True, blank=True, db_index=True)
+    name = models.CharField(max_length=250, null=True, blank=True)
+    type = models.ForeignKey(
+        "cases.CaseType", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    stage = models.ForeignKey(
+        "cases.CaseStage", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    next_action = models.CharField(max_length=250, null=True, blank=True)
+    next_action_due = models.CharField(max_length=50, null=True, blank=True)
+    next_notice = models.CharField(max_length=250, null=True, blank=True)
+    next_notice_due = models.CharField(max_length=50, null=True, blank=True)
+    applicant = models.ForeignKey(
+        "organisations.Organisation",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    applicant_name = models.CharField(max_length=250, null=True, blank=True)
+    registration_deadline = models.DateTimeField(null=True, blank=True)
+    participant_count = models.IntegerField(default=0)
+    submission_count = models.IntegerField(default=0)
+    case_created_at = models.DateTimeField(null=True, blank=True)
+    initiated_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    initiated = models.BooleanField(default=False)
+    partially_created = models.BooleanField(default=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    objects = CaseListingManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["archived_at", "sequence"],
+                name="caselisting_archived_seq_idx",
+                condition=Q(deleted_at__isnull=True, partially_created=False),
+            ),
+            models.Index(fields=["initiated", "sequence"], name="caselisting_initiated_seq_idx"),
+            models.Index(fields=["stage", "sequence"], name="caselisting_stage_seq_idx"),
+            models.Index(fields=["applicant_name"], name="caselisting_applicant_idx"),
+            models.Index(fields=["refreshed_at"], name="caselisting_refreshed_idx"),
+        ]
+
+    def __str__(self):
+        return f"Listing: {self.reference}: {self.name}"
+
+    def _format_datetime(self, value):
+        return value.strftime(settings.API_DATETIME_FORMAT) if value else None
+
+    def to_embedded_dict(self):
+        """
+        Return the same dict as `Case.to_embedded_dict` does for a case
+        viewed without a user or organisation context.
+        """
+        return {
+            "id": str(self.case_id),
+            "name": self.name,
+            "reference": self.reference,
+            "type": self.type.to_embedded_dict() if self.type else None,
+            "stage": self.stage.to_embedded_dict() if self.stage else None,
+            "archived_at": self._format_datetime(self.archived_at),
+            "created_at": self._format_datetime(self.case_created_at),
+            "user_organisations": [],
+            "initiated_at": self._format_datetime(self.initiated_at),
+            "registration_deadline": self.registration_deadline,
+            "case_status": {
+                "stage": self.stage.name if self.stage else None,
+                "next_action": self.next_action,
+                "next_action_due": self.next_action_due,
+                "next_notice": self.next_notice,
+                "next_notice_due": self.next_notice_due,
+            },
+            "organisation": (
+                {"id": str(self.applicant_id), "name": self.applicant_name}
+                if self.applicant_id
+                else None
+            ),
+        }
@@ -15,7 +15,7 @@ class Sector(models.Model):
     def __str__(self):
         return f"{self.code}: {self.name}"
 
-    @method_cache
+    @method_cache(shared=False)
     def to_dict(self):
         return {"id": self.id, "name": self.name, "code": self.code}
 
@@ -26,7 +26,7 @@ class HSCode(SimpleBaseModel):
     def __str__(self):
         return self.code
 
-    @method_cache
+    @method_cache(shared=False)
     def to_dict(self):
         return {"id": str(self.id), "code": self.code}
 
@@ -59,7 +59,7 @@ class Product(BaseModel):
     def __str__(self):
         return f"{self.sector} - {self.name}"
 
-    @method_cache
+    @method_cache(invalidated_by=["cases.Sector", "cases.HSCode", "cases.Product_hs_codes"])
     def to_dict(self):
         return {
             "id": self.id,
@@ -10,6 +10,7 @@ from titlecase import titlecase
 from audit import AUDIT_TYPE_NOTIFY
 from cases.constants import (
     CASE_TYPE_SAFEGUARDING,
+    DIRECTION_TRA_TO_PUBLIC,
     SUBMISSION_DOCUMENT_TYPE_TRA,
     SUBMISSION_TYPE_APPLICATION,
     TRA_ORGANISATION_ID,
@@ -61,6 +62,26 @@ class SubmissionManager(models.Manager):
 
         return queryset.get(id=id)
 
+    def customer_action_required(self):
+        """
+        Return all submissions sent by the TRA which are not locked,
+        as the customer has to do some more work on them.
+        """
+        return (
+            self.filter(
+                deleted_at__isnull=True,
+                status__locking=False,
+                status__default=False,
+            )
+            .filter(
+                Q(status__sent=True)
+                | Q(status__version=True)
+                | Q(status__draft=True)  # sadly, this is our only way to detect deficiency notices
+            )
+            .filter(Q(archived=False))
+            .filter(Q(type__direction=DIRECTION_TRA_TO_PUBLIC) | Q(due_at__isnull=False))
+        )
+
     def get_submissions(
         self,
         case,
@@ -20,7 +20,7 @@ class SubmissionDocumentType(models.Model):
     def __str__(self):
         return self.name
 
-    @method_cache
+    @method_cache(shared=False)
     def to_dict(self):
         return {
             "id": self.id,
@@ -120,7 +120,7 @@ class SubmissionDocument(SimpleBaseModel):
             )
         return _dict
 
-    @method_cache
+    @method_cache(invalidated_by=["cases.SubmissionDocumentType", "documents.Document"])
     def to_minimal_dict(self):
         _dict = {
             "type": self.type.to_dict(),
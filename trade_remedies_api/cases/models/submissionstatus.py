@@ -43,7 +43,7 @@ class SubmissionStatus(models.Model):
         locking_indicator = "*" if self.locking else ""
         return f"{self.type.name}: {self.name}{locking_indicator}"
 
-    @method_cache
+    @method_cache(invalidated_by=["cases.SubmissionType"])
     def to_dict(self):
         return {
             "id": self.id,
@@ -1,6 +1,7 @@
 import logging
 
 from django.db import models
+from django.db.models import DateField, Func, TextField
 from django.contrib.postgres import fields
 from core.base import BaseModel
 from workflow.models import Workflow
@@ -9,6 +10,29 @@ from workflow.models import Workflow
 logger = logging.getLogger(__name__)
 
 
+class StateValueText(Func):
+    """
+    Extract a scalar JSON state value as text (e.g. '"2020-01-01"' -> '2020-01-01')
+    """
+
+    template = "(%(expressions)s #>> '{}')"
+    output_field = TextField()
+
+
+class StateValueDate(Func):
+    """
+    Cast a JSON state value holding an ISO formatted date to a date in SQL.
+    Values which do not start with a YYYY-MM-DD date evaluate to NULL rather than
+    failing the cast.
+    """
+
+    template = (
+        "(CASE WHEN %(expressions)s #>> '{}' ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' "
+        "THEN LEFT(%(expressions)s #>> '{}', 10)::date END)"
+    )
+    output_field = DateField()
+
+
 class CaseWorkflowManager(models.Manager):
     def snapshot_from_template(self, case, template, reset_state=False, requested_by=None):
         created = True
@@ -1,11 +1,26 @@
 import logging
 
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from security.models import UserCase
+from security.models import CaseRole, OrganisationCaseRole, UserCase
 from organisations.models import Organisation
-from cases.models import Case
-from core.models import User
+from cases.enums import invalidate_case_enums
+from cases.models import (
+    ArchiveReason,
+    Case,
+    CaseListing,
+    CaseStage,
+    CaseType,
+    CaseWorkflowState,
+    ExportSource,
+    Product,
+    Sector,
+    Submission,
+    SubmissionStatus,
+    SubmissionType,
+)
+from core.models import SystemParameter, User
+from workflow.models import WorkflowTemplate
 
 
 logger = logging.getLogger(__name__)
@@ -65,3 +80,53 @@ def log_deleted_organisation(sender, instance, **kwargs):
     except AttributeError as e:
         message = f"Organisation record deleted: Unable to log all details because: {e}"
     logger.info(message)
+
+
+@receiver(post_save, sender=Case)
+def refresh_case_listing(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    CaseListing.objects.refresh_on_commit(instance.id)
+
+
+@receiver(post_save, sender=CaseWorkflowState)
+@receiver(post_save, sender=OrganisationCaseRole)
+@receiver(post_delete, sender=OrganisationCaseRole)
+@receiver(post_save, sender=Submission)
+@receiver(post_delete, sender=Submission)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ExportSource)
+@receiver(post_delete, sender=ExportSource)
+def refresh_related_case_listing(sender, instance, **kwargs):
+    """
+    Refresh the listing of the case a related record belongs to,
+    as its stage, status, applicant, counts or completeness may have changed.
+    """
+    if kwargs.get("raw"):
+        return
+    CaseListing.objects.refresh_on_commit(instance.case_id)
+
+
+@receiver(post_save, sender=Organisation)
+def refresh_applicant_case_listings(sender, instance, created, **kwargs):
+    if not created and not kwargs.get("raw"):
+        CaseListing.objects.refresh_on_commit(
+            *CaseListing.objects.filter(applicant=instance).values_list("case_id", flat=True)
+        )
+
+
+# Any change to the reference data sets invalidates the cached case enums bundles
+for enum_model in (
+    ArchiveReason,
+    CaseRole,
+    CaseStage,
+    CaseType,
+    Sector,
+    SubmissionStatus,
+    SubmissionType,
+    SystemParameter,
+    WorkflowTemplate,
+):
+    post_save.connect(invalidate_case_enums, sender=enum_model)
+    post_delete.connect(invalidate_case_enums, sender=enum_model)
@@ -19,6 +19,7 @@ from django.db import transaction, models
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.response import Response
 from rest_framework.views import APIView
 from cases.models import (
     Case,
@@ -36,15 +37,17 @@ from cases.models import (
     Product,
     HSCode,
     ExportSource,
-    ArchiveReason,
     CaseWorkflow,
     CaseWorkflowState,
+    CaseListing,
     Notice,
 )
 from core.constants import (
     STATE_INCOMPLETE,
     STATE_COMPLETE,
 )
+from cases.enums import build_case_enums, get_reference_enums, make_etag
+from cases.summary import CaseSummaryBuilder
 from cases.constants import (
     ALL_COUNTRY_CASE_TYPES,
     SUBMISSION_NOTICE_TYPES,
@@ -55,8 +58,6 @@ from cases.constants import (
     SUBMISSION_TYPE_APPLICATION,
     SUBMISSION_STATUS_APPLICATION_SUBMIT_REVIEW,
     SUBMISSION_APPLICATION_TYPES,
-    DIRECTION_BOTH,
-    DIRECTION_TRA_TO_PUBLIC,
     SUBMISSION_DOCUMENT_TYPE_DEFICIENCY,
     DECISION_TO_INITIATE_KEY,
     TRA_ORGANISATION_ID,
@@ -64,14 +65,12 @@ from cases.constants import (
     CASE_MILESTONE_DATES,
 )
 from core.utils import (
-    key_by,
     deep_index_items_by,
     pluck,
 )
-from core.models import User, SystemParameter
+from core.models import User
 from core.constants import (
     TRUTHFUL_INPUT_VALUES,
-    SAFE_COLOURS,
 )
 from contacts.models import Contact
 from security.models import UserCase, OrganisationCaseRole, CaseRole
@@ -88,8 +87,8 @@ from documents.exceptions import InvalidFile
 from audit import AUDIT_TYPE_EVENT
 from audit.utils import audit_log
 from workflow.models import WorkflowTemplate
-from django_countries import countries
 from django.utils import timezone
+from django.utils.cache import parse_etags
 
 logger = logging.getLogger(__name__)
 
@@ -282,14 +281,26 @@ class CasesAPIView(TradeRemediesApiView):
                 .order_by("sequence")
             )
         elif all_investigator_cases in TRUTHFUL_INPUT_VALUES:
-            user_cases = Case.objects.all_user_cases(user=request.user, **_kwargs)
+            user_case_ids = {
+                str(case.id) for case in Case.objects.all_user_cases(user=request.user, **_kwargs)
+            }
             all_investigator_cases = Case.objects.investigator_cases(current=True).order_by(
                 "sequence"
             )
+            if fields:
+                cases_dicts = [
+                    (case.id, case.to_embedded_dict(fields=fields))
+                    for case in all_investigator_cases
+                ]
+            else:
+                cases_dicts = [
+                    (listing.case_id, listing.to_embedded_dict())
+                    for listing in CaseListing.objects.investigator_listings(current=True)
+                ]
             cases_dict_list = []
-            for case in all_investigator_cases:
-                _dict = case.to_embedded_dict(fields=fields)
-                _dict["user_case"] = case in user_cases
+            for case_id, _dict in cases_dicts:
+                # the fields requested may not include the id
+                _dict["user_case"] = str(case_id) in user_case_ids
                 cases_dict_list.append(_dict)
             return ResponseSuccess({"results": cases_dict_list})
 
@@ -300,42 +311,29 @@ class CasesAPIView(TradeRemediesApiView):
             if outer_org_cases:
                 # Get the user-org-case objects for all users/cases in this user's org
                 # e.g. all the cases a law-firm has been involved in
-                user_cases = Case.objects.outer_user_cases(user=request.user)
-                # need to get orgs that don't have a usercase yet - so just look at the createdby.
-                user_organisations = Organisation.objects.filter(
-                    created_by__in=user.organisation_users, deleted_at__isnull=True
-                )
-                organisations = {}
-                for organisation in user_organisations:
-                    organisations[str(organisation.id)] = 1
-                for user_case in user_cases:
-                    organisations[str(user_case.organisation.id)] = 1
-                # Now link up the caseroles for each usercase
-                caseroles = OrganisationCaseRole.objects.filter(
-                    organisation__id__in=organisations.keys()
-                )
-                org_case_idx = {}
-                for caserole in caseroles:
-                    org_case_idx[str(caserole.case.id) + ":" + str(caserole.organisation.id)] = (
-                        caserole.role
-                    )
+                user_cases = Case.objects.outer_user_cases(
+                    user=request.user
+                ).with_organisation_case_roles()
                 results = []
                 for user_case in user_cases:
                     _dict = user_case.to_embedded_dict()
-                    caserole = org_case_idx.get(
-                        str(user_case.case.id) + ":" + str(user_case.organisation.id)
-                    )
+                    # Link up the case role of the organisation for each usercase
+                    caserole = user_case.organisation_case_role
                     if caserole:
-                        _dict.update({"role": caserole.to_dict()})
+                        _dict.update({"role": caserole.role.to_dict()})
                     results.append(_dict)
                 return ResponseSuccess({"results": results})
             user = User.objects.get(id=user_id) if user_id else user
             cases = Case.objects.all_user_cases(user=user, **_kwargs)
-            results = []
-            for case in cases:
-                data = case.to_embedded_dict(user=user, is_primary_contact=True, fields=fields)
+            if fields:
+                results = [
+                    case.to_embedded_dict(user=user, is_primary_contact=True, fields=fields)
+                    for case in cases
+                ]
+            else:
+                results = CaseSummaryBuilder(cases, user=user, is_primary_contact=True).build()
+            for data in results:
                 data["user_case"] = True
-                results.append(data)
             return ResponseSuccess({"results": results})
         elif case_id and self.organisation:
             case = Case.objects.select_related(
@@ -389,14 +387,14 @@ class CasesAPIView(TradeRemediesApiView):
                 return ResponseSuccess({"result": case.to_dict(fields=fields)})
             except Case.DoesNotExist:
                 raise NotFoundApiExceptions("Invalid case id or access is denied")
-        return ResponseSuccess(
-            {
-                "results": [
-                    case.to_embedded_dict(organisation=self.organisation, fields=fields)
-                    for case in cases
-                ]
-            }
-        )
+        if fields:
+            results = [
+                case.to_embedded_dict(organisation=self.organisation, fields=fields)
+                for case in cases
+            ]
+        else:
+            results = CaseSummaryBuilder(cases, organisation=self.organisation).build()
+        return ResponseSuccess({"results": results})
 
     @transaction.atomic
     def post(self, request, organisation_id=None, case_id=None, *args, **kwargs):
@@ -1790,90 +1788,29 @@ class CaseEnumsAPI(TradeRemediesApiView):
     Return all case related enums and relevant support data sets.
     A case id can be provided to return certain case specific enums, such as which submission types
     a user can create.
+
+    The reference data is served from a versioned, cached bundle (see cases.enums).
+    Responses carry a strong ETag and a `304 Not Modified` is returned when one of the
+    ETags of the client's `If-None-Match` header matches it (or it is `*`).
     """
 
     def get(self, request, case_id=None, *args, **kwargs):
-        case = None
-        available_submission_types = {}
         case_id = case_id or request.query_params.get("case_id")
-        case_types = CaseType.objects.select_related("workflow").all().order_by("order", "name")
-        available_review_types = []
-        case_stages = CaseStage.objects.select_related("type").all().order_by("order", "name")
-        case_milestone_types = [
-            (ms_type, CASE_MILESTONE_DATES[ms_type]) for ms_type in CASE_MILESTONE_DATES
-        ]
-        submission_statuses = [
-            sub_status.to_dict()
-            for sub_status in SubmissionStatus.objects.select_related("type").all().order_by("id")
-        ]
-        sectors = Sector.objects.all().order_by("id")
-        roles = [role.to_dict() for role in CaseRole.objects.all().order_by("id")]
-        statuses_by_type = deep_index_items_by(submission_statuses, "type/key")
-        archive_reasons = ArchiveReason.objects.all().order_by("name")
-        direction_kwargs = (
-            {"direction__in": [int(request.query_params["direction"]), DIRECTION_BOTH]}
-            if "direction" in request.query_params
-            else {}
-        )
+        direction = request.query_params.get("direction")
+        result, etag = get_reference_enums(direction=direction)
         if case_id:
             case = Case.objects.get_case(id=case_id)
-            submission_types = SubmissionType.objects.get_available_submission_types_for_case(
-                case, direction_kwargs
-            )
-            available_review_types = case.available_case_review_types()
+            case_enums = build_case_enums(case, direction=direction)
+            result = {**result, **case_enums}
+            etag = make_etag(etag, case_enums)
+        # weak comparison, as required for If-None-Match
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if "*" in if_none_match or etag in [tag.removeprefix("W/") for tag in if_none_match]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
         else:
-            submission_types = (
-                SubmissionType.objects.select_related("requires")
-                .filter(**direction_kwargs)
-                .order_by("order", "name")
-            )
-        _submission_types = [
-            submission_type.to_dict(case=case) for submission_type in submission_types
-        ]
-        _response_submission_types = [
-            submission_type
-            for submission_type in _submission_types
-            if submission_type.get("requires")
-        ]
-        available_submission_types = {
-            subtype["id"]: subtype["has_requirement"] for subtype in _submission_types
-        }
-
-        return ResponseSuccess(
-            {
-                "result": {
-                    "roles": roles,
-                    "role_index": key_by(roles, "key"),
-                    "approval_role_id": SystemParameter.get("AWAITING_APPROVAL_ROLE_ID"),
-                    "case_types": [case_type.to_dict() for case_type in case_types],
-                    "case_stages": [case_stage.to_dict() for case_stage in case_stages],
-                    "submission_types": _submission_types,
-                    "statuses_by_type": statuses_by_type,
-                    "submission_statuses": submission_statuses,
-                    "sectors": [sector.to_dict() for sector in sectors],
-                    "countries": list(countries),
-                    "case_worker_allowed_submission_types": [
-                        submission_type.to_dict()
-                        for submission_type in submission_types
-                        if submission_type.direction == DIRECTION_TRA_TO_PUBLIC
-                    ],
-                    "public_submission_types": [
-                        submission_type.to_dict()
-                        for submission_type in submission_types
-                        if submission_type.direction == DIRECTION_BOTH
-                    ],
-                    "submission_status_map": SubmissionType.submission_status_map(),
-                    "available_submission_types": available_submission_types,
-                    "archive_reasons": [
-                        archive_reason.to_dict() for archive_reason in archive_reasons
-                    ],
-                    "response_submission_types": _response_submission_types,
-                    "milestone_types": case_milestone_types,
-                    "available_review_types": available_review_types,
-                    "safe_colours": SAFE_COLOURS,
-                }
-            }
-        )
+            response = ResponseSuccess({"result": result})
+        response["ETag"] = etag
+        return response
 
 
 class CaseOrganisationsAPIView(TradeRemediesApiView):
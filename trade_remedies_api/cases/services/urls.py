@@ -1,6 +1,4 @@
-from django.conf import settings
 from django.urls import path
-from django.views.decorators.cache import cache_page
 from rest_framework import routers
 
 from .api import (
@@ -45,7 +43,7 @@ urlpatterns = [
     path("", CasesAPIView.as_view()),
     path("count/", CasesCountAPIView.as_view()),
     path("user/<uuid:user_id>/", CasesAPIView.as_view()),
-    path("enums/", cache_page(60 * settings.API_CACHE_TIMEOUT)(CaseEnumsAPI.as_view())),
+    path("enums/", CaseEnumsAPI.as_view()),
     path("enums/<uuid:case_id>/", CaseEnumsAPI.as_view()),
     path("<uuid:case_id>/", CasesAPIView.as_view()),
     path("<str:case_number>/public/", PublicCaseView.as_view()),
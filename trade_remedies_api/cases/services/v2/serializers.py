@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from django_restql.fields import NestedField
 from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField
@@ -59,6 +60,22 @@ class CaseSerializer(CustomValidationModelSerializer):
         model = Case
         fields = "__all__"
 
+    @staticmethod
+    def eager_load_queryset(queryset):
+        """Eager load all the fields in the queryset"""
+        return (
+            queryset.select_related("type")
+            .prefetch_related("product_set__hs_codes", "exportsource_set")
+            .annotate(
+                # read by Case.date_last_submission_made_public
+                last_issued_at=Subquery(
+                    Submission.objects.filter(case=OuterRef("pk"), issued_at__isnull=False)
+                    .order_by("-issued_at")
+                    .values("issued_at")[:1]
+                )
+            )
+        )
+
 
 class SubmissionStatusSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,203 @@
+import logging
+
+from django.db.models import prefetch_related_objects
+
+from cases.constants import SUBMISSION_APPLICATION_TYPES
+from cases.models import Case, CaseWorkflowState, Submission
+from contacts.models import CaseContact
+from security.models import OrganisationCaseRole, UserCase
+
+logger = logging.getLogger(__name__)
+
+
+class CaseSummaryBuilder:
+    """
+    Build embedded case dicts (as returned by `Case.to_embedded_dict`) for a collection
+    of cases using a fixed number of queries, regardless of the number of cases.
+
+    Related data which `Case._to_embedded_dict` would fetch case by case (applicant,
+    workflow status, user organisation state and primary contact flags) is loaded in bulk
+    up front and handed to the cases, so the output shape is identical.
+
+    Usage:
+        CaseSummaryBuilder(cases, user=request.user, is_primary_contact=True).build()
+    """
+
+    def __init__(self, cases, organisation=None, user=None, is_primary_contact=False):
+        """
+        :param cases: A Case queryset or an iterable of Case instances.
+        :param organisation: An optional organisation all cases are viewed for.
+            Cases holding their own organisation context use theirs instead.
+        :param user: An optional user the cases are viewed by.
+        :param bool is_primary_contact: If True, flag cases where the user is the primary contact.
+        """
+        self.cases = list(cases)
+        self.organisation = organisation
+        self.user = user
+        self.is_primary_contact = is_primary_contact
+        self.case_ids = [case.id for case in self.cases]
+        self._organisation_dicts = {}
+
+    def build(self):
+        """
+        Return a list of embedded dicts, one per case, in the order the cases were given.
+        """
+        if not self.cases:
+            return []
+        prefetch_related_objects(self.cases, "type", "stage", "workflow")
+        status_indexes = self.status_indexes()
+        applicants = self.applicants()
+        user_organisations = None
+        primary_case_ids = set()
+        if self.user and not self.user.is_tra():
+            user_organisations = self.user_organisations()
+            if self.is_primary_contact:
+                primary_case_ids = self.primary_case_ids()
+        results = []
+        for case in self.cases:
+            case._applicant = applicants.get(case.id)
+            if case._applicant:
+                case._applicant.organisation.set_case_context(case.case_context)
+            organisation = getattr(case, "_organisation", None) or self.organisation
+            value_index, action_index = status_indexes.get(case.id, ({}, {}))
+            summary = {
+                "case_status": case.build_status(value_index, action_index),
+                "organisation": self.organisation_dict(organisation),
+            }
+            if user_organisations is not None:
+                summary["user_organisations"] = user_organisations.get(case.id, [])
+                summary["primary"] = case.id in primary_case_ids
+            results.append(
+                case.to_embedded_dict(
+                    organisation=organisation,
+                    user=self.user,
+                    is_primary_contact=self.is_primary_contact,
+                    summary=summary,
+                )
+            )
+        return results
+
+    def organisation_dict(self, organisation):
+        """
+        Return the dict of an organisation the cases are viewed for, built once per organisation.
+        """
+        if not organisation:
+            return None
+        if organisation.id not in self._organisation_dicts:
+            self._organisation_dicts[organisation.id] = organisation.to_dict()
+        return self._organisation_dicts[organisation.id]
+
+    def status_indexes(self):
+        """
+        Return a dict of case id to a tuple of the (value_index, action_index) used
+        to build the case status, in two queries.
+        """
+        value_indexes = {}
+        states = CaseWorkflowState.objects.filter(
+            case_id__in=self.case_ids,
+            key__in=list(Case.STATUS_KEYS),
+            deleted_at__isnull=True,
+        )
+        for state in states:
+            value_indexes.setdefault(state.case_id, {})[state.key] = (state.value, state.due_date)
+        action_keys = {
+            value[0]
+            for value_index in value_indexes.values()
+            for value in value_index.values()
+            if value[0] and isinstance(value[0], str)
+        }
+        action_indexes = {}
+        if action_keys:
+            states = CaseWorkflowState.objects.filter(
+                case_id__in=value_indexes.keys(),
+                key__in=action_keys,
+                deleted_at__isnull=True,
+            )
+            for state in states:
+                action_indexes.setdefault(state.case_id, {})[state.key] = (
+                    state.value,
+                    state.due_date,
+                )
+        return {
+            case_id: (value_index, action_indexes.get(case_id, {}))
+            for case_id, value_index in value_indexes.items()
+        }
+
+    def applicants(self):
+        """
+        Return a dict of case id to the applicant OrganisationCaseRole, being the case role
+        of the organisation which made the first application submission to the case.
+        """
+        applications = (
+            Submission.objects.filter(
+                case_id__in=self.case_ids,
+                archived=False,
+                type__id__in=SUBMISSION_APPLICATION_TYPES,
+            )
+            .order_by("created_at")
+            .values_list("case_id", "organisation_id")
+        )
+        applicant_orgs = {}
+        for case_id, organisation_id in applications:
+            applicant_orgs.setdefault(case_id, organisation_id)
+        if not applicant_orgs:
+            return {}
+        case_roles = (
+            OrganisationCaseRole.objects.select_related("organisation", "role")
+            .filter(case_id__in=applicant_orgs.keys(), organisation_id__in=applicant_orgs.values())
+            .order_by("id")
+        )
+        applicants = {}
+        for case_role in case_roles:
+            if applicant_orgs.get(case_role.case_id) == case_role.organisation_id:
+                applicants.setdefault(case_role.case_id, case_role)
+        return applicants
+
+    def user_organisations(self):
+        """
+        Return a dict of case id to the list of organisations the user represents in the case,
+        each with the state of submissions awaiting the organisation.
+        See `Case.get_user_organisation_state`.
+        """
+        user_cases = UserCase.objects.select_related("organisation").filter(
+            user=self.user, case_id__in=self.case_ids, organisation__isnull=False
+        )
+        organisations = {}
+        for user_case in user_cases:
+            organisations.setdefault(user_case.case_id, []).append(user_case.organisation)
+        if not organisations:
+            return {}
+        submission_states = {}
+        submissions = (
+            Submission.objects.customer_action_required()
+            .filter(
+                case_id__in=organisations.keys(),
+                organisation_id__in={org.id for orgs in organisations.values() for org in orgs},
+            )
+            .order_by("due_at")
+            .values_list("case_id", "organisation_id", "due_at")
+        )
+        for case_id, organisation_id, due_at in submissions:
+            state = submission_states.setdefault(
+                (case_id, organisation_id), {"submission_count": 0, "due_at": due_at}
+            )
+            state["submission_count"] += 1
+        user_organisations = {}
+        for case_id, orgs in organisations.items():
+            for org in orgs:
+                org_dict = org.to_embedded_dict()
+                org_dict["org_state"] = submission_states.get(
+                    (case_id, org.id), {"submission_count": 0, "due_at": None}
+                )
+                user_organisations.setdefault(case_id, []).append(org_dict)
+        return user_organisations
+
+    def primary_case_ids(self):
+        """
+        Return the set of case ids in which the user's contact is a primary contact.
+        """
+        return set(
+            CaseContact.objects.filter(
+                case_id__in=self.case_ids, contact=self.user.contact, primary=True
+            ).values_list("case_id", flat=True)
+        )
@@ -1,14 +1,16 @@
 import logging
-from dateutil.parser import parse
 from celery import shared_task
+from django.db import transaction
 from django.utils import timezone
 from django.conf import settings
-from cases.models import TimeGateStatus, Case
-from audit.utils import audit_log
+from cases.models import TimeGateStatus, Case, CaseListing, CaseStage
+from audit.utils import bulk_audit_log, new_audit_record_to_dict
 from audit.models import AUDIT_TYPE_EVENT
 
 logger = logging.getLogger(__name__)
 
+MEASURE_EXPIRY_BATCH_SIZE = 500
+
 
 @shared_task()
 def process_timegate_actions():
@@ -45,25 +47,40 @@ def check_measure_expiry():
     """
     Check all archived cases which are not already set to Measure Expired stage,
     and determine if all their meaures are expired.
+    Expired cases are found with a single query, moved to the Measure Expired stage
+    in batches and audited with bulk inserts.
+    """
+    expired_stage = CaseStage.objects.filter(key="MEASURES_EXPIRED").first()
+    if not expired_stage:
+        logger.warning("Measures expired stage is not defined")
+        return
+    case_ids = list(
+        Case.objects.measures_expired_cases(expired_stage).values_list("id", flat=True)
+    )
+    logger.info("Cases with expired measures: %s", len(case_ids))
+    for offset in range(0, len(case_ids), MEASURE_EXPIRY_BATCH_SIZE):
+        batch = case_ids[offset : offset + MEASURE_EXPIRY_BATCH_SIZE]
+        cases = [Case(id=case_id) for case_id in batch]
+        with transaction.atomic():
+            Case.objects.bulk_set_stage(batch, expired_stage)
+            bulk_audit_log(
+                [
+                    new_audit_record_to_dict(
+                        audit_type=AUDIT_TYPE_EVENT,
+                        case=case,
+                        model=case,
+                        milestone=True,
+                        data={"message": "Measures expired"},
+                    )
+                    for case in cases
+                ],
+                batch_size=MEASURE_EXPIRY_BATCH_SIZE,
+            )
+
+
+@shared_task()
+def refresh_case_listings(case_ids):
+    """
+    Recompute the CaseListing rows of the given case ids.
     """
-    cases = Case.objects.filter(
-        initiated_at__isnull=False,
-        archived_at__isnull=False,
-    ).exclude(stage__key="MEASURES_EXPIRED")
-    for case in cases:
-        latest_expiry = case.get_state_key("LATEST_MEASURE_EXPIRY")
-        if latest_expiry and latest_expiry.value:
-            # print( TODO - remove if not needed
-            #     timezone.now().date() <= parse(latest_expiry.value).date(),
-            #     timezone.now().date(),
-            #     parse(latest_expiry.value).date(),
-            # )
-            if timezone.now().date() >= parse(latest_expiry.value).date():
-                case.set_stage_by_key("MEASURES_EXPIRED")
-                audit_log(
-                    audit_type=AUDIT_TYPE_EVENT,
-                    model=case,
-                    case=case,
-                    milestone=True,
-                    data={"message": "Measures expired"},
-                )
+    CaseListing.objects.refresh_cases(case_ids)
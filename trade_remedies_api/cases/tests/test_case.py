@@ -1,14 +1,20 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from django.conf import settings
 from django.contrib.auth.models import Group
-from django.test import TestCase
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from cases.models import (Case, CaseStage, CaseType, CaseWorkflow)
+from cases.models.case import CASE_INITIATED_SEQUENCE, CASE_SEQUENCE
 from core.models import SystemParameter, User
 from organisations.models import Organisation
+from security.models import CaseRole, OrganisationCaseRole, UserCase
 from security.constants import (ROLE_APPLICANT, SECURITY_GROUP_ORGANISATION_OWNER, SECURITY_GROUP_ORGANISATION_USER,
                                 SECURITY_GROUP_TRA_ADMINISTRATOR, SECURITY_GROUP_TRA_INVESTIGATOR)
 
@@ -110,3 +116,91 @@ class CaseTest(TestCase, CaseTestMixin):
         self.assertEqual(_stage_1, stage_1)
         self.assertEqual(_stage_2, stage_2)
         self.assertEqual(self.case.stage, stage_2)
+
+
+class AllUserCasesTest(TestCase, CaseTestMixin):
+    fixtures = get_case_fixtures()
+
+    def setUp(self):
+        self.setup_test()
+        OrganisationCaseRole.objects.filter(case=self.case).update(approved_at=timezone.now())
+
+    def add_user_cases(self, count):
+        cases = Case.objects.bulk_create(
+            [
+                Case(
+                    name=f"Case {index}",
+                    type=self.case_type,
+                    sequence=Case.objects.next_sequence_value(CASE_SEQUENCE),
+                )
+                for index in range(count)
+            ]
+        )
+        role = CaseRole.objects.get(id=ROLE_APPLICANT)
+        OrganisationCaseRole.objects.bulk_create(
+            [
+                OrganisationCaseRole(
+                    case=case, organisation=self.organisation, role=role, approved_at=timezone.now()
+                )
+                for case in cases
+            ]
+        )
+        UserCase.objects.bulk_create(
+            [
+                UserCase(case=case, user=self.user_owner, organisation=self.organisation)
+                for case in cases
+            ]
+        )
+
+    def test_case_role_context(self):
+        cases = Case.objects.all_user_cases(self.user_owner)
+        self.assertEqual(cases, [self.case])
+        self.assertEqual(cases[0]._caserole.organisation, self.organisation)
+        self.assertEqual(cases[0]._organisation, self.organisation)
+
+    def test_unapproved_case_roles_are_excluded(self):
+        OrganisationCaseRole.objects.filter(case=self.case).update(approved_at=None)
+        self.assertEqual(Case.objects.all_user_cases(self.user_owner), [])
+
+    def test_query_count_for_user_on_many_cases(self):
+        self.user_owner.is_tra()
+        with CaptureQueriesContext(connection) as single_case:
+            Case.objects.all_user_cases(self.user_owner)
+
+        self.add_user_cases(200)
+        with self.assertNumQueries(len(single_case)):
+            cases = Case.objects.all_user_cases(self.user_owner)
+        self.assertEqual(len(cases), 201)
+
+
+@override_settings(RUN_ASYNC=False)
+class CaseSequenceTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@user.com", name="Joe Public")  # /PS-IGNORE
+
+    def create_cases(self, count):
+        try:
+            return [
+                Case.objects.create(name="Concurrent case", created_by=self.user).sequence
+                for _ in range(count)
+            ]
+        finally:
+            connections.close_all()
+
+    def test_sequences_follow_on(self):
+        case = Case.objects.create(name="Case", created_by=self.user)
+        next_case = Case.objects.create(name="Next case", created_by=self.user)
+        self.assertEqual(next_case.sequence, case.sequence + 1)
+        initiated_sequence = Case.objects.next_sequence_value(CASE_INITIATED_SEQUENCE)
+        next_case.initiated_at = timezone.now()
+        next_case.save()
+        self.assertEqual(next_case.initiated_sequence, initiated_sequence + 1)
+
+    def test_concurrent_case_creation(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self.create_cases, [5] * 8))
+        sequences = [sequence for result in results for sequence in result]
+        self.assertEqual(len(sequences), 40)
+        self.assertEqual(len(set(sequences)), 40)
+        self.assertEqual(sorted(sequences), sorted(Case.objects.values_list("sequence", flat=True)))
+        self.assertGreater(Case.objects.next_sequence_value(CASE_SEQUENCE), max(sequences))
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from cases.enums import build_reference_enums, get_enums_version, get_reference_enums, make_etag
+from cases.models import CaseType, Sector
+from cases.services.api import CaseEnumsAPI
+from cases.tests.test_case import get_case_fixtures, load_system_params
+from config.test_bases import password
+from core.models import User
+
+
+class CaseEnumsTest(TestCase):
+    fixtures = get_case_fixtures()
+
+    def setUp(self):
+        load_system_params()
+        cache.clear()
+
+    def test_reference_enums_are_cached(self):
+        enums, etag = get_reference_enums()
+        self.assertEqual(enums, build_reference_enums())
+        self.assertEqual(etag, make_etag(enums))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_reference_enums(), (enums, etag))
+
+    def test_reference_enums_cached_per_direction(self):
+        get_reference_enums()
+        enums, _ = get_reference_enums(direction="1")
+        self.assertEqual(enums, build_reference_enums(direction="1"))
+
+    def test_reference_change_invalidates_bundle(self):
+        version = get_enums_version()
+        enums, etag = get_reference_enums()
+        Sector.objects.create(name="New sector", code="NS1")
+        self.assertNotEqual(get_enums_version(), version)
+        new_enums, new_etag = get_reference_enums()
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(len(new_enums["sectors"]), len(enums["sectors"]) + 1)
+
+    def test_workflow_template_change_invalidates_bundle(self):
+        case_type = CaseType.objects.exclude(workflow=None).first()
+        get_reference_enums()
+        case_type.workflow.name = "Renamed workflow"
+        case_type.workflow.save()
+        enums, _ = get_reference_enums()
+        workflows = {item["id"]: item["workflow"] for item in enums["case_types"]}
+        self.assertEqual(workflows[str(case_type.id)]["name"], "Renamed workflow")
+
+
+class CaseEnumsAPITest(TestCase):
+    fixtures = get_case_fixtures()
+
+    def setUp(self):
+        load_system_params()
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="enums@example.com", password=password  # /PS-IGNORE
+        )
+
+    def get(self, **headers):
+        request = APIRequestFactory().get("/api/v1/cases/enums/", **headers)
+        force_authenticate(request, user=self.user)
+        return CaseEnumsAPI.as_view()(request)
+
+    def test_etag(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        _, etag = get_reference_enums()
+        self.assertEqual(response["ETag"], etag)
+
+    def test_not_modified(self):
+        etag = self.get()["ETag"]
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            response = self.get(HTTP_IF_NONE_MATCH=if_none_match)
+            self.assertEqual(response.status_code, 304, if_none_match)
+            self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
@@ -0,0 +1,108 @@
+import uuid
+
+from django.db import transaction
+from django.test import TestCase
+
+from cases.constants import SUBMISSION_TYPE_APPLICATION
+from cases.models import (
+    Case,
+    CaseListing,
+    CaseStage,
+    CaseWorkflowState,
+    ExportSource,
+    Product,
+    Sector,
+    Submission,
+    SubmissionType,
+)
+from cases.models.listing import UNREFRESHED_AT
+from cases.tests.test_case import CaseTestMixin, get_case_fixtures
+
+
+class CaseListingTest(TestCase, CaseTestMixin):
+    fixtures = get_case_fixtures()
+
+    def setUp(self):
+        self.setup_test()
+        submission_type = SubmissionType.objects.get(id=SUBMISSION_TYPE_APPLICATION)
+        Submission.objects.create(
+            type=submission_type,
+            status=submission_type.default_status,
+            case=self.case,
+            organisation=self.organisation,
+            contact=self.user_owner.contact,
+            created_by=self.user_owner,
+        )
+        CaseWorkflowState.objects.set_next_action(self.case, "INIT_ASSESS")
+
+    def complete_case(self):
+        sector = Sector.objects.create(name="Sector", code="S1")
+        Product.objects.create(case=self.case, name="Widgets", sector=sector)
+        ExportSource.objects.create(case=self.case, country="CN")
+
+    def test_listing_matches_embedded_dict(self):
+        CaseListing.objects.refresh_cases([self.case.id])
+        listing = CaseListing.objects.get(case=self.case)
+        case = Case.objects.get(id=self.case.id)
+        self.assertEqual(listing.to_embedded_dict(), case.to_embedded_dict())
+        self.assertEqual(listing.applicant_name, self.organisation.name)
+
+    def test_partially_created_cases_are_excluded(self):
+        CaseListing.objects.refresh_cases([self.case.id])
+        self.assertTrue(CaseListing.objects.get(case=self.case).partially_created)
+        self.assertFalse(CaseListing.objects.investigator_listings().exists())
+
+        self.complete_case()
+        CaseListing.objects.refresh_cases([self.case.id])
+        self.assertEqual(
+            list(CaseListing.objects.investigator_listings().values_list("case_id", flat=True)),
+            list(Case.objects.investigator_cases().values_list("id", flat=True)),
+        )
+
+    def test_listing_refreshed_on_change(self):
+        stage = CaseStage.objects.get(key="APPLICATION_RECEIVED")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.case.set_stage(stage)
+        listing = CaseListing.objects.get(case=self.case)
+        self.assertEqual(listing.stage, stage)
+
+    def test_refresh_updates_existing_listing(self):
+        CaseListing.objects.refresh_cases([self.case.id])
+        CaseListing.objects.filter(case=self.case).update(name="Stale")
+        self.case.name = "Renamed"
+        self.case.save()
+        CaseListing.objects.refresh_cases([self.case.id])
+        self.assertEqual(CaseListing.objects.get(case=self.case).name, "Renamed")
+
+    def test_refreshes_are_collected_per_transaction(self):
+        other_case_id = uuid.uuid4()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.case.save()
+            self.complete_case()
+            CaseListing.objects.refresh_on_commit(other_case_id)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            callbacks[0].__self__.case_ids, {str(self.case.id), str(other_case_id)}
+        )
+
+    def test_refreshes_rolled_back_are_discarded(self):
+        rolled_back_case_id, case_id = uuid.uuid4(), uuid.uuid4()
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    CaseListing.objects.refresh_on_commit(rolled_back_case_id)
+                    raise ValueError()
+            CaseListing.objects.refresh_on_commit(case_id)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(callbacks[0].__self__.case_ids, {str(case_id)})
+
+    def test_unrefreshed_listings_are_refreshed_when_read(self):
+        CaseListing.objects.refresh_cases([self.case.id])
+        next_action = CaseListing.objects.get(case=self.case).next_action
+        CaseListing.objects.filter(case=self.case).update(
+            next_action=None, refreshed_at=UNREFRESHED_AT
+        )
+        list(CaseListing.objects.investigator_listings(exclude_partially_created=False))
+        listing = CaseListing.objects.get(case=self.case)
+        self.assertEqual(listing.next_action, next_action)
+        self.assertNotEqual(listing.refreshed_at, UNREFRESHED_AT)
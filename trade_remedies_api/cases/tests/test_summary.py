@@ -0,0 +1,67 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from cases.constants import SUBMISSION_TYPE_APPLICATION
+from cases.models import Case, CaseWorkflow, CaseWorkflowState, Submission, SubmissionType
+from cases.summary import CaseSummaryBuilder
+from cases.tests.test_case import CaseTestMixin, get_case_fixtures
+from security.constants import ROLE_APPLICANT
+
+
+class CaseSummaryBuilderTest(TestCase, CaseTestMixin):
+    fixtures = get_case_fixtures()
+
+    def setUp(self):
+        self.setup_test()
+        self.add_case_data(self.case)
+
+    def add_case_data(self, case):
+        submission_type = SubmissionType.objects.get(id=SUBMISSION_TYPE_APPLICATION)
+        Submission.objects.create(
+            type=submission_type,
+            status=submission_type.default_status,
+            case=case,
+            organisation=self.organisation,
+            contact=self.user_owner.contact,
+            created_by=self.user_owner,
+        )
+        CaseWorkflowState.objects.set_next_action(case, "INIT_ASSESS")
+
+    def create_case(self, name):
+        case = Case.objects.create(name=name, created_by=self.user_owner, type=self.case_type)
+        CaseWorkflow.objects.snapshot_from_template(case, case.type.workflow)
+        self.organisation.assign_case(case, ROLE_APPLICANT)
+        case.assign_organisation_user(self.user_owner, self.organisation)
+        self.add_case_data(case)
+        return case
+
+    def test_matches_embedded_dict(self):
+        case = Case.objects.get(id=self.case.id)
+        expected = case.to_embedded_dict(user=self.user_owner, is_primary_contact=True)
+        summary = CaseSummaryBuilder(
+            Case.objects.filter(id=self.case.id), user=self.user_owner, is_primary_contact=True
+        ).build()
+        self.assertEqual(summary, [expected])
+
+    def test_matches_embedded_dict_for_organisation(self):
+        case = Case.objects.get(id=self.case.id)
+        expected = case.to_embedded_dict(organisation=self.organisation)
+        summary = CaseSummaryBuilder(
+            Case.objects.filter(id=self.case.id), organisation=self.organisation
+        ).build()
+        self.assertEqual(summary, [expected])
+
+    def test_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as single_case:
+            CaseSummaryBuilder(
+                Case.objects.filter(id=self.case.id), user=self.user_owner, is_primary_contact=True
+            ).build()
+
+        for index in range(5):
+            self.create_case(f"Case {index}")
+        with self.assertNumQueries(len(single_case)):
+            summary = CaseSummaryBuilder(
+                Case.objects.all(), user=self.user_owner, is_primary_contact=True
+            ).build()
+        self.assertEqual(len(summary), 6)
@@ -1,11 +1,15 @@
 from datetime import datetime
 
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from freezegun import freeze_time
 
-from cases.models import CaseWorkflowState, TimeGateStatus
-from cases.tasks import process_timegate_actions
+from audit.models import Audit
+from cases.models import Case, CaseWorkflowState, TimeGateStatus
+from cases.tasks import check_measure_expiry, process_timegate_actions
 from cases.tests.test_case import CaseTestMixin, get_case_fixtures
 
 
@@ -29,3 +33,69 @@ class ProcessTimeGateActionsTest(TestCase, CaseTestMixin):
         )
         updated_status = TimeGateStatus.objects.get(workflow_state=self.workflow_state)
         self.assertEqual(updated_status.ack_at, timezone.now())
+
+
+class CheckMeasureExpiryTest(TestCase, CaseTestMixin):
+    fixtures = get_case_fixtures()
+
+    def setUp(self):
+        self.setup_test()
+        self.case.initiated_at = timezone.make_aware(datetime(2018, 1, 1))
+        self.case.archived_at = timezone.make_aware(datetime(2018, 6, 1))
+        self.case.save()
+
+    @freeze_time("2019-01-10 10:00:00")
+    def test_expired_case_moves_stage(self):
+        self.case.set_milestone("LATEST_MEASURE_EXPIRY", "2019-01-09", self.user_owner)
+        check_measure_expiry()
+
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.stage.key, "MEASURES_EXPIRED")
+        self.assertEqual(
+            CaseWorkflowState.objects.get(
+                case=self.case, key="LAST_RESTRICTED_FLOW_STAGE_ID"
+            ).value,
+            str(self.case.stage.id),
+        )
+        self.assertTrue(
+            Audit.objects.filter(
+                case_id=self.case.id, milestone=True, data__message="Measures expired"
+            ).exists()
+        )
+
+    @freeze_time("2019-01-10 10:00:00")
+    def test_unexpired_case_is_untouched(self):
+        self.case.set_milestone("LATEST_MEASURE_EXPIRY", "2019-01-11", self.user_owner)
+        check_measure_expiry()
+
+        self.case.refresh_from_db()
+        self.assertIsNone(self.case.stage)
+
+    @freeze_time("2019-01-10 10:00:00")
+    def test_invalid_expiry_value_is_ignored(self):
+        CaseWorkflowState.objects.set_value(self.case, "LATEST_MEASURE_EXPIRY", "n/a")
+        check_measure_expiry()
+
+        self.case.refresh_from_db()
+        self.assertIsNone(self.case.stage)
+
+    @freeze_time("2019-01-10 10:00:00")
+    def test_sweep_query_count_is_constant(self):
+        ContentType.objects.get_for_model(Case)
+        self.case.set_milestone("LATEST_MEASURE_EXPIRY", "2019-01-01", self.user_owner)
+        with CaptureQueriesContext(connection) as single_case:
+            check_measure_expiry()
+
+        for index in range(5):
+            case = Case.objects.create(
+                name=f"Case {index}",
+                type=self.case_type,
+                initiated_at=timezone.make_aware(datetime(2018, 1, 1)),
+                archived_at=timezone.make_aware(datetime(2018, 6, 1)),
+            )
+            case.set_milestone("LATEST_MEASURE_EXPIRY", "2019-01-01", self.user_owner)
+        with CaptureQueriesContext(connection) as many_cases:
+            check_measure_expiry()
+
+        self.assertEqual(len(single_case), len(many_cases))
+        self.assertEqual(Case.objects.filter(stage__key="MEASURES_EXPIRED").count(), 6)
@@ -39,6 +39,7 @@ class CloudFoundrySettings(BaseSettings):
     CELERY_LOGLEVEL: str = "INFO"
     CELERY_BROKER_URL: str = "redis://redis:6379"
     COMPANIES_HOUSE_API_KEY: Optional[str] = None
+    COMPANIES_HOUSE_BACKEND: str = "api"
     DB_MAX_CONNS: int = 10
     DEBUG: bool = False
     DISABLE_COLLECTSTATIC: int = 1
@@ -13,5 +13,13 @@ class InvalidSerializerError(APIException):
         self.detail["serializer_name"] = serializer.__class__.__name__
 
 
+class QueryTooExpensiveError(APIException):
+    """The query of a filtered list is estimated to be too expensive to run."""
+
+    status_code = 400
+    default_detail = "The filter_parameters of the request would make the query too expensive."
+    default_code = "query_too_expensive"
+
+
 class BreakNoCommitTransaction(Exception):
     pass
@@ -0,0 +1,286 @@
+"""
+The filter_parameters query language of the v2 viewsets (see BaseModelViewSet.get_queryset).
+
+filter_parameters is a base64 encoded JSON object of lookups to values, for example
+{"name__icontains": "steel", "case__type_id": 1}. A lookup is a path of fields, optionally
+followed by an operator (see FILTER_OPERATORS), and must be allowed by the viewset's
+filter_parameters_fields:
+
+    None: any field of the model, or of the models it relates to through at most
+        filter_parameters_max_relations single-valued relations, with any operator, except
+        the fields of many-valued relations.
+    {"name": ["exact", "icontains"], "organisationuser__user": "__all__"}: only these paths
+        (of field names), with these operators. Paths may follow many-valued relations.
+
+The SECRET_FIELDS (passwords, tokens, login codes...) can never be filtered on.
+
+The single-valued relations followed by lookups are added to select_related, so the related
+objects are loaded with the join the filter needs anyway. The plan of the filtered queryset is
+estimated with EXPLAIN, and the query rejected if its total cost is above
+API_FILTER_MAX_QUERY_COST. The lookups used are counted per model, path and operator, with
+whether the field is indexed, and the most used are logged every 1000 filtered querysets to
+guide the creation of indexes.
+"""
+
+import base64
+import binascii
+import json
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import ValidationError
+
+from config.exceptions import QueryTooExpensiveError
+
+logger = logging.getLogger(__name__)
+
+ALL_OPERATORS = "__all__"
+FILTER_OPERATORS = frozenset(
+    (
+        "exact",
+        "iexact",
+        "in",
+        "isnull",
+        "gt",
+        "gte",
+        "lt",
+        "lte",
+        "range",
+        "contains",
+        "icontains",
+        "startswith",
+        "istartswith",
+    )
+)
+
+# Fields which can never be filtered on, even through a relation or when allowed by a viewset,
+# as their values could be guessed a character at a time with startswith lookups
+SECRET_FIELDS = frozenset(
+    (
+        "authtoken.Token.key",
+        "core.PasswordResetRequest.token",
+        "core.TwoFactorAuth.code",
+        "core.User.login_code",
+        "core.User.password",
+        "core.UserProfile.email_verify_code",
+    )
+)
+
+
+def invalid_filter(message):
+    return ValidationError({"filter_parameters": [message]})
+
+
+def decode_filter_parameters(value):
+    """
+    Decode a base64 (standard or URL safe) encoded JSON object of lookups to values.
+    """
+    # a + may have been decoded as a space from the query string
+    value = value.replace(" ", "+").replace("+", "-").replace("/", "_")
+    try:
+        filter_parameters = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+    except (binascii.Error, ValueError):
+        raise invalid_filter("Must be a base64 encoded JSON object.")
+    if not isinstance(filter_parameters, dict):
+        raise invalid_filter("Must be a base64 encoded JSON object.")
+    return filter_parameters
+
+
+def is_indexed(field):
+    """
+    Return True if a field is the first column of an index of its model's table.
+    """
+    if not field.concrete:
+        return False
+    if field.primary_key or field.unique or field.db_index:
+        return True
+    meta = field.model._meta
+    return any(
+        index.fields and index.fields[0].lstrip("-") == field.name for index in meta.indexes
+    ) or any(fields[0] == field.name for fields in meta.unique_together)
+
+
+class Lookup:
+    """
+    A lookup of filter_parameters, resolved against a model.
+    """
+
+    def __init__(self, model, lookup):
+        self.model = model
+        parts = lookup.split(LOOKUP_SEP)
+        self.operator = "exact"
+        if len(parts) > 1 and parts[-1] in FILTER_OPERATORS:
+            self.operator = parts.pop()
+        names = []
+        # the relations followed: (path, many-valued)
+        self.relations = []
+        field = None
+        for part in parts:
+            if field is not None:
+                if not field.is_relation or field.related_model is None:
+                    raise invalid_filter(f"{lookup}: {field.name} is not a relation.")
+                many_valued = field.one_to_many or field.many_to_many
+                self.relations.append((LOOKUP_SEP.join(names), many_valued))
+                model = field.related_model
+            try:
+                field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+            except FieldDoesNotExist:
+                raise invalid_filter(f"{lookup}: unknown field {part}.")
+            if f"{model._meta.label}.{field.name}" in SECRET_FIELDS:
+                raise invalid_filter(f"{lookup}: {part} cannot be filtered.")
+            names.append(field.name)
+        self.field = field
+        self.path = LOOKUP_SEP.join(names)
+
+    @property
+    def many_valued(self):
+        """
+        True if the lookup follows a many-valued relation, or ends with one (e.g.
+        {"organisationuser__isnull": false}), both of which join many rows per object.
+        """
+        return any(many_valued for _, many_valued in self.relations) or bool(
+            self.field.one_to_many or self.field.many_to_many
+        )
+
+    @property
+    def lookup(self):
+        return f"{self.path}{LOOKUP_SEP}{self.operator}"
+
+    @property
+    def select_related(self):
+        """
+        The single-valued relations to select with the filtered objects.
+        """
+        relations = self.relations
+        if relations and self.field.primary_key:
+            # filtering on the primary key of a related object does not need a join
+            relations = relations[:-1]
+        if any(many_valued for _, many_valued in relations):
+            return []
+        return [path for path, _ in relations]
+
+    def check_allowed(self, allowed_fields, max_relations):
+        if allowed_fields is None:
+            if self.many_valued:
+                raise invalid_filter(f"{self.path}: many-valued relations cannot be filtered.")
+            if len(self.relations) > max_relations:
+                raise invalid_filter(f"{self.path}: too many relations.")
+            return
+        operators = allowed_fields.get(self.path)
+        if operators is None:
+            raise invalid_filter(f"{self.path}: cannot be filtered.")
+        if operators != ALL_OPERATORS and self.operator not in operators:
+            raise invalid_filter(f"{self.path}: cannot be filtered with {self.operator}.")
+
+    def check_value(self, value):
+        if self.operator == "in" and not isinstance(value, list):
+            raise invalid_filter(f"{self.lookup}: must be a list.")
+        if self.operator == "range" and not (isinstance(value, list) and len(value) == 2):
+            raise invalid_filter(f"{self.lookup}: must be a list of two values.")
+        if self.operator == "isnull" and not isinstance(value, bool):
+            raise invalid_filter(f"{self.lookup}: must be true or false.")
+
+
+class FilterStats:
+    """
+    Counts the lookups used to filter querysets, and the querysets rejected as too expensive.
+    """
+
+    def __init__(self, report_every=1000):
+        self.report_every = report_every
+        self.lookups = Counter()
+        self.rejected = Counter()
+        self.querysets = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(lookup):
+        return lookup.model._meta.label, lookup.path, lookup.operator, is_indexed(lookup.field)
+
+    def record(self, lookups, rejected=False):
+        keys = [self.key(lookup) for lookup in lookups]
+        with self.lock:
+            (self.rejected if rejected else self.lookups).update(keys)
+            self.querysets += 1
+            report = self.report_every and self.querysets % self.report_every == 0
+        if report:
+            logger.info(f"Most used filters: {self.most_common(10)}")
+
+    def most_common(self, count=None):
+        """
+        Return the most used lookups, with whether their field is indexed and the number
+        of times they were used and rejected.
+        """
+        with self.lock:
+            return [
+                {
+                    "model": model,
+                    "path": path,
+                    "operator": operator,
+                    "indexed": indexed,
+                    "count": used,
+                    "rejected": self.rejected[model, path, operator, indexed],
+                }
+                for (model, path, operator, indexed), used in (self.lookups + self.rejected)
+                .most_common(count)
+            ]
+
+
+filter_stats = FilterStats()
+
+
+def estimate_query_cost(queryset):
+    """
+    Return the total cost of the plan of a queryset, estimated by EXPLAIN, or None if the
+    database is not PostgreSQL.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.explain(format="json"))
+    return plan[0]["Plan"]["Total Cost"]
+
+
+def filter_queryset(queryset, filter_parameters, allowed_fields=None, max_relations=2):
+    """
+    Filter a queryset with decoded filter_parameters (see decode_filter_parameters).
+    Returns the filtered queryset, and the resolved lookups.
+    """
+    lookups = []
+    filters = {}
+    for lookup, value in filter_parameters.items():
+        lookup = Lookup(queryset.model, lookup)
+        lookup.check_allowed(allowed_fields, max_relations)
+        lookup.check_value(value)
+        filters[lookup.lookup] = value
+        lookups.append(lookup)
+    try:
+        queryset = queryset.filter(**filters)
+    except (DjangoValidationError, ValueError, TypeError) as e:
+        raise invalid_filter(f"Invalid value: {e}")
+    select_related = [path for lookup in lookups for path in lookup.select_related]
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    return queryset, lookups
+
+
+def check_query_cost(queryset, lookups):
+    """
+    Raise QueryTooExpensiveError if the estimated cost of a filtered queryset is above
+    API_FILTER_MAX_QUERY_COST, and record the lookups used.
+    """
+    max_cost = settings.API_FILTER_MAX_QUERY_COST
+    cost = estimate_query_cost(queryset) if max_cost is not None else None
+    rejected = cost is not None and cost > max_cost
+    filter_stats.record(lookups, rejected=rejected)
+    if rejected:
+        logger.warning(
+            f"Rejected filter of {queryset.model._meta.label} with an estimated cost of {cost}",
+            extra={"filters": [lookup.lookup for lookup in lookups]},
+        )
+        raise QueryTooExpensiveError()
@@ -3,6 +3,7 @@ import importlib
 from django.conf import settings
 from sentry_sdk import set_user
 import time
+from core.memoize import request_memo
 from core.services.exceptions import AccessDenied
 
 
@@ -40,6 +41,16 @@ class OriginValidator(MiddlewareMixin):
             raise AccessDenied("Access denied. Required headers missing.")
 
 
+class MethodCacheMiddleware(MiddlewareMixin):
+    """
+    Memoizes the values of model methods for the duration of each request (see core.memoize).
+    """
+
+    def __call__(self, request):
+        with request_memo():
+            return self.get_response(request)
+
+
 class SentryContextMiddleware(MiddlewareMixin):
     """
     Sets sentry context during each request/response so we can identify unique users
@@ -1,5 +1,65 @@
+"""
+API rate limiting.
+
+Requests are limited per client (user, or IP address for anonymous requests), with a sliding
+window kept in Redis: the timestamps of the client's hits in the window
+are kept in a sorted set, which a Lua script trims, counts and adds to atomically, in a single
+round trip.
+
+Most clients are far below their limit, so each process also keeps a local token bucket per
+client, filled from the count Redis last returned: while a client has local tokens left, its
+hits are allowed without a round trip to Redis and recorded with its next one. A client only
+gets local tokens while under API_RATELIMIT_LOCAL_FRACTION of its limit, and its bucket
+is synced at least every API_RATELIMIT_LOCAL_SYNC_SECONDS, so the hits allowed locally
+cannot take it over its limit unless many processes serve it at once.
+
+The requests to all views share a single limit of API_RATELIMIT_RATE per client, except for
+the view classes setting their own rate with the `ratelimit_rate` attribute, which are limited
+separately.
+"""
+
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
 from django.conf import settings
+from django.core.cache import caches
 from django.http import JsonResponse
+from django_ratelimit.core import user_or_ip
+from django_ratelimit.exceptions import Ratelimited
+
+RATELIMIT_CACHE_KEY = "ratelimit:{group}:{client}"
+RATELIMIT_DEFAULT_GROUP = "api"
+
+_PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+_RATE_RE = re.compile(r"(\d+)/(\d*)([smhd])?$")
+
+# Trim the client's window, then record its pending (locally allowed) hits, and the new hit
+# if the client is under its limit. Returns whether the new hit is allowed and the number of
+# hits in the window.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local pending = tonumber(ARGV[4])
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now - window)
+local count = redis.call("ZCARD", KEYS[1])
+local allowed = 0
+local hits = pending
+if count + pending < limit then
+    allowed = 1
+    hits = hits + 1
+end
+for i = 1, hits do
+    redis.call("ZADD", KEYS[1], now, ARGV[5] .. ":" .. i)
+end
+if hits > 0 then
+    redis.call("PEXPIRE", KEYS[1], window)
+end
+return {allowed, count + hits}
+"""
 
 
 def get_rate(group, request):
@@ -20,3 +80,155 @@ def ratelimited_error(request, exception):
     # logging to sentry so we know
     capture_exception(exception)
     return JsonResponse({"error": "ratelimited"}, status=429)
+
+
+def parse_rate(rate):
+    """
+    Parse a rate such as "500/m" or "10/5s" into a (limit, window in seconds) tuple.
+    """
+    limit, multiplier, period = _RATE_RE.match(rate).groups()
+    return int(limit), _PERIODS[period or "s"] * int(multiplier or 1)
+
+
+class RedisSlidingWindow:
+    """
+    Sliding window counters in Redis, updated atomically by a Lua script.
+    """
+
+    def __init__(self, client):
+        self.script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def hit(self, key, limit, window, pending=0):
+        """
+        Record the pending hits of a client, and a new hit if it is under its limit.
+        Returns whether the new hit is allowed, and the number of hits in the window.
+        """
+        allowed, count = self.script(
+            keys=[key],
+            args=[int(time.time() * 1000), window * 1000, limit, pending, uuid.uuid4().hex],
+        )
+        return bool(allowed), int(count)
+
+
+class CacheSlidingWindow:
+    """
+    Sliding window counters in any Django cache, for environments without Redis (local
+    development, tests). Updates are not atomic.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, key, limit, window, pending=0):
+        now = time.time()
+        hits = [hit for hit in self.cache.get(key, []) if hit > now - window]
+        count = len(hits)
+        allowed = count + pending < limit
+        hits += [now] * (pending + allowed)
+        self.cache.set(key, hits, window)
+        return allowed, len(hits)
+
+
+class LocalBucket:
+    def __init__(self):
+        self.tokens = 0
+        self.pending = 0
+        self.synced_at = 0
+
+
+class RateLimiter:
+    """
+    A sliding window rate limiter, with a local token bucket pre-check per client.
+    """
+
+    def __init__(
+        self,
+        window_counter,
+        local_fraction=0.5,
+        local_sync_seconds=1,
+        max_local_clients=10000,
+        clock=time.monotonic,
+    ):
+        self.window_counter = window_counter
+        self.local_fraction = local_fraction
+        self.local_sync_seconds = local_sync_seconds
+        self.max_local_clients = max_local_clients
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_allowed(self, key, rate):
+        """
+        Record a hit of a client (key) and return True if it is within the rate.
+        """
+        limit, window = parse_rate(rate)
+        now = self.clock()
+        with self.lock:
+            bucket = self.buckets.pop(key, None) or LocalBucket()
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_local_clients:
+                self.buckets.popitem(last=False)
+            if bucket.tokens > 0 and now - bucket.synced_at < self.local_sync_seconds:
+                # clearly under the limit, so allowed without a round trip
+                bucket.tokens -= 1
+                bucket.pending += 1
+                return True
+            pending, bucket.pending, bucket.tokens = bucket.pending, 0, 0
+        allowed, count = self.window_counter.hit(key, limit, window, pending=pending)
+        with self.lock:
+            bucket.tokens = max(0, int(limit * self.local_fraction) - count)
+            bucket.synced_at = now
+        return allowed
+
+
+_limiter = None
+
+
+def get_limiter():
+    """
+    Return the rate limiter of the current process, counting hits in Redis if the
+    rate limit cache (RATELIMIT_USE_CACHE) is a Redis cache, or in the cache itself otherwise.
+    """
+    global _limiter
+    if _limiter is None:
+        cache = caches[getattr(settings, "RATELIMIT_USE_CACHE", "default")]
+        try:
+            from django_redis import get_redis_connection
+
+            window_counter = RedisSlidingWindow(
+                get_redis_connection(getattr(settings, "RATELIMIT_USE_CACHE", "default"))
+            )
+        except (ImportError, NotImplementedError):
+            window_counter = CacheSlidingWindow(cache)
+        _limiter = RateLimiter(
+            window_counter,
+            local_fraction=settings.API_RATELIMIT_LOCAL_FRACTION,
+            local_sync_seconds=settings.API_RATELIMIT_LOCAL_SYNC_SECONDS,
+        )
+    return _limiter
+
+
+class RateLimitMixin:
+    """
+    Rate limit the requests to a view class (see get_rate), within the limit shared by all
+    views, or within its own limit if it sets its own rate with the `ratelimit_rate` attribute.
+    """
+
+    ratelimit_rate = None
+
+    def dispatch(self, request, *args, **kwargs):
+        self.check_rate_limit(request)
+        return super().dispatch(request, *args, **kwargs)
+
+    def check_rate_limit(self, request):
+        group = RATELIMIT_DEFAULT_GROUP
+        if self.ratelimit_rate:
+            group = f"{type(self).__module__}.{type(self).__qualname__}"
+        rate = get_rate(group, request)
+        if not rate:
+            return
+        key = RATELIMIT_CACHE_KEY.format(group=group, client=user_or_ip(request))
+        allowed = get_limiter().is_allowed(key, self.ratelimit_rate or rate)
+        request.limited = not allowed or getattr(request, "limited", False)
+        if not allowed:
+            raise Ratelimited()
@@ -1,3 +1,5 @@
+import copy
+import threading
 import typing
 
 from collections import OrderedDict, defaultdict
@@ -337,3 +339,74 @@ class ReadOnlyModelMixinSerializer:
         for field in fields.values():
             field.read_only = True
         return fields
+
+
+class CachedFieldsMixin:
+    """
+    Builds the fields of a serializer class once, and gives each serializer a copy of them.
+    A ModelSerializer otherwise introspects its model to build its fields for every serializer,
+    including every nested serializer. Only for serializers whose fields do not depend on the
+    instance or context.
+    """
+
+    def get_fields(self):
+        serializer_class = type(self)
+        fields = serializer_class.__dict__.get("_cached_fields")
+        if fields is None:
+            fields = serializer_class._cached_fields = super().get_fields()
+        return copy.deepcopy(fields)
+
+
+SERIALIZER_MODE_READ_ONLY = "read_only"
+SERIALIZER_MODE_SLIM = "slim"
+SERIALIZER_MODE_SLIM_READ_ONLY = "slim_read_only"
+
+_serializer_classes = {}
+_serializer_classes_lock = threading.Lock()
+
+
+def build_serializer_class(model_class, base_serializer, mode):
+    """
+    Return a new serializer class of a model, derived from a base serializer:
+        read_only: the base serializer, with all its fields read-only
+        slim: a serializer of the model fields only, without any computed fields
+        slim_read_only: the slim serializer, with all its fields read-only
+    """
+    bases = (CachedFieldsMixin, base_serializer)
+    if mode in (SERIALIZER_MODE_READ_ONLY, SERIALIZER_MODE_SLIM_READ_ONLY):
+        bases = (ReadOnlyModelMixinSerializer,) + bases
+
+    if mode == SERIALIZER_MODE_READ_ONLY:
+
+        class ReadOnlyModelSerializer(*bases):
+            def __repr__(self):
+                return f"<ReadOnlyModelSerializer for {model_class}>"
+
+        return ReadOnlyModelSerializer
+
+    class SlimSerializer(*bases):
+        class Meta:
+            model = model_class
+            fields = "__all__"
+
+        def __repr__(self):
+            return f"<SlimSerializer for {model_class}>"
+
+    return SlimSerializer
+
+
+def get_serializer_class_for(model_class, base_serializer, mode):
+    """
+    Return the serializer class of a model, base serializer and mode (see
+    build_serializer_class), built once per process.
+    """
+    key = (model_class, base_serializer, mode)
+    serializer_class = _serializer_classes.get(key)
+    if serializer_class is None:
+        with _serializer_classes_lock:
+            serializer_class = _serializer_classes.get(key)
+            if serializer_class is None:
+                serializer_class = _serializer_classes[key] = build_serializer_class(
+                    model_class, base_serializer, mode
+                )
+    return serializer_class
@@ -111,6 +111,7 @@ INSTALLED_APPS = DJANGO_APPS + DRF_APPS + LOCAL_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
     "config.middleware.ApiTokenSetter",
+    "config.middleware.MethodCacheMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -203,8 +204,8 @@ CASEWORKER_ROOT_URL = env.CASEWORKER_ROOT_URL
 API_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
+        "security.authentication.TokenAuthentication",
+        "security.authentication.SessionAuthentication",
     ],
     "DATETIME_FORMAT": API_DATETIME_FORMAT,
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
@@ -349,6 +350,11 @@ API_PREFIX = "api/v1"
 API_V2_PREFIX = "api/v2"
 API_V2_ENABLED = env.API_V2_ENABLED
 AUTH_TOKEN_MAX_AGE_MINUTES = env.AUTH_TOKEN_MAX_AGE_MINUTES
+# Cache of authenticated tokens (see security.token_cache): timeout of the shared cache entries,
+# and size and timeout of the in-process cache, in seconds
+AUTH_TOKEN_CACHE_TIMEOUT = 5 * 60
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 1024
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = 10
 if API_V2_ENABLED:
     AUTH_USER_MODEL = "authentication.User"
     ANON_USER_TOKEN = "change-me"
@@ -402,8 +408,20 @@ TWO_FACTOR_MAX_ATTEMPTS = 3
 # How long do users have to wait before users can request another 2fa code (SECONDS)
 TWO_FACTOR_RESEND_TIMEOUT_SECONDS = env.TWO_FACTOR_RESEND_TIMEOUT_SECONDS
 
-# Time to cache method
+# Filtered querysets of the v2 viewsets (see config.filters) are rejected if the total cost of
+# their plan, estimated by EXPLAIN, is above this (None to not estimate it)
+API_FILTER_MAX_QUERY_COST = 100000
+# Memoized model methods (see core.memoize): time to keep values in the shared cache
 METHOD_CACHE_DURATION_MINUTES = 2
+# Keep values in the shared cache unless a method says otherwise
+METHOD_CACHE_SHARED = True
+# Size of the in-process cache of each process, and time to keep its values (seconds)
+METHOD_CACHE_LOCAL_SIZE = 4096
+METHOD_CACHE_LOCAL_TIMEOUT = 30
+# System parameters are kept in memory by each process (see core.system_parameters),
+# which checks for changes at most every few seconds
+SYSTEM_PARAMETERS_LOCAL_CACHE = True
+SYSTEM_PARAMETERS_VERSION_CHECK_SECONDS = 5
 
 # Organisation user invite life time before expiry (in hours)
 ORGANISATION_INVITE_DURATION_HOURS = 24 * 3
@@ -416,11 +434,21 @@ SECRETARY_OF_STATE_ORGANISATION_ID = "8850d091-e119-4ab5-9e21-ede5f0112bef"
 
 # Companies House API
 COMPANIES_HOUSE_API_KEY = env.COMPANIES_HOUSE_API_KEY
+# "api" for the Companies House API, or "stub" for a local backend (offline tests, load tests)
+COMPANIES_HOUSE_BACKEND = env.COMPANIES_HOUSE_BACKEND
+# Cache timeout of Companies House responses, in seconds
+COMPANIES_HOUSE_CACHE_TIMEOUT = 60 * 60
 
 # GOV Notify
 GOV_NOTIFY_API_KEY = env.GOV_NOTIFY_API_KEY
 GOV_NOTIFY_TESTING_KEY = env.GOV_NOTIFY_TESTING_KEY
 DISABLE_NOTIFY_WHITELIST = env.DISABLE_NOTIFY_WHITELIST
+# Client side throttling of the notifications sent by all the worker processes
+# together (counted in Redis), to stay within the Notify rate limit (3,000 messages
+# per minute per API key) when bulk notifications are spread across workers.
+NOTIFY_RATE_LIMIT_PER_MINUTE = 1000
+# Number of notifications sent by each task of a bulk notification
+NOTIFY_BULK_CHUNK_SIZE = 50
 
 # ------------------------------------------------------------------------------
 # The Crud Zone - things likely to be refactored out.
@@ -491,6 +519,10 @@ if API_RATELIMIT_ENABLED:
     ]
     API_RATELIMIT_RATE = env.API_RATELIMIT_RATE
     RATELIMIT_VIEW = "config.ratelimit.ratelimited_error"
+# Hits of clients under this fraction of their limit are allowed without a round trip to Redis
+# (see config.ratelimit), and their local counts synced at least every few seconds
+API_RATELIMIT_LOCAL_FRACTION = 0.5
+API_RATELIMIT_LOCAL_SYNC_SECONDS = 1
 
 # ------------------- API PROFILING -------------------
 PYINSTRUMENT_PROFILE_DIR = "profiles"
@@ -16,3 +16,11 @@ if os.getenv("CIRCLECI"):
     }
 
 TESTING = True
+
+# Test cases roll back the system parameters they create, which sends no signal to
+# invalidate the in-process system parameters
+SYSTEM_PARAMETERS_LOCAL_CACHE = False
+
+# Nor do they invalidate the memoized model methods, so values are only memoized per request
+METHOD_CACHE_SHARED = False
+METHOD_CACHE_LOCAL_SIZE = 0
@@ -1,41 +1,52 @@
-import base64
-import json
+import logging
 import typing
 
 from django.core.exceptions import FieldError
 from django.http import Http404
-from django.utils.decorators import method_decorator
-from django_ratelimit.decorators import ratelimit
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from v2_api_client.shared.logging import audit_logger
 
-from config.ratelimit import get_rate
+from config.filters import check_query_cost, decode_filter_parameters, filter_queryset
+from config.ratelimit import RateLimitMixin
 from config.serializers import (
+    SERIALIZER_MODE_READ_ONLY,
+    SERIALIZER_MODE_SLIM,
+    SERIALIZER_MODE_SLIM_READ_ONLY,
     CustomValidationModelSerializer,
     GenericSerializerType,
-    ReadOnlyModelMixinSerializer,
+    get_serializer_class_for,
 )
+from core.feature_flags import FeatureFlags
 from core.services.base import GroupPermission
 
+logger = logging.getLogger(__name__)
 
-@method_decorator(ratelimit(key="user_or_ip", rate=get_rate, method=ratelimit.ALL), name="dispatch")
-class BaseModelViewSet(viewsets.ModelViewSet):
+
+class BaseModelViewSet(RateLimitMixin, viewsets.ModelViewSet):
     """
     Base class for ModelViewSets to share commonly overriden methods
     """
 
     serializer_class: typing.Union[GenericSerializerType, None] = None
     permission_classes = (IsAuthenticated, GroupPermission)
+    # the lookups allowed in filter_parameters (see config.filters)
+    filter_parameters_fields = None
+    filter_parameters_max_relations = 2
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        lookups = None
         if filter_parameters := self.request.query_params.get("filter_parameters"):
-            # there are some additional query parameters in this request, let's get the dictionary
-            # and filter the queryset accordingly.
-            filter_parameters = json.loads(base64.b64decode(filter_parameters))  # /PS-IGNORE
-            queryset = queryset.filter(**filter_parameters)
+            # there are some additional query parameters in this request, let's decode them and
+            # filter the queryset accordingly, if the viewset allows it (see config.filters)
+            queryset, lookups = filter_queryset(
+                queryset,
+                decode_filter_parameters(filter_parameters),
+                allowed_fields=self.filter_parameters_fields,
+                max_relations=self.filter_parameters_max_relations,
+            )
 
         # removing deleted objects from the queryset
         try:
@@ -48,13 +59,18 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         if hasattr(serializer_class, "eager_load_queryset"):
             queryset = self.get_serializer_class().eager_load_queryset(queryset)
 
+        if lookups:
+            check_query_cost(queryset, lookups)
+
         return queryset
 
     def initialize_request(self, request, *args, **kwargs):
         """
-        Set the `.action` attribute on the view, depending on the request method.
+        Set the `.action` attribute on the view, depending on the request method, and attach
+        a feature flags snapshot to the view and request.
         """
         request = super().initialize_request(request, *args, **kwargs)
+        self.feature_flags = request.feature_flags = FeatureFlags()
 
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
         object_id = self.kwargs.get(lookup_url_kwarg, "N/A")
@@ -121,39 +137,50 @@ class BaseModelViewSet(viewsets.ModelViewSet):
         Return the class to use for the serializer. If the request has 'skinny: yes' in the query
         then a slim serializer will be used, this is identical to a normal serializer but without
         any of the bloated computed fields.
+        Serializer classes are built once per process (see get_serializer_class_for).
         """
         if "slim" in self.request.query_params:
-            # they want a slim serializer without additional computed fields
-            def slim_serializer_factory(model_name):
-                class SlimSerializer(CustomValidationModelSerializer):
-                    class Meta:
-                        model = model_name
-                        fields = "__all__"
-
-                    def __repr__(self):
-                        return f"<SlimSerializer for {model_name}>"
-
-                if self.request.method == "GET":
-                    # if it's also a GET method, we can initialise a
-                    # read-only serializer to speed up the request
-                    SlimSerializer.__bases__ = (
-                        ReadOnlyModelMixinSerializer,
-                    ) + SlimSerializer.__bases__
-
-                return SlimSerializer
-
-            return slim_serializer_factory(self.queryset.model)
+            # they want a slim serializer without additional computed fields, which can also be
+            # read-only if it's a GET method
+            mode = SERIALIZER_MODE_SLIM
+            if self.request.method == "GET":
+                mode = SERIALIZER_MODE_SLIM_READ_ONLY
+            return get_serializer_class_for(
+                self.queryset.model, CustomValidationModelSerializer, mode
+            )
 
         if self.request.method == "GET":
-            # it's a GET method, we can initialise a read-only serializer to speed up the request
+            # it's a GET method, we can use a read-only serializer to speed up the request
             # https://hakibenita.com/django-rest-framework-slow
-            def read_only_serializer_factory(model_name, model_serializer):
-                class ReadOnlyModelSerializer(ReadOnlyModelMixinSerializer, model_serializer):
-                    def __repr__(self):
-                        return f"<ReadOnlyModelSerializer for {model_name}>"
-
-                return ReadOnlyModelSerializer
-
-            return read_only_serializer_factory(self.queryset.model, self.serializer_class)
+            return get_serializer_class_for(
+                self.queryset.model, self.serializer_class, SERIALIZER_MODE_READ_ONLY
+            )
 
         return super().get_serializer_class()
+
+    @classmethod
+    def warm_serializer_classes(cls):
+        """
+        Build the serializer classes used by GET requests, and their fields, so that the first
+        requests do not have to.
+        """
+        if cls.queryset is None or cls.serializer_class is None:
+            return
+        for base_serializer, mode in (
+            (cls.serializer_class, SERIALIZER_MODE_READ_ONLY),
+            (CustomValidationModelSerializer, SERIALIZER_MODE_SLIM_READ_ONLY),
+        ):
+            get_serializer_class_for(cls.queryset.model, base_serializer, mode)().get_fields()
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # the views are created when the URLs are loaded, at startup
+        try:
+            cls.warm_serializer_classes()
+        except Exception:
+            # the serializers will be built, and any error raised, by the first request
+            logger.warning(
+                f"Could not warm the serializer classes of {cls.__name__}", exc_info=True
+            )
+        return view
@@ -22,6 +22,8 @@ class CoreConfig(AppConfig):
     def ready(self):
         from django.contrib.auth.models import Group
 
+        import core.receivers  # noqa F401
+
         try:
             for flag in settings.FLAGS:
                 group_object, created = Group.objects.update_or_create(name=flag)
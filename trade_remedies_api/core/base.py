@@ -1,18 +1,12 @@
 import logging
 import uuid
 import json
-import re
-import types
-import datetime
-import pytz
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
-from django.utils.html import escape
-from django_countries.fields import Country
 from audit.mixins import AuditableMixin
 from dirtyfields import DirtyFieldsMixin
-from django.contrib.contenttypes.models import ContentType
+from .projection import freeze_fields, parse_fields, parse_fields_list, project
 from .user_context import user_context
 
 logger = logging.getLogger(__name__)
@@ -182,10 +176,17 @@ class BaseModel(SimpleBaseModel):
             self.save()
 
     def get_fields(self, **kwargs):
+        """
+        Return the fields spec of this class from the fields kwarg (a JSON string, or a dict of
+        fields specs per class name), frozen for to_json (see core.projection).
+        """
         fields = kwargs.pop("fields", None)
         if fields:
-            fields = json.loads(fields) if isinstance(fields, str) else fields
+            if isinstance(fields, str):
+                return parse_fields(fields).get(self.__class__.__name__)
             fields_for_class = fields.get(self.__class__.__name__)
+            if isinstance(fields_for_class, dict):
+                return freeze_fields(fields_for_class)
             return fields_for_class
 
     def to_dict(self, *args, **kwargs):
@@ -247,51 +248,11 @@ class BaseModel(SimpleBaseModel):
         """
         Parse a field list returning it as a nested dict
         """
-        stripped = re.sub(r"\s", "", fields)
-        sub = re.sub(r"\w+(?![\[\w])", r'"\g<0>": null', stripped)
-        json_str = (
-            "{" + re.sub(r"\w+(?=\[)", r'"\g<0>":', sub).replace("[", "{").replace("]", "}") + "}"
-        )
-        return json.loads(json_str)
-
-    def to_json(self, fields, obj=None, context=None, *args, **kwargs):  # noqa: C901
-        obj = obj or self
-        out = {}
-        for field, subField in fields.items():
-            try:
-                if isinstance(obj, dict):
-                    val = obj.get(field)
-                else:
-                    val = getattr(obj, field)
-                # If the atribute is a function - run it to get a better val
-                if isinstance(val, types.MethodType):
-                    val = val()
-                if isinstance(val, datetime.datetime):
-                    val = val.astimezone(pytz.timezone(settings.TIME_ZONE))
-                    val = val.strftime(settings.API_DATETIME_FORMAT)
-                elif isinstance(val, datetime.date):
-                    val = val.strftime(settings.API_DATE_FORMAT)
-                elif isinstance(val, uuid.UUID):
-                    val = str(val)
-                elif isinstance(val, Country):
-                    val = {
-                        "name": val.name,
-                        "code": val.code,
-                    }
-                elif isinstance(val, ContentType):
-                    val = str(val)
-                if subField and isinstance(subField, dict):
-                    if hasattr(val, "to_json"):
-                        val = val.to_json(fields=subField, context=self)
-                    elif val is not None:
-                        val = self.to_json(fields=subField, obj=val, context=self)
-                elif hasattr(val, "to_dict"):
-                    val = val.to_dict()
+        return parse_fields_list(fields)
 
-                if isinstance(val, str):
-                    out[field] = escape(val)
-                else:
-                    out[field] = val
-            except AttributeError:
-                pass
-        return out
+    def to_json(self, fields, obj=None, context=None, *args, **kwargs):
+        """
+        Return a JSON ready dict of the fields of this model, or of obj, per a fields spec.
+        The spec is compiled once per class into a cached plan (see core.projection).
+        """
+        return project(obj or self, fields)
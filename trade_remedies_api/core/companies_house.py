@@ -0,0 +1,292 @@
+"""
+Companies House API client.
+
+Company lookups are made on each keystroke of the company search, so the client keeps one
+pooled HTTP session per process (with connect/read timeouts and retries of transient
+failures), caches responses in the shared cache keyed by the normalised query, and coalesces
+identical lookups in flight in the same process, so only one of them reaches Companies House.
+
+The backend is selected with the COMPANIES_HOUSE_BACKEND setting: "api" for the Companies
+House API, or "stub" for a local backend serving canned companies, for offline tests and
+load testing.
+"""
+
+import hashlib
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+COMPANIES_HOUSE_BASE_DOMAIN = "https://api.companieshouse.gov.uk"
+COMPANIES_HOUSE_SEARCH_CACHE_KEY = "companies_house:search:{items_per_page}:{digest}"
+COMPANIES_HOUSE_COMPANY_CACHE_KEY = "companies_house:company:{company_number}"
+
+
+def normalise_query(query):
+    """
+    Normalise a search query, so searches differing only by case or whitespace share
+    their cached results.
+    """
+    return " ".join((query or "").lower().split())
+
+
+class _InFlightRequest:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CompaniesHouseClient:
+    """
+    A Companies House API client with a pooled session, cached responses and coalescing
+    of identical requests in flight.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        base_url=COMPANIES_HOUSE_BASE_DOMAIN,
+        timeout=(3.05, 10),
+        retries=2,
+        pool_size=10,
+        cache_timeout=None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache_timeout = (
+            settings.COMPANIES_HOUSE_CACHE_TIMEOUT if cache_timeout is None else cache_timeout
+        )
+        self.session = requests.Session()
+        self.session.auth = (api_key or "", "")
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.2,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def get(self, path, params=None):
+        """
+        Perform a GET request to the API, returning the response.
+        """
+        return self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+
+    def _coalesce(self, key, fetch):
+        """
+        Return the result of fetch(), sharing it with any identical call (same key) made
+        while it is in flight, rather than fetching again.
+        """
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlightRequest()
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error:
+                raise in_flight.error
+            return in_flight.result
+        try:
+            in_flight.result = fetch()
+            return in_flight.result
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def _cached(self, cache_key, fetch):
+        result = cache.get(cache_key)
+        if result is None:
+
+            def fetch_and_cache():
+                result = fetch()
+                if result is not None:
+                    cache.set(cache_key, result, self.cache_timeout)
+                return result
+
+            result = self._coalesce(cache_key, fetch_and_cache)
+        return result
+
+    def search_companies(self, query, items_per_page=10):
+        """
+        Search companies by name or number, returning the search results of the API.
+        Raises a requests.HTTPError if the search fails.
+        """
+        query = normalise_query(query)
+        cache_key = COMPANIES_HOUSE_SEARCH_CACHE_KEY.format(
+            items_per_page=items_per_page,
+            digest=hashlib.sha256(query.encode("utf8")).hexdigest(),
+        )
+
+        def fetch():
+            response = self.get(
+                "/search/companies", params={"q": query, "items_per_page": items_per_page}
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return self._cached(cache_key, fetch)
+
+    def get_company(self, company_number):
+        """
+        Return the company profile of a company number, or None if it cannot be found.
+        """
+        company_number = "".join((company_number or "").upper().split())
+        if not company_number:
+            return None
+
+        def fetch():
+            response = self.get(f"/company/{company_number}")
+            if response.status_code == 404:
+                # cache unknown companies too, as an empty profile
+                return {}
+            if response.status_code != 200:
+                logger.warning(
+                    f"Companies House lookup of {company_number} failed: {response.status_code}"
+                )
+                return None
+            return response.json()
+
+        cache_key = COMPANIES_HOUSE_COMPANY_CACHE_KEY.format(company_number=company_number)
+        return self._cached(cache_key, fetch) or None
+
+
+class StubResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self.data = data or {}
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+
+class StubCompaniesHouseClient(CompaniesHouseClient):
+    """
+    A Companies House client serving a local set of companies rather than calling the API.
+    Responses are still cached and coalesced like those of the API client.
+    """
+
+    COMPANIES = [
+        {
+            "company_name": "FAKE COMPANY LTD",
+            "company_number": "00000001",
+            "company_status": "active",
+            "date_of_creation": "2000-01-01",
+            "registered_office_address": {
+                "address_line_1": "1 Fake Street",
+                "locality": "London",
+                "postal_code": "SW1A 1AA",
+            },
+        },
+        {
+            "company_name": "EXAMPLE IMPORTS LIMITED",
+            "company_number": "00000002",
+            "company_status": "active",
+            "date_of_creation": "2010-06-15",
+            "registered_office_address": {
+                "address_line_1": "2 Example Road",
+                "locality": "Manchester",
+                "postal_code": "M1 1AA",
+            },
+        },
+        {
+            "company_name": "TEST STEEL PRODUCTS PLC",
+            "company_number": "SC000003",
+            "company_status": "dissolved",
+            "date_of_creation": "1985-03-20",
+            "registered_office_address": {
+                "address_line_1": "3 Test Lane",
+                "locality": "Glasgow",
+                "postal_code": "G1 1AA",
+            },
+        },
+    ]
+
+    def __init__(self, companies=None, **kwargs):
+        super().__init__(**kwargs)
+        self.companies = self.COMPANIES if companies is None else companies
+
+    @staticmethod
+    def search_result(company):
+        address = company.get("registered_office_address") or {}
+        return {
+            "kind": "searchresults#company",
+            "title": company["company_name"],
+            "company_number": company["company_number"],
+            "company_status": company.get("company_status"),
+            "date_of_creation": company.get("date_of_creation"),
+            "address": address,
+            "address_snippet": ", ".join(
+                value for value in address.values() if isinstance(value, str)
+            ),
+        }
+
+    def get(self, path, params=None):
+        if path == "/search/companies":
+            query = normalise_query(params.get("q"))
+            items_per_page = int(params.get("items_per_page", 20))
+            matches = [
+                self.search_result(company)
+                for company in self.companies
+                if query in company["company_name"].lower()
+                or company["company_number"].lower().startswith(query)
+            ]
+            return StubResponse(
+                200,
+                {
+                    "kind": "search#companies",
+                    "items": matches[:items_per_page],
+                    "total_results": len(matches),
+                    "items_per_page": items_per_page,
+                    "page_number": 1,
+                    "start_index": 0,
+                },
+            )
+        if path.startswith("/company/"):
+            company_number = path[len("/company/") :]
+            for company in self.companies:
+                if company["company_number"] == company_number:
+                    return StubResponse(200, company)
+        return StubResponse(404)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_companies_house_client():
+    """
+    Return the Companies House client of the current process, for the backend
+    selected by the COMPANIES_HOUSE_BACKEND setting.
+    """
+    backend = settings.COMPANIES_HOUSE_BACKEND
+    with _clients_lock:
+        if backend not in _clients:
+            if backend == "stub":
+                _clients[backend] = StubCompaniesHouseClient()
+            else:
+                _clients[backend] = CompaniesHouseClient(api_key=settings.COMPANIES_HOUSE_API_KEY)
+        return _clients[backend]
@@ -1,20 +1,59 @@
+import copy
 import os
 
-from django.core.cache import cache
+from django.conf import settings
 
 from core.models import SystemParameter
+from core.system_parameters import get_system_parameter_store
 
-
-feature_flag_ttl = int(os.environ.get("FEATURE_FLAG_TTL", 5 * 60))
+FEATURE_FLAG_PARAMETER_PREFIX = "FEATURE_"
 
 
 class FeatureFlagNotFound(Exception):
     """Raised if a feature flag does not exist."""
 
 
+def build_feature_flags(parameters):
+    """
+    Return a dict of the name of each feature flag to True if it is enabled, from
+    an iterable of system parameters. SP_ prefixed environment variables override
+    the parameter values, as they do for SystemParameter.get.
+    """
+    flags = {}
+    for parameter in parameters:
+        if not parameter.key.startswith(FEATURE_FLAG_PARAMETER_PREFIX):
+            continue
+        if override_value := os.environ.get(f"SP_{parameter.key}"):
+            parameter = copy.copy(parameter)
+            parameter.set_value(override_value)
+        name = parameter.key[len(FEATURE_FLAG_PARAMETER_PREFIX) :].lower()
+        flags[name] = (parameter.get_value() or 0) > 0
+    return flags
+
+
+def get_feature_flags():
+    """
+    Return a snapshot of all feature flags, as a dict of flag name to True if enabled.
+
+    The snapshot is derived from the system parameters held in memory, so it is shared
+    process-wide and follows their version (see core.system_parameters). Without the local
+    cache of system parameters, it is loaded with one query.
+    """
+    if settings.SYSTEM_PARAMETERS_LOCAL_CACHE:
+        return dict(
+            get_system_parameter_store().derive(
+                "feature_flags", lambda parameters: build_feature_flags(parameters.values())
+            )
+        )
+    return build_feature_flags(
+        SystemParameter.objects.filter(key__startswith=FEATURE_FLAG_PARAMETER_PREFIX)
+    )
+
+
 class FeatureFlags(object):
     """
-    Maintains a cache of feature flag values.
+    A snapshot of the feature flag values, taken on first use.
+    Views attach one to each request, so all flags are read at most once per request.
 
     Usage:
 
@@ -24,15 +63,18 @@ class FeatureFlags(object):
     """
 
     def __init__(self):
-        self._flag_map = {}
+        self._flag_map = None
+
+    def all(self):
+        if self._flag_map is None:
+            self._flag_map = get_feature_flags()
+        return self._flag_map
 
     def __call__(self, name):
         try:
-            return self._flag_map[name]
+            return self.all()[name.lower()]
         except KeyError:
-            val = is_enabled(name)
-            self._flag_map[name] = val
-            return val
+            raise FeatureFlagNotFound(f"{FEATURE_FLAG_PARAMETER_PREFIX}{name.upper()}")
 
 
 def is_enabled(name):
@@ -44,13 +86,4 @@ def is_enabled(name):
     A value of 1 implies the feature is enabled.
     A value of 0 implies the feature is disabled.
     """
-    key = f"FEATURE_{name.upper()}"
-    cache_key = f"FF:{key}"
-    val = cache.get(cache_key)
-    if val is None:
-        sys_param = SystemParameter.get(key)
-        if sys_param is None:
-            raise FeatureFlagNotFound(key)
-        val = sys_param > 0
-        cache.set(cache_key, val, feature_flag_ttl)
-    return val
+    return FeatureFlags()(name)
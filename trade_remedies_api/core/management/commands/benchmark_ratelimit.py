@@ -0,0 +1,68 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand
+from django.test import RequestFactory
+from django_ratelimit.core import is_ratelimited
+
+from config.ratelimit import RATELIMIT_CACHE_KEY, get_limiter
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per request overhead of the rate limiter (config.ratelimit) "
+        "with the django_ratelimit decorator it replaced"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument("--rate", type=str, default="100000/m")
+
+    def measure(self, check, requests, clients):
+        timings = []
+        for i in range(requests):
+            start = time.perf_counter()
+            check(i % clients)
+            timings.append((time.perf_counter() - start) * 1000000)
+        timings.sort()
+        return {
+            "p50": statistics.median(timings),
+            "p99": timings[int(len(timings) * 0.99) - 1],
+            "max": timings[-1],
+        }
+
+    def handle(self, *args, **options):
+        rate = options["rate"]
+        factory = RequestFactory()
+        requests = [
+            factory.get("/", REMOTE_ADDR=f"10.0.{client // 256}.{client % 256}")
+            for client in range(options["clients"])
+        ]
+        for request in requests:
+            request.user = AnonymousUser()
+
+        def django_ratelimit_check(client):
+            is_ratelimited(
+                requests[client],
+                group="benchmark",
+                key="user_or_ip",
+                rate=rate,
+                increment=True,
+            )
+
+        limiter = get_limiter()
+
+        def limiter_check(client):
+            limiter.is_allowed(RATELIMIT_CACHE_KEY.format(group="benchmark", client=client), rate)
+
+        for name, check in (
+            ("django_ratelimit", django_ratelimit_check),
+            ("config.ratelimit", limiter_check),
+        ):
+            timings = self.measure(check, options["requests"], options["clients"])
+            self.stdout.write(
+                f"{name}: p50 {timings['p50']:.0f}us, p99 {timings['p99']:.0f}us, "
+                f"max {timings['max']:.0f}us"
+            )
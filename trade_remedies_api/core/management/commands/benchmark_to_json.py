@@ -0,0 +1,114 @@
+import datetime
+import statistics
+import time
+import types
+import uuid
+
+import pytz
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import BaseCommand
+from django.utils import timezone
+from django.utils.html import escape
+from django_countries.fields import Country
+
+from cases.models import Case, CaseStage, CaseType
+
+FIELDS = {
+    "id": None,
+    "name": None,
+    "reference": None,
+    "created_at": None,
+    "initiated_at": None,
+    "type": {"name": None, "acronym": None, "colour": None},
+    "stage": {"name": None, "public_name": None, "locking": None},
+}
+
+
+def uncompiled_to_json(fields, obj):
+    """
+    BaseModel.to_json as it was before projections were compiled (see core.projection),
+    walking the fields spec for each object, recursing directly into models.
+    """
+    out = {}
+    for field, sub_fields in fields.items():
+        try:
+            if isinstance(obj, dict):
+                val = obj.get(field)
+            else:
+                val = getattr(obj, field)
+            if isinstance(val, types.MethodType):
+                val = val()
+            if isinstance(val, datetime.datetime):
+                val = val.astimezone(pytz.timezone(settings.TIME_ZONE))
+                val = val.strftime(settings.API_DATETIME_FORMAT)
+            elif isinstance(val, datetime.date):
+                val = val.strftime(settings.API_DATE_FORMAT)
+            elif isinstance(val, uuid.UUID):
+                val = str(val)
+            elif isinstance(val, Country):
+                val = {
+                    "name": val.name,
+                    "code": val.code,
+                }
+            elif isinstance(val, ContentType):
+                val = str(val)
+            if sub_fields and isinstance(sub_fields, dict):
+                if val is not None:
+                    val = uncompiled_to_json(sub_fields, val)
+            elif hasattr(val, "to_dict"):
+                val = val.to_dict()
+            if isinstance(val, str):
+                out[field] = escape(val)
+            else:
+                out[field] = val
+        except AttributeError:
+            pass
+    return out
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time to serialise cases with a fields spec using compiled projections "
+        "(BaseModel.to_json) with the uncompiled implementation they replaced"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=5000)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        case_type = CaseType(id=1, name="Anti-dumping", acronym="AD", colour="red")
+        case_stage = CaseStage(id=uuid.uuid4(), name="Initiation", public_name="Initiated")
+        cases = [
+            Case(
+                id=uuid.uuid4(),
+                name=f"Case <{number}>",
+                sequence=number,
+                initiated_sequence=number,
+                type=case_type,
+                stage=case_stage,
+                created_at=now,
+                initiated_at=now,
+            )
+            for number in range(options["objects"])
+        ]
+        assert [case.to_json(FIELDS) for case in cases[:10]] == [
+            uncompiled_to_json(FIELDS, case) for case in cases[:10]
+        ]
+
+        for name, serialise in (
+            ("uncompiled", lambda case: uncompiled_to_json(FIELDS, case)),
+            ("compiled", lambda case: case.to_json(FIELDS)),
+        ):
+            timings = []
+            for _ in range(options["rounds"]):
+                start = time.perf_counter()
+                for case in cases:
+                    serialise(case)
+                timings.append((time.perf_counter() - start) * 1000000 / len(cases))
+            self.stdout.write(
+                f"{name}: {statistics.median(timings):.1f}us per object "
+                f"(best {min(timings):.1f}us)"
+            )
@@ -1,6 +1,7 @@
 import logging
 
 from core.models import User
+from security.token_cache import invalidate_user_tokens
 from django.core.management.base import BaseCommand
 from django.db.models import Q
 
@@ -39,5 +40,6 @@ class Command(BaseCommand):
         qs = User.objects.exclude(email_filter | Q(email__icontains=exclude_matching_string))
 
         qs.update(is_active=False)
+        invalidate_user_tokens(*qs.values_list("id", flat=True))
         newline = "\n"
         logging.info(f"Deactivated Users:{newline}{newline.join([user.email for user in qs])}")
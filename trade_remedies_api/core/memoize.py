@@ -0,0 +1,350 @@
+"""
+Memoization of model methods (see method_cache).
+
+Methods such as CaseStage.to_dict or User.is_tra are called many times per request, so their
+values are memoized in up to three tiers:
+
+    L1: a dict per request (see config.middleware.MethodCacheMiddleware), so a method is
+        evaluated at most once per request for the same instance and arguments.
+    L2: a bounded in-process LRU cache, whose entries are kept for METHOD_CACHE_LOCAL_TIMEOUT
+        seconds.
+    L3: the shared cache, for methods memoized with shared=True (by default, METHOD_CACHE_SHARED),
+        whose entries are kept for METHOD_CACHE_DURATION_MINUTES.
+
+Values are keyed by instance (pk, and last_modified if the model has one) and arguments.
+Saving or deleting an instance invalidates the values of its memoized methods, and saving or
+deleting an instance of a model listed in a method's `invalidated_by` invalidates all the values
+of the method (see connect_receivers). The L2 tier of other processes cannot be reached, so its
+entries are only kept for a short time, which bounds their staleness.
+
+Hits per tier and misses are counted per method, logged every 1000 lookups, and returned by
+get_method_cache_stats.
+"""
+
+import contextlib
+import contextvars
+import copy
+import functools
+import logging
+import threading
+import time
+import types
+import uuid
+from collections import OrderedDict, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+METHOD_CACHE_KEY = "method_cache:{name}:{version}:{pk}"
+METHOD_CACHE_VERSION_KEY = "method_cache_version:{name}"
+
+OUTCOMES = ("l1_hits", "l2_hits", "l3_hits", "misses")
+
+MISSING = object()
+
+_request_memo = contextvars.ContextVar("request_memo", default=None)
+_memoized_methods = []
+
+
+@contextlib.contextmanager
+def request_memo():
+    """
+    Memoize method values in a dict (L1) for the duration of the block, typically a request.
+    """
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+def value_key(instance, args, kwargs):
+    """
+    Return the key of the value of a method of an instance for some arguments.
+    """
+    try:
+        last_modified = instance.last_modified.timestamp()
+    except AttributeError:
+        last_modified = None
+    return repr((last_modified, args, sorted(kwargs.items())))
+
+
+def hit_ratios(counters):
+    lookups = sum(counters[outcome] for outcome in OUTCOMES)
+    hits = lookups - counters["misses"]
+    return {
+        **counters,
+        "lookups": lookups,
+        "hit_ratio": hits / lookups if lookups else 0,
+    }
+
+
+class MethodCache:
+    """
+    A bounded in-process LRU cache (L2) of method values, keyed by method name, instance pk and
+    value key, which also counts the hits per tier and misses of each method.
+    """
+
+    def __init__(self, max_size=4096, timeout=30, report_every=1000, clock=time.monotonic):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.report_every = report_every
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.instance_keys = defaultdict(set)
+        self.generations = defaultdict(int)
+        self.counters = defaultdict(lambda: dict.fromkeys(OUTCOMES, 0))
+        self.lookups = 0
+        self.lock = threading.Lock()
+
+    def get(self, name, pk, key):
+        """
+        Return the value of a method of an instance for a value key, or MISSING.
+        """
+        if not self.max_size:
+            return MISSING
+        with self.lock:
+            entry_key = (name, self.generations[name], pk, key)
+            entry = self.entries.get(entry_key)
+            if entry is None:
+                return MISSING
+            if entry[0] <= self.clock():
+                self.remove(entry_key)
+                return MISSING
+            self.entries.move_to_end(entry_key)
+            return entry[1]
+
+    def set(self, name, pk, key, value):
+        if not self.max_size:
+            return
+        with self.lock:
+            entry_key = (name, self.generations[name], pk, key)
+            self.entries[entry_key] = (self.clock() + self.timeout, value)
+            self.entries.move_to_end(entry_key)
+            self.instance_keys[name, pk].add(entry_key)
+            while len(self.entries) > self.max_size:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, entry_key):
+        """
+        Remove an entry. Must be called with the lock held.
+        """
+        self.entries.pop(entry_key, None)
+        name, _, pk, _ = entry_key
+        keys = self.instance_keys.get((name, pk))
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self.instance_keys[name, pk]
+
+    def invalidate_instance(self, name, pk):
+        """
+        Invalidate the values of a method of an instance.
+        """
+        with self.lock:
+            for entry_key in self.instance_keys.pop((name, pk), ()):
+                self.entries.pop(entry_key, None)
+
+    def invalidate_method(self, name):
+        """
+        Invalidate all the values of a method. They are left to be evicted.
+        """
+        with self.lock:
+            self.generations[name] += 1
+
+    def record(self, name, outcome):
+        with self.lock:
+            self.counters[name][outcome] += 1
+            self.lookups += 1
+            report = self.report_every and self.lookups % self.report_every == 0
+        if report:
+            logger.info(f"Method cache stats: {self.stats()['total']}")
+
+    def stats(self):
+        """
+        Return the number of lookups, hits per tier, misses and the hit ratio of each method,
+        and in total.
+        """
+        with self.lock:
+            methods = {name: dict(counters) for name, counters in self.counters.items()}
+        total = {
+            outcome: sum(counters[outcome] for counters in methods.values())
+            for outcome in OUTCOMES
+        }
+        return {
+            "total": hit_ratios(total),
+            "methods": {name: hit_ratios(counters) for name, counters in methods.items()},
+        }
+
+
+_method_cache = None
+
+
+def get_method_cache():
+    """
+    Return the method cache of the current process.
+    """
+    global _method_cache
+    if _method_cache is None:
+        _method_cache = MethodCache(
+            max_size=settings.METHOD_CACHE_LOCAL_SIZE,
+            timeout=settings.METHOD_CACHE_LOCAL_TIMEOUT,
+        )
+    return _method_cache
+
+
+def get_method_cache_stats():
+    return get_method_cache().stats()
+
+
+class MemoizedMethod:
+    """
+    A memoized model method (see method_cache).
+    """
+
+    def __init__(self, method, invalidated_by=(), shared=None):
+        functools.update_wrapper(self, method)
+        self.method = method
+        self.invalidated_by = tuple(invalidated_by)
+        self.shared = shared
+        self.name = f"{method.__module__}.{method.__qualname__}"
+        self.model = None
+
+    def __set_name__(self, owner, name):
+        self.model = owner
+        _memoized_methods.append(self)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return types.MethodType(self, instance)
+
+    @property
+    def is_shared(self):
+        return settings.METHOD_CACHE_SHARED if self.shared is None else self.shared
+
+    def shared_cache_key(self, pk):
+        # only the values of methods with dependencies are invalidated all at once
+        version = "-"
+        if self.invalidated_by:
+            version_key = METHOD_CACHE_VERSION_KEY.format(name=self.name)
+            version = cache.get(version_key)
+            if version is None:
+                version = uuid.uuid4().hex
+                cache.set(version_key, version, None)
+        return METHOD_CACHE_KEY.format(name=self.name, version=version, pk=pk)
+
+    def __call__(self, instance, *args, **kwargs):
+        pk = instance.pk
+        if pk is None:
+            return self.method(instance, *args, **kwargs)
+        method_cache = get_method_cache()
+        key = value_key(instance, args, kwargs)
+        memo = _request_memo.get()
+        memo_values = memo.setdefault((self.name, pk), {}) if memo is not None else {}
+        value = memo_values.get(key, MISSING)
+        outcome = "l1_hits"
+        if value is MISSING:
+            value = method_cache.get(self.name, pk, key)
+            outcome = "l2_hits"
+        if value is MISSING and self.is_shared:
+            shared_cache_key = self.shared_cache_key(pk)
+            shared_values = cache.get(shared_cache_key) or {}
+            value = shared_values.get(key, MISSING)
+            outcome = "l3_hits"
+        if value is MISSING:
+            value = copy.deepcopy(self.method(instance, *args, **kwargs))
+            outcome = "misses"
+            if self.is_shared:
+                shared_values[key] = value
+                cache.set(
+                    shared_cache_key, shared_values, 60 * settings.METHOD_CACHE_DURATION_MINUTES
+                )
+        if outcome in ("l3_hits", "misses"):
+            method_cache.set(self.name, pk, key, value)
+        memo_values[key] = value
+        method_cache.record(self.name, outcome)
+        # the memoized value is shared, so callers get their own copy
+        return copy.deepcopy(value)
+
+    def invalidate_instance(self, pk):
+        """
+        Invalidate the values of the method for an instance.
+        """
+        get_method_cache().invalidate_instance(self.name, pk)
+        memo = _request_memo.get()
+        if memo is not None:
+            memo.pop((self.name, pk), None)
+        if self.is_shared:
+            cache.delete(self.shared_cache_key(pk))
+
+    def invalidate(self):
+        """
+        Invalidate all the values of the method.
+        """
+        get_method_cache().invalidate_method(self.name)
+        memo = _request_memo.get()
+        if memo is not None:
+            for memo_key in [memo_key for memo_key in memo if memo_key[0] == self.name]:
+                del memo[memo_key]
+        if self.is_shared and self.invalidated_by:
+            cache.set(METHOD_CACHE_VERSION_KEY.format(name=self.name), uuid.uuid4().hex, None)
+
+    # Values are invalidated now, so the change is seen by the rest of the transaction, and
+    # again once it is committed, dropping any value computed by others in the meantime.
+
+    def instance_changed(self, sender, instance, **kwargs):
+        pk = instance.pk
+        self.invalidate_instance(pk)
+        transaction.on_commit(lambda: self.invalidate_instance(pk))
+
+    def dependency_changed(self, sender, **kwargs):
+        if not kwargs.get("action", "post_").startswith("post_"):
+            return
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+
+def method_cache(method=None, *, invalidated_by=(), shared=None):
+    """
+    Memoize a model method, by instance and arguments (see core.memoize).
+
+    Usage:
+
+        @method_cache
+        def to_dict(self):
+            ...
+
+        @method_cache(invalidated_by=["cases.CaseType"], shared=False)
+        def to_dict(self):
+            return {..., "type": self.type.to_dict()}
+
+    The values of the method of an instance are invalidated when it is saved or deleted, and
+    all its values when an instance of a model in `invalidated_by` (models, or app labels) is
+    saved, deleted or has its many to many relations changed. Values are kept in the shared
+    cache if `shared` is True, or by default if METHOD_CACHE_SHARED is True.
+    Values must be picklable, and callers get a copy of them.
+    """
+    if method is None:
+        return functools.partial(method_cache, invalidated_by=invalidated_by, shared=shared)
+    return MemoizedMethod(method, invalidated_by=invalidated_by, shared=shared)
+
+
+def connect_receivers():
+    """
+    Connect the receivers invalidating the values of all the memoized methods.
+    Called once the models are loaded (see core.receivers).
+    """
+    for memoized in _memoized_methods:
+        post_save.connect(memoized.instance_changed, sender=memoized.model)
+        post_delete.connect(memoized.instance_changed, sender=memoized.model)
+        for model in memoized.invalidated_by:
+            if isinstance(model, str):
+                model = apps.get_model(model)
+            for signal in (post_save, post_delete, m2m_changed):
+                signal.connect(memoized.dependency_changed, sender=model)
@@ -37,11 +37,13 @@ from security.constants import (
     SOS_SECURITY_GROUPS,
 )
 from security.models import CaseSecurityMixin, OrganisationUser, UserCase
+from security.principal import group_name
 from .base import SimpleBaseModel
 from .constants import DEFAULT_USER_COLOUR, SAFE_COLOURS, TRUTHFUL_INPUT_VALUES
 from .decorators import method_cache
 from .exceptions import UserExists
 from .services.auth.exceptions import TwoFactorRequestedTooMany
+from .system_parameters import get_system_parameter
 from .tasks import send_mail
 from .utils import convert_to_e164
 
@@ -624,13 +626,18 @@ class User(AbstractBaseUser, PermissionsMixin, CaseSecurityMixin):
                 case, organisation=organisation, primary=primary
             )  # TODO: Note this only works for company orgs, not third party.
 
-    @method_cache
     def is_tra(self, manager=False, with_role=None):
         """
         Returns True if this user is a TRA member.
         if manager is True, only returns true if the user is also a TRA administrator/manager.
         If with role, returns True if the user has that specific role
         """
+        if self.security_principal:
+            return self.security_principal.is_tra(manager=manager, with_role=with_role)
+        return self._is_tra(manager=manager, with_role=with_role)
+
+    @method_cache(invalidated_by=["core.User_groups", "auth.Group"])
+    def _is_tra(self, manager=False, with_role=None):
         if with_role:
             with_role = [with_role] if isinstance(with_role, str) else with_role
             return self.groups.filter(name__in=with_role).exists()
@@ -665,9 +672,12 @@ class User(AbstractBaseUser, PermissionsMixin, CaseSecurityMixin):
         return self.organisationuser_set.select_related("security_group").all()
 
     def has_groups(self, groups):
-        return any([self.has_group(group) for group in groups])
+        if self.security_principal:
+            return self.security_principal.has_groups(groups)
+        group_names = set(self.groups.values_list("name", flat=True))
+        return any(group_name(group) in group_names for group in groups)
 
-    @method_cache
+    @method_cache(invalidated_by=["core.User_groups", "auth.Group"])
     def to_embedded_dict(self, groups=False):
         _dict = {
             "id": str(self.id),
@@ -1421,7 +1431,11 @@ class SystemParameter(models.Model):
         """
         if self.data_type == "list":
             if self.content_type and self.value:
-                return [self.content_type.get_object_for_this_type(id=val) for val in self.value]
+                # resolve all the objects in one query, in the order of the ids
+                model = self.content_type.model_class()
+                objects = model._base_manager.in_bulk(self.value)
+                ids = [model._meta.pk.to_python(val) for val in self.value]
+                return [objects[pk] for pk in ids if pk in objects]
             else:
                 return self.value or []
         elif self.value and self.data_type == "str" and self.content_type:
@@ -1480,19 +1494,17 @@ class SystemParameter(models.Model):
         Returns:
             any -- The system parameter value
         """
-        try:
-            override_value = None
-            sysparam = SystemParameter.objects.get(key=key.upper())
-            if user:
-                override_value = user.get_setting(key, os.environ.get(f"SP_{key.upper()}"))
-            else:
-                override_value = os.environ.get(f"SP_{key.upper()}")
-            if override_value:
-                sysparam.set_value(override_value)
-        except SystemParameter.DoesNotExist:
+        sysparam = get_system_parameter(key.upper())
+        if sysparam is None:
             if not default:
                 logger.warning("SystemParameter key not found: %s", key)
             return default
+        if user:
+            override_value = user.get_setting(key, os.environ.get(f"SP_{key.upper()}"))
+        else:
+            override_value = os.environ.get(f"SP_{key.upper()}")
+        if override_value:
+            sysparam.set_value(override_value)
         return sysparam.get_value(default=default)
 
     @staticmethod
@@ -1,6 +1,11 @@
 import os
 import re
+import time
+
+import requests
 from django.conf import settings
+from django.core.cache import cache
+from notifications_python_client.errors import HTTPError
 from notifications_python_client.notifications import NotificationsAPIClient
 
 from .utils import convert_to_e164
@@ -60,6 +65,54 @@ class DummyNotificationsAPIClient:
         }
 
 
+class SessionNotificationsAPIClient(NotificationsAPIClient):
+    """
+    A Notification client performing all its requests through one persistent
+    requests session, so connections to Notify are reused between notifications.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = requests.Session()
+
+    def _perform_request(self, method, url, kwargs):
+        try:
+            response = self.session.request(method, url, **kwargs)
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            raise HTTPError.create(e)
+
+
+class SharedRateLimiter:
+    """
+    Throttle calls to a rate limited service on the client side, across all the worker
+    processes: the calls are counted in a sliding window shared in Redis (see
+    config.ratelimit), and `acquire` blocks until a call is within `limit` per `window`
+    seconds.
+    """
+
+    def __init__(self, window_counter, key, limit, window=60, sleep=time.sleep):
+        self.window_counter = window_counter
+        self.key = key
+        self.limit = limit
+        self.window = window
+        self.sleep = sleep
+
+    def acquire(self):
+        while True:
+            allowed, _ = self.window_counter.hit(self.key, self.limit, self.window)
+            if allowed:
+                return
+            self.sleep(self.window / self.limit)
+
+
+NOTIFY_RATE_LIMIT_CACHE_KEY = "notify_rate_limit"
+
+_worker_client = None
+_worker_rate_limiter = None
+
+
 def get_client():
     """
     Return a Notification client
@@ -69,13 +122,51 @@ def get_client():
     return NotificationsAPIClient(env.GOV_NOTIFY_API_KEY or "")
 
 
-def send_mail(email, context, template_id, reference=None):
+def get_worker_client():
+    """
+    Return the Notification client of the current (worker) process, which
+    keeps a single HTTP session open for all the notifications it sends.
+    """
+    global _worker_client
+    if os.environ.get("DJANGO_SETTINGS_MODULE", "").endswith("local"):
+        return DummyNotificationsAPIClient()
+    if _worker_client is None:
+        _worker_client = SessionNotificationsAPIClient(env.GOV_NOTIFY_API_KEY or "")
+    return _worker_client
+
+
+def get_worker_rate_limiter():
+    """
+    Return the rate limiter throttling the notifications sent by all the worker processes
+    to NOTIFY_RATE_LIMIT_PER_MINUTE, counted in Redis if the default cache is a Redis cache,
+    or in the cache itself otherwise.
+    """
+    global _worker_rate_limiter
+    if _worker_rate_limiter is None:
+        from config.ratelimit import CacheSlidingWindow, RedisSlidingWindow
+
+        try:
+            from django_redis import get_redis_connection
+
+            window_counter = RedisSlidingWindow(get_redis_connection("default"))
+        except (ImportError, NotImplementedError):
+            window_counter = CacheSlidingWindow(cache)
+        _worker_rate_limiter = SharedRateLimiter(
+            window_counter, NOTIFY_RATE_LIMIT_CACHE_KEY, settings.NOTIFY_RATE_LIMIT_PER_MINUTE
+        )
+    return _worker_rate_limiter
+
+
+def send_prepared_mail(client, email, personalisation, template_id, reference=None):
+    """
+    Send an email with a fully built personalisation (see `get_context`)
+    using the given Notification client.
+    """
     if is_whitelisted(email):
-        client = get_client()
         send_report = client.send_email_notification(
             email_address=email,
             template_id=template_id,
-            personalisation=get_context(context),
+            personalisation=personalisation,
             reference=reference,
         )
     else:
@@ -88,6 +179,12 @@ def send_mail(email, context, template_id, reference=None):
     return send_report
 
 
+def send_mail(email, context, template_id, reference=None):
+    if is_whitelisted(email):
+        return send_prepared_mail(get_client(), email, get_context(context), template_id, reference)
+    return send_prepared_mail(None, email, context, template_id, reference)
+
+
 def notify_footer(email=None):
     """Build notify footer with specified email.
 
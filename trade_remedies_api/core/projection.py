@@ -0,0 +1,198 @@
+"""
+Compiled field projections for BaseModel.to_json.
+
+A fields spec is a dict of field names to None, or to the fields spec of the value of the
+field, e.g. {"name": None, "type": {"name": None}}. Rather than walking the spec for each object,
+it is compiled once per class of object into a plan: an accessor per field, and the plans of
+its sub specs per class of value. Values are formatted by type (methods are called, datetimes
+converted to the local time zone and formatted...), with the formatter of each type, and the
+settings it uses, resolved once.
+"""
+
+import datetime
+import functools
+import json
+import operator
+import re
+import types
+import uuid
+
+import pytz
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.html import escape
+from django_countries.fields import Country
+
+PLAN_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def fields_list_to_json(fields):
+    stripped = re.sub(r"\s", "", fields)
+    sub = re.sub(r"\w+(?![\[\w])", r'"\g<0>": null', stripped)
+    return "{" + re.sub(r"\w+(?=\[)", r'"\g<0>":', sub).replace("[", "{").replace("]", "}") + "}"
+
+
+def parse_fields_list(fields):
+    """
+    Parse a field list, e.g. "name,type[name,acronym]", returning it as a nested dict
+    """
+    return json.loads(fields_list_to_json(fields))
+
+
+def freeze_fields(fields):
+    """
+    Return a fields spec as a hashable tuple of (field, frozen sub spec or None) pairs.
+    """
+    return tuple(
+        (field, freeze_fields(sub_fields) if sub_fields and isinstance(sub_fields, dict) else None)
+        for field, sub_fields in fields.items()
+    )
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def parse_fields(fields):
+    """
+    Parse a JSON fields spec per class name, returning the frozen spec of each class.
+    """
+    return {
+        class_name: freeze_fields(class_fields) if isinstance(class_fields, dict) else class_fields
+        for class_name, class_fields in json.loads(fields).items()
+    }
+
+
+class ValueFormatter:
+    """
+    Formats the values of fields: methods are called, then datetimes are converted to the
+    local time zone and formatted, dates formatted, and UUIDs, countries and content types
+    converted to strings or dicts. The formatter of each type is resolved once.
+    """
+
+    def __init__(self):
+        self.formatters = {}
+        time_zone = pytz.timezone(settings.TIME_ZONE)
+        datetime_format = settings.API_DATETIME_FORMAT
+        date_format = settings.API_DATE_FORMAT
+
+        def format_datetime(value):
+            return value.astimezone(time_zone).strftime(datetime_format)
+
+        self.type_formatters = (
+            (datetime.datetime, format_datetime),
+            (datetime.date, lambda value: value.strftime(date_format)),
+            (uuid.UUID, str),
+            (Country, lambda value: {"name": value.name, "code": value.code}),
+            (ContentType, str),
+        )
+
+    def formatter_for(self, value_type):
+        for formatted_type, formatter in self.type_formatters:
+            if issubclass(value_type, formatted_type):
+                return formatter
+        return None
+
+    def __call__(self, value):
+        if type(value) is types.MethodType:
+            value = value()
+        value_type = type(value)
+        try:
+            formatter = self.formatters[value_type]
+        except KeyError:
+            formatter = self.formatters[value_type] = self.formatter_for(value_type)
+        return formatter(value) if formatter else value
+
+
+_value_formatter = None
+
+
+def get_value_formatter():
+    global _value_formatter
+    if _value_formatter is None:
+        _value_formatter = ValueFormatter()
+    return _value_formatter
+
+
+@receiver(setting_changed)
+def reset_value_formatter(*, setting, **kwargs):
+    global _value_formatter
+    if setting in ("TIME_ZONE", "API_DATETIME_FORMAT", "API_DATE_FORMAT"):
+        _value_formatter = None
+
+
+@functools.lru_cache(maxsize=None)
+def is_base_model(cls):
+    from core.base import BaseModel
+
+    return issubclass(cls, BaseModel) and cls.to_json is BaseModel.to_json
+
+
+def thaw_fields(fields):
+    return {field: thaw_fields(sub_fields) if sub_fields else None for field, sub_fields in fields}
+
+
+class Plan:
+    """
+    The compiled projection of a frozen fields spec for a class of objects.
+    """
+
+    def __init__(self, cls, fields):
+        self.fields = [
+            (field, self.accessor(cls, field), sub_fields, {}) for field, sub_fields in fields
+        ]
+
+    @staticmethod
+    def accessor(cls, field):
+        if issubclass(cls, dict):
+            return operator.methodcaller("get", field)
+        if "." in field:
+            # attrgetter would follow the dots
+            return lambda obj: getattr(obj, field)
+        return operator.attrgetter(field)
+
+    def project(self, obj):
+        """
+        Return a JSON ready dict of the fields of an object. Fields which cannot be
+        resolved (raising AttributeError) are left out.
+        """
+        formatter = get_value_formatter()
+        out = {}
+        for field, get, sub_fields, sub_plans in self.fields:
+            try:
+                value = formatter(get(obj))
+                if sub_fields:
+                    value_type = type(value)
+                    if value_type in sub_plans or is_base_model(value_type):
+                        plan = sub_plans.get(value_type)
+                        if plan is None:
+                            plan = sub_plans[value_type] = get_plan(value_type, sub_fields)
+                        value = plan.project(value)
+                    elif hasattr(value, "to_json"):
+                        value = value.to_json(fields=thaw_fields(sub_fields))
+                    elif value is not None:
+                        plan = sub_plans[value_type] = get_plan(value_type, sub_fields)
+                        value = plan.project(value)
+                elif hasattr(value, "to_dict"):
+                    value = value.to_dict()
+                out[field] = escape(value) if isinstance(value, str) else value
+            except AttributeError:
+                pass
+        return out
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def get_plan(cls, fields):
+    """
+    Return the plan of a frozen fields spec for a class of objects.
+    """
+    return Plan(cls, fields)
+
+
+def project(obj, fields):
+    """
+    Return a JSON ready dict of the fields of an object, per a fields spec (dict or frozen).
+    """
+    if isinstance(fields, dict):
+        fields = freeze_fields(fields)
+    return get_plan(type(obj), fields).project(obj)
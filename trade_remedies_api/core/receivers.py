@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+
+from core.memoize import connect_receivers
+from core.models import SystemParameter
+from core.system_parameters import invalidate_system_parameters
+
+post_save.connect(invalidate_system_parameters, sender=SystemParameter)
+post_delete.connect(invalidate_system_parameters, sender=SystemParameter)
+
+# invalidation of the memoized model methods (see core.memoize)
+connect_receivers()
@@ -14,7 +14,7 @@ from v2_api_client.shared.logging import audit_logger
 
 from audit import AUDIT_TYPE_NOTIFY
 from core.constants import TRUTHFUL_INPUT_VALUES
-from core.feature_flags import FeatureFlagNotFound, is_enabled
+from core.feature_flags import FeatureFlagNotFound
 from core.models import JobTitle, SystemParameter, User
 from core.notifier import get_preview, get_template
 from core.tasks import send_mail
@@ -292,9 +292,15 @@ class SystemParameterApiView(TradeRemediesApiView):
 
 
 class FeatureFlagApiView(TradeRemediesApiView):
-    def get(self, request, key, *args, **kwargs):
+    """
+    Get a feature flag by key, or all feature flags (a dict of flag name to True if enabled)
+    """
+
+    def get(self, request, key=None, *args, **kwargs):
+        if key is None:
+            return ResponseSuccess({"results": self.feature_flags.all()})
         try:
-            response = {"result": is_enabled(key)}
+            response = {"result": self.feature_flags(key)}
         except FeatureFlagNotFound:
             raise NotFoundApiExceptions(f"Feature flag {key} not found")
         return ResponseSuccess(response)
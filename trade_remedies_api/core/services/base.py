@@ -2,8 +2,6 @@ import logging
 import json
 from time import time
 
-from django.utils.decorators import method_decorator
-from django_ratelimit.decorators import ratelimit
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -11,12 +9,12 @@ from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.parsers import BaseParser, DataAndFiles
 from rest_framework.exceptions import ParseError
 
-from config.ratelimit import get_rate
+from config.ratelimit import RateLimitMixin
 from security.utils import validate_user_organisation, validate_user_case
 from security.constants import SECURITY_GROUP_SUPER_USER
+from security.principal import get_principal
 from organisations.models import get_organisation
 from config.version import __version__
-from django.contrib.auth.models import Group
 from django.conf import settings
 from django.http.multipartparser import (
     MultiPartParser as DjangoMultiPartParser,
@@ -37,10 +35,7 @@ class GroupPermission(BasePermission):
         :param (Group) group: Group to check membership of.
         :returns (bool): True if the user is in a given group, False otherwise.
         """
-        try:
-            return Group.objects.get(name=group).user_set.filter(id=user.id).exists()
-        except Group.DoesNotExist:
-            return False
+        return get_principal(user).has_group(group)
 
     def has_permission(self, request, view):
         """Check user's permission override.
@@ -57,11 +52,10 @@ class GroupPermission(BasePermission):
         allowed_groups = allowed_groups_mapping.get(request.method, [])
         if request.user.is_superuser or not allowed_groups:
             return True
-        return any([self._user_in_group(request.user, group) for group in allowed_groups])
+        return get_principal(request.user).has_groups(allowed_groups)
 
 
-@method_decorator(ratelimit(key="user_or_ip", rate=get_rate, method=ratelimit.ALL), name="dispatch")
-class TradeRemediesApiView(APIView):
+class TradeRemediesApiView(RateLimitMixin, APIView):
     """Base class for all Trade Remedies API Views.
 
     Api responses should always return ResponseSuccess objects if successful, or
@@ -80,10 +74,10 @@ class TradeRemediesApiView(APIView):
         `process_time` is set in the response to provide a measure
         of time it took to process this request
 
-        `feature_flags` provides a `FeatureFlag` instance which can be used
-        to fetch flags from the SystemParameters. Flag values will be cached
-        on the request object, so it can be called multiple times without
-        performing multiple queries to the database or cache.
+        `feature_flags` provides a `FeatureFlags` snapshot (also attached to the
+        request) which can be used to fetch flags from the SystemParameters. All
+        flags are read at once on first use, so it can be called multiple times
+        without performing multiple queries to the database or cache.
     """
 
     permission_classes = (IsAuthenticated, GroupPermission)
@@ -131,16 +125,17 @@ class TradeRemediesApiView(APIView):
         """
         is_valid = False
         org_id = self.organisation.id if self.organisation else None
-        if self.user.has_group(SECURITY_GROUP_SUPER_USER):
+        principal = get_principal(self.user)
+        if principal.has_group(SECURITY_GROUP_SUPER_USER):
             is_valid = True
-        elif self.allowed_groups.get(self.request.method) and self.user.has_groups(
+        elif self.allowed_groups.get(self.request.method) and principal.has_groups(
             self.allowed_groups[self.request.method]
         ):
             is_valid = True
         elif self.case_id and org_id:
-            is_valid = validate_user_case(self.user, self.case_id, org_id)
+            is_valid = validate_user_case(self.user, self.case_id, self.organisation)
         elif org_id:
-            is_valid = validate_user_organisation(self.user, org_id)
+            is_valid = validate_user_organisation(self.user, self.organisation)
         if not is_valid:
             raise AccessDenied("User does not have access to organisation")
 
@@ -150,7 +145,7 @@ class TradeRemediesApiView(APIView):
         :param (HttpRequest) request: Request object.
         """
         time_recv = time()
-        self.feature_flags = FeatureFlags()
+        self.feature_flags = request.feature_flags = FeatureFlags()
         response = super().dispatch(request, *args, **kwargs)
         if hasattr(response, "data"):
             if response.exception is True:
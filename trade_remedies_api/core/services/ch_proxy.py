@@ -1,30 +1,14 @@
-import base64
-import requests
-from django.conf import settings
+from core.companies_house import get_companies_house_client
 from .base import TradeRemediesApiView, ResponseSuccess
 from .exceptions import InvalidRequestParams
 
 
-COMPANIES_HOUSE_BASIC_AUTH = base64.b64encode(  # /PS-IGNORE
-    bytes(f"{settings.COMPANIES_HOUSE_API_KEY}:", "utf-8")
-).decode("utf-8")
-COMPANIES_HOUSE_BASE_DOMAIN = "https://api.companieshouse.gov.uk"
-
-
 class CompaniesHouseApiSearch(TradeRemediesApiView):
     def get(self, request, *args, **kwargs):
         query = request.query_params.get("q")
         if not query:
             raise InvalidRequestParams("Missing q param")
-        headers = {"Authorization": f"Basic {COMPANIES_HOUSE_BASIC_AUTH}"}
-        response = requests.get(
-            f"{COMPANIES_HOUSE_BASE_DOMAIN}/search/companies",
-            headers=headers,
-            params={
-                "q": query,
-                "items_per_page": 10,
-            },
-        ).json()
+        response = get_companies_house_client().search_companies(query, items_per_page=10)
         return ResponseSuccess(
             {
                 "results": response.get("items"),
@@ -14,6 +14,7 @@ from core.services.v2.feature_flags.views import FlagViewSet
 urlpatterns = [
     path("systemparam/", SystemParameterApiView.as_view()),
     path("notification/template/<str:template_key>/", NotificationTemplateAPI.as_view()),
+    path("feature-flags/", FeatureFlagApiView.as_view()),
     path("feature-flags/<str:key>/", FeatureFlagApiView.as_view()),
     path("jobtitles/", JobTitlesView.as_view()),
     path("search/", CompaniesHouseApiSearch.as_view()),
@@ -13,7 +13,6 @@ from core.models import TwoFactorAuth, User, UserProfile
 from core.services.auth.serializers import EmailSerializer
 from core.utils import convert_to_e164
 from organisations.constants import REJECTED_ORG_CASE_ROLE
-from security.models import OrganisationCaseRole
 
 
 class TwoFactorAuthSerializer(serializers.ModelSerializer):
@@ -106,17 +105,7 @@ class UserSerializer(CustomValidationModelSerializer):
     def get_user_cases(self, instance):
         from security.services.v2.serializers import UserCaseSerializer
 
-        user_cases = instance.usercase_set.all()
-        non_rejected_user_cases_ids = []
-        for user_case in user_cases:
-            if not OrganisationCaseRole.objects.filter(
-                case=user_case.case,
-                organisation__organisationuser__user=user_case.user,
-                role__key=REJECTED_ORG_CASE_ROLE,
-            ).exists():
-                non_rejected_user_cases_ids.append(user_case.id)
-
-        user_cases = instance.usercase_set.filter(id__in=non_rejected_user_cases_ids)
+        user_cases = instance.usercase_set.exclude_rejected()
         if requesting_user := self.context.get("requesting_user"):
             if not requesting_user.is_tra():
                 # We want to filter the user cases
@@ -139,8 +128,10 @@ class UserSerializer(CustomValidationModelSerializer):
 
         return [
             CaseSerializer(each).data
-            for each in Case.objects.user_cases(
-                user=instance, exclude_organisation_case_role=REJECTED_ORG_CASE_ROLE
+            for each in CaseSerializer.eager_load_queryset(
+                Case.objects.user_cases(
+                    user=instance, exclude_organisation_case_role=REJECTED_ORG_CASE_ROLE
+                )
             )
         ]
 
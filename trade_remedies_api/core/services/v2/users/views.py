@@ -4,6 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+from config.filters import ALL_OPERATORS
 from config.viewsets import BaseModelViewSet
 from contacts.models import CaseContact, Contact
 from core.models import TwoFactorAuth, User, UserProfile
@@ -25,6 +26,13 @@ class UserViewSet(BaseModelViewSet):
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    filter_parameters_fields = {
+        "email": ["exact", "iexact", "in"],
+        "name": ["exact", "iexact", "icontains"],
+        "is_active": ALL_OPERATORS,
+        "deleted_at": ["isnull"],
+        "groups__name": ["exact", "in"],
+    }
 
     @action(
         detail=True,
@@ -151,8 +159,10 @@ class TwoFactorAuthViewSet(BaseModelViewSet):
 
     queryset = TwoFactorAuth.objects.all()
     serializer_class = TwoFactorAuthSerializer
+    filter_parameters_fields = {"user": ["exact", "in"]}
 
 
 class UserProfileViewSet(BaseModelViewSet):
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
+    filter_parameters_fields = {"user": ["exact", "in"]}
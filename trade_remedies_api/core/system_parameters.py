@@ -0,0 +1,180 @@
+"""
+In-process store of system parameters.
+
+System parameters are read throughout request handling, and rarely change, so each process
+loads all of them in one query and keeps them in memory. Changes are propagated to all the
+processes through a version key in the shared cache: saving or deleting a parameter (see
+core.receivers) moves to a new version once the change is committed, and each process checks
+the version at most every SYSTEM_PARAMETERS_VERSION_CHECK_SECONDS, reloading the parameters
+when it has changed.
+
+Until a change is committed, it is only visible to its own transaction, so the store must not
+be loaded from it: while a transaction has pending changes to the parameters, its reads go
+straight to the database, and the store is only loaded outside of it.
+"""
+
+import copy
+import threading
+import time
+import uuid
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+SYSTEM_PARAMETERS_VERSION_CACHE_KEY = "system_parameters_version"
+
+# The changes pending in the current transaction of each database (connections are per
+# thread), referenced weakly: its only strong reference is its on_commit callback, so it goes
+# away when the callback is run, or discarded by a rollback
+_pending = threading.local()
+
+
+def get_system_parameters_version():
+    version = cache.get(SYSTEM_PARAMETERS_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(SYSTEM_PARAMETERS_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+class PendingChanges:
+    """
+    Changes to the system parameters, to be propagated when the current transaction commits.
+    """
+
+    def __init__(self):
+        self.committed = False
+
+    def commit(self):
+        self.committed = True
+        cache.set(SYSTEM_PARAMETERS_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        get_system_parameter_store().clear()
+
+
+def get_pending_changes(using=DEFAULT_DB_ALIAS):
+    """
+    Return the PendingChanges of the current transaction, or None.
+    """
+    if not transaction.get_connection(using).in_atomic_block:
+        return None
+    pending_ref = getattr(_pending, using, None)
+    pending = pending_ref() if pending_ref else None
+    if pending is None or pending.committed:
+        return None
+    return pending
+
+
+class SystemParameterStore:
+    """
+    All the system parameters, by key, loaded in one query and reloaded when the version
+    of the parameters in the shared cache changes.
+    """
+
+    def __init__(self, version_check_seconds=5, clock=time.monotonic):
+        self.version_check_seconds = version_check_seconds
+        self.clock = clock
+        self.parameters = None
+        self.derived = {}
+        self.version = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def load():
+        from core.models import SystemParameter
+
+        return {
+            parameter.key: parameter
+            for parameter in SystemParameter.objects.select_related("content_type")
+        }
+
+    def refresh(self):
+        """
+        Reload the parameters if they have not been loaded, or their version has changed.
+        Must be called with the lock held.
+        """
+        now = self.clock()
+        if self.parameters is None or now - self.checked_at >= self.version_check_seconds:
+            # the version is read first, so a change committed while loading is not missed
+            version = get_system_parameters_version()
+            if self.parameters is None or version != self.version:
+                self.parameters = self.load()
+                self.derived = {}
+                self.version = version
+            self.checked_at = now
+
+    def get(self, key):
+        """
+        Return a copy of the SystemParameter of a key, or None.
+        """
+        if get_pending_changes():
+            return self.load().get(key)
+        with self.lock:
+            self.refresh()
+            parameter = self.parameters.get(key)
+        if parameter is None:
+            return None
+        # callers are free to change the parameter and its value
+        parameter = copy.copy(parameter)
+        parameter.value = copy.deepcopy(parameter.value)
+        return parameter
+
+    def derive(self, name, build):
+        """
+        Return a value derived from all the parameters by `build(parameters)`, computed
+        once per version of the parameters. The parameters must not be changed by `build`.
+        """
+        if get_pending_changes():
+            return build(self.load())
+        with self.lock:
+            self.refresh()
+            if name not in self.derived:
+                self.derived[name] = build(self.parameters)
+            return self.derived[name]
+
+    def clear(self):
+        with self.lock:
+            self.parameters = None
+
+
+_store = None
+
+
+def get_system_parameter_store():
+    """
+    Return the system parameter store of the current process.
+    """
+    global _store
+    if _store is None:
+        _store = SystemParameterStore(
+            version_check_seconds=settings.SYSTEM_PARAMETERS_VERSION_CHECK_SECONDS
+        )
+    return _store
+
+
+def get_system_parameter(key):
+    """
+    Return the SystemParameter of a key, or None, from the store if the local cache
+    of system parameters is enabled.
+    """
+    from core.models import SystemParameter
+
+    if settings.SYSTEM_PARAMETERS_LOCAL_CACHE:
+        return get_system_parameter_store().get(key)
+    return SystemParameter.objects.select_related("content_type").filter(key=key).first()
+
+
+def invalidate_system_parameters(*args, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Invalidate the system parameters of the current process now, and of all the processes
+    once the change is committed. Until then, the current transaction reads the parameters
+    from the database. Can be connected directly as a signal receiver.
+    """
+    get_system_parameter_store().clear()
+    if get_pending_changes(using) is not None:
+        return
+    pending = PendingChanges()
+    setattr(_pending, using, weakref.ref(pending))
+    transaction.on_commit(pending.commit, using=using)
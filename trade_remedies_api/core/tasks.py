@@ -6,18 +6,23 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formataddr
 
-from celery import shared_task
+from celery import group, shared_task
 from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
 from notifications_python_client.errors import HTTPError
 
 from audit import AUDIT_TYPE_NOTIFY
 from audit.tasks import audit_log_task
-from audit.utils import new_audit_record_to_dict
+from audit.utils import bulk_audit_log, new_audit_record_to_dict
 from core.notifier import (
     get_client,
+    get_context,
+    get_worker_client,
+    get_worker_rate_limiter,
     notify_contact_email,
     notify_footer,
     send_mail as sync_send_mail,
+    send_prepared_mail,
 )
 from core.utils import extract_error_from_api_exception
 
@@ -109,6 +114,124 @@ def send_mail_task(self, email, context, template_id, reference=None, audit_kwar
         audit_log_task(audit_kwargs)
 
 
+def send_bulk_mail(recipients, template_id, context=None, audit_kwargs=None, chunk_size=None):
+    """
+    Send the same email template to many recipients.
+
+    The recipients are split into chunks, each of which is sent by a
+    `send_bulk_mail_task`, all chunks being dispatched at once as a celery group.
+    An audit record is generated for every notification sent.
+
+    :param list recipients: A list of dicts with an `email` key and optionally
+        a `context` (personalisation specific to the recipient), a `reference`
+        and a `model` (the model instance the recipient's audit record refers to).
+    :param str template_id: The Notify id of the template.
+    :param dict context: The personalisation data shared by all recipients.
+    :param dict audit_kwargs: An optional dictionary of keyword arguments, as for
+        `send_mail`, common to the audit records of all recipients.
+    :param int chunk_size: The number of recipients per task. Defaults to
+        the NOTIFY_BULK_CHUNK_SIZE setting.
+    :return: The number of notifications dispatched.
+    """
+    chunk_size = chunk_size or settings.NOTIFY_BULK_CHUNK_SIZE
+    audit_kwargs = dict(audit_kwargs or {})
+    audit_kwargs.setdefault("audit_type", AUDIT_TYPE_NOTIFY)
+    model = audit_kwargs.pop("model", None)
+    audit_dict = new_audit_record_to_dict(**audit_kwargs)
+    content_type_ids = {}
+    messages = []
+    for recipient in recipients:
+        message_audit = dict(audit_dict)
+        recipient_model = recipient.get("model", model)
+        if recipient_model is not None:
+            model_class = type(recipient_model)
+            if model_class not in content_type_ids:
+                content_type_ids[model_class] = ContentType.objects.get_for_model(model_class).id
+            message_audit["content_type_id"] = content_type_ids[model_class]
+            message_audit["model_id"] = recipient_model.id
+        messages.append(
+            {
+                "email": recipient["email"],
+                "context": recipient.get("context") or {},
+                "reference": recipient.get("reference"),
+                "audit": message_audit,
+            }
+        )
+    chunks = [messages[index : index + chunk_size] for index in range(0, len(messages), chunk_size)]
+    if settings.RUN_ASYNC:
+        group(send_bulk_mail_task.s(chunk, template_id, context) for chunk in chunks).apply_async()
+    else:
+        for chunk in chunks:
+            send_bulk_mail_task(chunk, template_id, context)
+    return len(messages)
+
+
+@shared_task
+def send_bulk_mail_task(messages, template_id, context=None, attempt=0):
+    """
+    Task to send a chunk of a bulk notification (see `send_bulk_mail`).
+
+    Sends are throttled by the worker's rate limiter and go through the
+    worker's Notification client. Audit records are written in bulk once the
+    chunk is sent. Messages failing with a transient Notify error are retried
+    together in a new task, without resending the rest of the chunk.
+    """
+    client = get_worker_client()
+    rate_limiter = get_worker_rate_limiter()
+    shared_personalisation = get_context(context)
+    audits = []
+    retry_messages = []
+    for message in messages:
+        rate_limiter.acquire()
+        try:
+            send_report = send_prepared_mail(
+                client,
+                message["email"],
+                {**shared_personalisation, **message["context"]},
+                template_id,
+                message["reference"],
+            )
+            logger.info(f"Send email: {send_report}")
+            if settings.AUDIT_EMAIL_ENABLED and settings.RUN_ASYNC and send_report.get("id"):
+                check_email_delivered.apply_async(
+                    countdown=300,
+                    kwargs={
+                        "delivery_id": send_report["id"],
+                        "context": {**(context or {}), **message["context"]},
+                    },
+                )
+        except HTTPError as err:
+            error_report, error_status = extract_error_from_api_exception(err)
+            if error_status in (500, 503) and settings.RUN_ASYNC:
+                if attempt < SEND_MAIL_MAX_RETRIES:
+                    retry_messages.append(message)
+                    continue
+                error_report["messages"].append("Failed")
+            send_report = {
+                "email": message["email"],
+                "values": message["context"],
+                "template_id": template_id,
+                "error": (
+                    error_report.get("messages") if isinstance(error_report, dict) else error_report
+                ),
+            }
+            logger.error("Notify request failed: %s", send_report)
+        audit = dict(message["audit"])
+        audit_data = audit.get("data") or {}
+        if not isinstance(audit_data, dict):
+            audit_data = {"_data": audit_data}
+        audit["data"] = {**audit_data, "send_report": send_report}
+        audits.append(audit)
+    bulk_audit_log(audits)
+    if retry_messages:
+        send_bulk_mail_task.apply_async(
+            args=(retry_messages, template_id, context),
+            kwargs={"attempt": attempt + 1},
+            countdown=SEND_MAIL_COUNTDOWN,
+        )
+    return len(audits)
+
+
 @shared_task(bind=True)
 def check_email_delivered(self, delivery_id, context):
     notify = get_client()
@@ -11,6 +11,7 @@ from rest_framework.test import APIRequestFactory
 from django.test import override_settings
 
 
+from config.serializers import ReadOnlyModelMixinSerializer
 from config.test_bases import CaseSetupTestMixin
 from organisations.models import Organisation
 from organisations.services.v2.views import OrganisationViewSet
@@ -128,6 +129,36 @@ class TestBaseModelViewSet(CaseSetupTestMixin, FunctionalTestBase):
         assert all([value.read_only for _, value in serializer_class().get_fields().items()])
         assert "full_country_name" not in serializer_class().get_fields().keys()
 
+    def get_viewset(self, method="get", query_params=None):
+        viewset = OrganisationViewSet()
+        request = getattr(APIRequestFactory(), method)(reverse("organisations-list"))
+        request.query_params = query_params or {}
+        request.user = MagicMock()
+        viewset.request = request
+        viewset.action = "list"
+        return viewset
+
+    def test_serializer_classes_are_reused(self):
+        serializer_class = self.get_viewset().get_serializer_class()
+        assert self.get_viewset().get_serializer_class() is serializer_class
+        slim_viewset = self.get_viewset(query_params={"slim": "yes"})
+        slim_serializer_class = slim_viewset.get_serializer_class()
+        assert slim_serializer_class is not serializer_class
+        assert slim_viewset.get_serializer_class() is slim_serializer_class
+        writable_slim_serializer_class = self.get_viewset(
+            method="post", query_params={"slim": "yes"}
+        ).get_serializer_class()
+        assert writable_slim_serializer_class is not slim_serializer_class
+        assert ReadOnlyModelMixinSerializer not in writable_slim_serializer_class.__mro__
+
+    def test_serializer_fields_are_built_once_per_class(self):
+        OrganisationViewSet.warm_serializer_classes()
+        serializer_class = self.get_viewset().get_serializer_class()
+        assert "_cached_fields" in serializer_class.__dict__
+        fields = serializer_class().get_fields()
+        assert fields["name"] is not serializer_class().get_fields()["name"]
+        assert fields["name"].read_only
+
     @override_settings(API_RATELIMIT_RATE="1/h", API_RATELIMIT_ENABLED=True)
     def test_ratelimit(self):
         # first we need to clear the existing ratelimit cache. The cache is maintained between
@@ -0,0 +1,88 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core.companies_house import (
+    StubCompaniesHouseClient,
+    StubResponse,
+    get_companies_house_client,
+)
+
+
+class TestCompaniesHouseClient(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = StubCompaniesHouseClient(cache_timeout=60)
+
+    def test_search_companies(self):
+        response = self.client.search_companies("  Fake   COMPANY ")
+        assert response["total_results"] == 1
+        assert response["items"][0]["company_number"] == "00000001"
+        assert response["items"][0]["title"] == "FAKE COMPANY LTD"
+
+    def test_search_is_cached_by_normalised_query(self):
+        with patch.object(self.client, "get", wraps=self.client.get) as get:
+            self.client.search_companies("fake company")
+            self.client.search_companies("FAKE  company")
+            self.client.search_companies("fake company", items_per_page=20)
+        assert get.call_count == 2
+
+    def test_get_company(self):
+        assert self.client.get_company("00000002")["company_name"] == "EXAMPLE IMPORTS LIMITED"
+        assert self.client.get_company("sc000003")["company_name"] == "TEST STEEL PRODUCTS PLC"
+        with patch.object(self.client, "get", wraps=self.client.get) as get:
+            assert self.client.get_company("99999999") is None
+            assert self.client.get_company("99999999") is None
+        assert get.call_count == 1
+
+    def test_failed_lookups_are_not_cached(self):
+        with patch.object(self.client, "get", return_value=StubResponse(503)) as get:
+            assert self.client.get_company("00000001") is None
+            assert self.client.get_company("00000001") is None
+        assert get.call_count == 2
+
+    def test_identical_requests_in_flight_are_coalesced(self):
+        fetching = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            fetching.set()
+            release.wait(5)
+            return {"company_name": "FAKE COMPANY LTD"}
+
+        results = []
+
+        def lookup():
+            results.append(self.client._coalesce("key", slow_fetch))
+
+        # the leader is only released once the 4 followers wait for its result
+        followers_waiting = threading.Barrier(5, timeout=5)
+
+        class FollowedEvent(threading.Event):
+            def wait(self, timeout=None):
+                followers_waiting.wait()
+                return super().wait(timeout)
+
+        leader = threading.Thread(target=lookup)
+        leader.start()
+        assert fetching.wait(5)
+        self.client._in_flight["key"].done = FollowedEvent()
+        followers = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        followers_waiting.wait()
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+        assert len(calls) == 1
+        assert results == [{"company_name": "FAKE COMPANY LTD"}] * 5
+
+    @override_settings(COMPANIES_HOUSE_BACKEND="stub")
+    def test_get_companies_house_client(self):
+        client = get_companies_house_client()
+        assert isinstance(client, StubCompaniesHouseClient)
+        assert get_companies_house_client() is client
@@ -1,56 +1,61 @@
+import os
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-from core.feature_flags import FeatureFlags, FeatureFlagNotFound
-from cases.tests.test_case import load_system_params
+from core.feature_flags import FeatureFlags, FeatureFlagNotFound, get_feature_flags, is_enabled
+from core.models import SystemParameter
+from core.system_parameters import get_system_parameter_store
 
 
 class CaseAPITest(TestCase):
     def setUp(self):
-        load_system_params()
+        SystemParameter.objects.create(key="FEATURE_MY_FLAG", data_type="int", value=1)
+        SystemParameter.objects.create(key="FEATURE_OTHER_FLAG", data_type="int", value=0)
+        SystemParameter.objects.create(key="NOT_A_FLAG", data_type="int", value=1)
         self.feature_flags = FeatureFlags()
 
-    @patch("core.feature_flags.SystemParameter.get")
-    @patch("core.feature_flags.cache")
-    def test_get_when_true(self, cache, get_param):
-        get_param.return_value = 1
-        cache.get.return_value = None
-
-        self.assertTrue(self.feature_flags("my_flag"))
-        get_param.assert_called_once_with("FEATURE_MY_FLAG")
-        cache.get.assert_called_once_with("FF:FEATURE_MY_FLAG")
-        cache.set.assert_called_once_with("FF:FEATURE_MY_FLAG", True, 300)
-
-    @patch("core.feature_flags.SystemParameter.get")
-    @patch("core.feature_flags.cache")
-    def test_get_when_false(self, cache, get_param):
-        get_param.return_value = 0
-        cache.get.return_value = None
-
-        self.assertFalse(self.feature_flags("my_flag"))
-        get_param.assert_called_once_with("FEATURE_MY_FLAG")
-        cache.get.assert_called_once_with("FF:FEATURE_MY_FLAG")
-        cache.set.assert_called_once_with("FF:FEATURE_MY_FLAG", False, 300)
-
-    @patch("core.feature_flags.SystemParameter.get")
-    @patch("core.feature_flags.cache")
-    def test_get_when_cached(self, cache, get_param):
-        cache.get.return_value = True
-
+    def test_get_when_true(self):
         self.assertTrue(self.feature_flags("my_flag"))
-        self.assertEqual(get_param.call_count, 0)
-        cache.get.assert_called_once_with("FF:FEATURE_MY_FLAG")
-        self.assertEqual(cache.set.call_count, 0)
+        self.assertTrue(is_enabled("MY_FLAG"))
 
-    @patch("core.feature_flags.SystemParameter.get")
-    @patch("core.feature_flags.cache")
-    def test_get_when_not_found(self, cache, get_param):
-        cache.get.return_value = None
-        get_param.return_value = None
+    def test_get_when_false(self):
+        self.assertFalse(self.feature_flags("other_flag"))
 
+    def test_get_when_not_found(self):
         with self.assertRaises(FeatureFlagNotFound):
+            self.feature_flags("not_a_flag")
+
+    def test_snapshot_is_read_once(self):
+        with self.assertNumQueries(1):
+            assert self.feature_flags.all() == {"my_flag": True, "other_flag": False}
             self.feature_flags("my_flag")
-            self.assertEqual(get_param.call_count, 0)
-            cache.get.assert_called_once_with("FF:FEATURE_MY_FLAG")
-            self.assertEqual(cache.set.call_count, 0)
+            self.feature_flags("other_flag")
+
+    @patch.dict(os.environ, {"SP_FEATURE_OTHER_FLAG": "1"})
+    def test_env_override(self):
+        self.assertTrue(self.feature_flags("other_flag"))
+
+
+@override_settings(SYSTEM_PARAMETERS_LOCAL_CACHE=True)
+class FeatureFlagSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_system_parameter_store().clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flag = SystemParameter.objects.create(
+                key="FEATURE_MY_FLAG", data_type="int", value=1
+            )
+
+    def test_snapshot_is_shared(self):
+        get_feature_flags()
+        with self.assertNumQueries(0):
+            assert FeatureFlags()("my_flag")
+            assert FeatureFlags().all() == {"my_flag": True}
+
+    def test_snapshot_follows_changes(self):
+        assert get_feature_flags() == {"my_flag": True}
+        self.flag.set_value(0)
+        self.flag.save()
+        assert get_feature_flags() == {"my_flag": False}
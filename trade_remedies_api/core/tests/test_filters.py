@@ -0,0 +1,123 @@
+import base64
+import json
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import ValidationError
+
+from cases.models import Case
+from config.filters import FilterStats, Lookup, decode_filter_parameters
+from config.test_bases import CaseSetupTestMixin
+from core.models import User
+from organisations.models import Organisation
+from test_functional import FunctionalTestBase
+
+
+def encode(filter_parameters):
+    return base64.urlsafe_b64encode(json.dumps(filter_parameters).encode()).decode()
+
+
+class LookupTest(SimpleTestCase):
+    def test_lookup(self):
+        lookup = Lookup(Case, "type__name__icontains")
+        assert lookup.path == "type__name"
+        assert lookup.operator == "icontains"
+        assert lookup.lookup == "type__name__icontains"
+        assert lookup.select_related == ["type"]
+
+    def test_lookup_of_foreign_key(self):
+        for name in ("type", "type_id", "type__pk"):
+            lookup = Lookup(Case, name)
+            assert lookup.operator == "exact"
+            assert lookup.select_related == []
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValidationError):
+            Lookup(Case, "type__unknown")
+        with self.assertRaises(ValidationError):
+            Lookup(Case, "name__type")
+
+    def test_many_valued_relations_must_be_allowed(self):
+        lookup = Lookup(Organisation, "organisationuser__user")
+        with self.assertRaises(ValidationError):
+            lookup.check_allowed(None, 2)
+        lookup.check_allowed({"organisationuser__user": "__all__"}, 2)
+        assert lookup.select_related == []
+
+    def test_lookups_ending_with_many_valued_relations_must_be_allowed(self):
+        for name in ("organisationuser", "organisationuser__isnull", "organisationcaserole__in"):
+            lookup = Lookup(Organisation, name)
+            assert lookup.many_valued
+            with self.assertRaises(ValidationError):
+                lookup.check_allowed(None, 2)
+        assert not Lookup(Case, "type").many_valued
+
+    def test_secret_fields(self):
+        for model, name in (
+            (User, "password__startswith"),
+            (Case, "created_by__password"),
+            (Case, "created_by__login_code__isnull"),
+        ):
+            with self.assertRaises(ValidationError):
+                Lookup(model, name)
+
+    def test_allowed_fields(self):
+        lookup = Lookup(Case, "name__icontains")
+        lookup.check_allowed({"name": ["exact", "icontains"]}, 2)
+        with self.assertRaises(ValidationError):
+            lookup.check_allowed({"name": ["exact"]}, 2)
+        with self.assertRaises(ValidationError):
+            lookup.check_allowed({"type": "__all__"}, 2)
+
+    def test_max_relations(self):
+        lookup = Lookup(Case, "stage__type__workflow__name")
+        lookup.check_allowed(None, 3)
+        with self.assertRaises(ValidationError):
+            lookup.check_allowed(None, 2)
+
+    def test_values(self):
+        Lookup(Case, "name__in").check_value(["one", "two"])
+        with self.assertRaises(ValidationError):
+            Lookup(Case, "name__in").check_value("one")
+        with self.assertRaises(ValidationError):
+            Lookup(Case, "archived_at__isnull").check_value("yes")
+
+    def test_decode_filter_parameters(self):
+        filter_parameters = {"name": "~~~???"}
+        standard = base64.b64encode(json.dumps(filter_parameters).encode()).decode()
+        assert decode_filter_parameters(standard) == filter_parameters
+        assert decode_filter_parameters(encode(filter_parameters).rstrip("=")) == filter_parameters
+        with self.assertRaises(ValidationError):
+            decode_filter_parameters("not json")
+        with self.assertRaises(ValidationError):
+            decode_filter_parameters(encode(["name"]))
+
+    def test_stats(self):
+        stats = FilterStats()
+        stats.record([Lookup(Case, "name"), Lookup(Case, "type_id")])
+        stats.record([Lookup(Case, "name")], rejected=True)
+        assert stats.most_common(1) == [
+            {
+                "model": "cases.Case",
+                "path": "name",
+                "operator": "exact",
+                "indexed": False,
+                "count": 2,
+                "rejected": 1,
+            }
+        ]
+        assert stats.most_common()[1]["indexed"]
+
+
+class FilterParametersTest(CaseSetupTestMixin, FunctionalTestBase):
+    def test_invalid_filter_parameters(self):
+        response = self.client.get(
+            f"/api/v2/organisations/?filter_parameters={encode({'unknown': 1})}"
+        )
+        assert response.status_code == 400
+
+    @override_settings(API_FILTER_MAX_QUERY_COST=0)
+    def test_expensive_filter_parameters(self):
+        response = self.client.get(
+            f"/api/v2/organisations/?filter_parameters={encode({'name': 'filter_1'})}"
+        )
+        assert response.status_code == 400
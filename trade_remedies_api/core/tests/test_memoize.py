@@ -0,0 +1,132 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from cases.models import CaseStage, CaseType
+from core.memoize import MISSING, MethodCache, request_memo
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class MethodCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.method_cache = MethodCache(max_size=2, timeout=30, clock=self.clock)
+
+    def test_get_and_set(self):
+        assert self.method_cache.get("to_dict", 1, "key") is MISSING
+        self.method_cache.set("to_dict", 1, "key", {"id": 1})
+        assert self.method_cache.get("to_dict", 1, "key") == {"id": 1}
+
+    def test_entries_expire(self):
+        self.method_cache.set("to_dict", 1, "key", {"id": 1})
+        self.clock.now = 30
+        assert self.method_cache.get("to_dict", 1, "key") is MISSING
+        assert not self.method_cache.entries
+        assert not self.method_cache.instance_keys
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.method_cache.set("to_dict", 1, "key", 1)
+        self.method_cache.set("to_dict", 2, "key", 2)
+        self.method_cache.get("to_dict", 1, "key")
+        self.method_cache.set("to_dict", 3, "key", 3)
+        assert self.method_cache.get("to_dict", 2, "key") is MISSING
+        assert self.method_cache.get("to_dict", 1, "key") == 1
+        assert self.method_cache.get("to_dict", 3, "key") == 3
+
+    def test_invalidate_instance(self):
+        self.method_cache.set("to_dict", 1, "key", 1)
+        self.method_cache.set("to_dict", 2, "key", 2)
+        self.method_cache.invalidate_instance("to_dict", 1)
+        assert self.method_cache.get("to_dict", 1, "key") is MISSING
+        assert self.method_cache.get("to_dict", 2, "key") == 2
+
+    def test_invalidate_method(self):
+        self.method_cache.set("to_dict", 1, "key", 1)
+        self.method_cache.set("to_minimal_dict", 1, "key", 2)
+        self.method_cache.invalidate_method("to_dict")
+        assert self.method_cache.get("to_dict", 1, "key") is MISSING
+        assert self.method_cache.get("to_minimal_dict", 1, "key") == 2
+
+    def test_disabled(self):
+        method_cache = MethodCache(max_size=0)
+        method_cache.set("to_dict", 1, "key", 1)
+        assert method_cache.get("to_dict", 1, "key") is MISSING
+
+    def test_stats(self):
+        for outcome in ("l1_hits", "l1_hits", "l2_hits", "misses"):
+            self.method_cache.record("to_dict", outcome)
+        stats = self.method_cache.stats()
+        assert stats["methods"]["to_dict"]["l1_hits"] == 2
+        assert stats["total"]["lookups"] == 4
+        assert stats["total"]["hit_ratio"] == 0.75
+
+
+class MemoizedMethodTest(TestCase):
+    def setUp(self):
+        self.case_type = CaseType.objects.create(name="Memoized", acronym="MM")
+        self.case_stage = CaseStage.objects.create(
+            key="MEMOIZED_STAGE", name="Memoized stage", type=self.case_type
+        )
+        self.method_cache = MethodCache()
+        patcher = patch("core.memoize._method_cache", self.method_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stats(self, method):
+        return self.method_cache.stats()["methods"][f"cases.models.casestage.CaseStage.{method}"]
+
+    def test_values_are_memoized_per_request(self):
+        with patch.object(self.method_cache, "max_size", 0):
+            with request_memo():
+                self.case_stage.to_embedded_dict()
+                self.case_stage.to_embedded_dict()
+            self.case_stage.to_embedded_dict()
+        stats = self.stats("to_embedded_dict")
+        assert stats["l1_hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_values_are_memoized_in_process(self):
+        self.case_stage.to_embedded_dict()
+        with self.assertNumQueries(0):
+            value = self.case_stage.to_embedded_dict()
+        assert value["key"] == "MEMOIZED_STAGE"
+        assert self.stats("to_embedded_dict")["l2_hits"] == 1
+
+    def test_callers_get_a_copy(self):
+        self.case_stage.to_embedded_dict()["name"] = "Changed"
+        assert self.case_stage.to_embedded_dict()["name"] == "Memoized stage"
+
+    def test_saving_an_instance_invalidates_its_values(self):
+        with request_memo():
+            self.case_stage.to_embedded_dict()
+            self.case_stage.name = "Renamed stage"
+            self.case_stage.save()
+            assert self.case_stage.to_embedded_dict()["name"] == "Renamed stage"
+
+    def test_saving_a_dependency_invalidates_all_values(self):
+        assert self.case_stage.to_dict()["type"]["name"] == "Memoized"
+        self.case_type.name = "Renamed"
+        self.case_type.save()
+        assert self.case_stage.to_dict()["type"]["name"] == "Renamed"
+
+    def test_unsaved_instances_are_not_memoized(self):
+        CaseStage(key="UNSAVED", name="Unsaved").to_embedded_dict()
+        assert not self.method_cache.stats()["methods"]
+
+    @override_settings(METHOD_CACHE_SHARED=True)
+    def test_values_are_shared_between_processes(self):
+        self.case_stage.to_dict()
+        with patch("core.memoize._method_cache", MethodCache()) as other_method_cache:
+            value = self.case_stage.to_dict()
+        assert value["type"]["name"] == "Memoized"
+        stats = other_method_cache.stats()["methods"]["cases.models.casestage.CaseStage.to_dict"]
+        assert stats["l3_hits"] == 1
+        # drop the shared value
+        self.case_stage.save()
@@ -1,8 +1,11 @@
 from unittest.mock import patch
 
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
 from rest_framework.test import APITestCase
 from cases.tests.test_case import load_system_params
-from core.notifier import send_mail, get_context, send_sms
+from config.ratelimit import CacheSlidingWindow
+from core.notifier import SharedRateLimiter, send_mail, get_context, send_sms
 
 
 def get_notify_response(**overrides):
@@ -105,3 +108,35 @@ class NotifierTest(APITestCase):
             personalisation=expected_personalisation,
             reference=None,
         )
+
+
+class SharedRateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        self.now = 0
+        self.sleeps = []
+        self.window_counter = CacheSlidingWindow(LocMemCache("notify", {}))
+        time_patch = patch("config.ratelimit.time.time", side_effect=lambda: self.now)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def limiter(self):
+        return SharedRateLimiter(
+            self.window_counter, "notify", limit=2, window=60, sleep=self.sleep
+        )
+
+    def test_acquire_within_limit(self):
+        limiter = self.limiter()
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(self.sleeps, [])
+
+    def test_limit_is_shared(self):
+        # the limiters of two worker processes count in the same window
+        self.limiter().acquire()
+        self.limiter().acquire()
+        self.limiter().acquire()
+        self.assertEqual(self.sleeps, [30, 30])
@@ -0,0 +1,93 @@
+import datetime
+import uuid
+
+from django.test import SimpleTestCase, override_settings
+from django_countries.fields import Country
+
+from cases.models import Case, CaseStage, CaseType
+from core.management.commands.benchmark_to_json import FIELDS, uncompiled_to_json
+from core.projection import freeze_fields, get_plan, parse_fields, parse_fields_list
+
+
+class ProjectionTest(SimpleTestCase):
+    def setUp(self):
+        self.case_type = CaseType(id=1, name="Anti-dumping", acronym="AD", colour="red")
+        self.case = Case(
+            id=uuid.UUID("5c8ed2a6-6d1a-4c43-b9d1-d9d2b1c3a8e4"),
+            name="Steel <bars>",
+            sequence=12,
+            initiated_sequence=3,
+            type=self.case_type,
+            stage=CaseStage(id=uuid.uuid4(), name="Initiation"),
+            created_at=datetime.datetime(2024, 1, 2, 12, tzinfo=datetime.timezone.utc),
+            initiated_at=None,
+        )
+
+    def test_to_json(self):
+        value = self.case.to_json(
+            {
+                "id": None,
+                "name": None,
+                "reference": None,
+                "created_at": None,
+                "initiated_at": None,
+                "type": {"name": None, "acronym": None},
+                "missing": None,
+            }
+        )
+        assert value == {
+            "id": "5c8ed2a6-6d1a-4c43-b9d1-d9d2b1c3a8e4",
+            "name": "Steel &lt;bars&gt;",
+            "reference": "AD0003",
+            "created_at": "2024-01-02T12:00:00+0000",
+            "initiated_at": None,
+            "type": {"name": "Anti-dumping", "acronym": "AD"},
+        }
+
+    def test_to_json_of_dicts(self):
+        value = self.case.to_json(
+            {"country": None, "meta": {"when": None}},
+            obj={"country": Country("GB"), "meta": {"when": datetime.date(2024, 1, 2)}},
+        )
+        assert value == {
+            "country": {"name": "United Kingdom", "code": "GB"},
+            "meta": {"when": "2024-01-02"},
+        }
+
+    def test_to_json_calls_methods(self):
+        value = self.case.to_json({"label": None}, obj={"label": self.case_type.__str__})
+        assert value == {"label": "Anti-dumping"}
+
+    def test_to_json_of_leaf_objects_uses_to_dict(self):
+        assert self.case.to_json({"type": None})["type"] == self.case_type.to_dict()
+
+    @override_settings(TIME_ZONE="Europe/Paris")
+    def test_time_zone_is_resolved_with_the_settings(self):
+        assert self.case.to_json({"created_at": None}) == {
+            "created_at": "2024-01-02T13:00:00+0100"
+        }
+
+    def test_matches_uncompiled_to_json(self):
+        assert self.case.to_json(FIELDS) == uncompiled_to_json(FIELDS, self.case)
+
+    def test_plans_are_cached(self):
+        spec = {"name": None, "type": {"name": None}}
+        fields = freeze_fields(spec)
+        assert get_plan(Case, fields) is get_plan(Case, freeze_fields(spec))
+        self.case.to_json(fields)
+        assert CaseType in get_plan(Case, fields).fields[1][3]
+
+    def test_get_fields(self):
+        fields = '{"Case": {"name": null, "type": {"name": null}}, "Other": {"id": null}}'
+        assert self.case.get_fields(fields=fields) == (("name", None), ("type", (("name", None),)))
+        assert parse_fields(fields) is parse_fields(fields)
+        assert self.case.to_dict(fields=fields) == {
+            "name": "Steel &lt;bars&gt;",
+            "type": {"name": "Anti-dumping"},
+        }
+
+    def test_parse_fields_list(self):
+        assert parse_fields_list("name, type[name, acronym]") == {
+            "name": None,
+            "type": {"name": None, "acronym": None},
+        }
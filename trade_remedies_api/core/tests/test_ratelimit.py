@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django_ratelimit.exceptions import Ratelimited
+
+from config.ratelimit import (
+    CacheSlidingWindow,
+    RateLimiter,
+    RateLimitMixin,
+    get_limiter,
+    parse_rate,
+)
+
+
+class TestRateLimiter(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 0
+        self.window_counter = CacheSlidingWindow(cache)
+        self.window_counter.hit = MagicMock(wraps=self.window_counter.hit)
+        self.limiter = RateLimiter(
+            self.window_counter, local_fraction=0.5, local_sync_seconds=1, clock=lambda: self.now
+        )
+
+    def test_parse_rate(self):
+        assert parse_rate("500/m") == (500, 60)
+        assert parse_rate("10/5s") == (10, 5)
+        assert parse_rate("1/h") == (1, 3600)
+
+    def test_sliding_window(self):
+        assert self.window_counter.hit("key", 2, 60) == (True, 1)
+        assert self.window_counter.hit("key", 2, 60) == (True, 2)
+        assert self.window_counter.hit("key", 2, 60) == (False, 2)
+        # pending hits are recorded even when the new hit is not allowed
+        assert self.window_counter.hit("other", 2, 60, pending=2) == (False, 2)
+
+    def test_limit(self):
+        assert self.limiter.is_allowed("key", "1/h")
+        assert not self.limiter.is_allowed("key", "1/h")
+        assert not self.limiter.is_allowed("key", "1/h")
+
+    def test_local_pre_check(self):
+        # the first hit syncs with the window counter, the next 4 (under half of the limit)
+        # are allowed locally, then the pending hits are recorded with the next sync
+        for _ in range(6):
+            assert self.limiter.is_allowed("key", "10/m")
+        assert self.window_counter.hit.call_count == 2
+        assert self.window_counter.hit.call_args.kwargs["pending"] == 4
+
+        # clients are synced at least every local_sync_seconds
+        self.now = 2
+        assert self.limiter.is_allowed("key", "10/m")
+        assert self.window_counter.hit.call_count == 3
+
+    def test_local_pre_check_never_exceeds_limit(self):
+        allowed = sum(self.limiter.is_allowed("key", "10/m") for _ in range(20))
+        assert allowed == 10
+
+
+class TestRateLimitMixin(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        get_limiter().buckets.clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    @override_settings(API_RATELIMIT_ENABLED=True, API_RATELIMIT_RATE="1/h")
+    def test_views_share_the_default_limit(self):
+        class FirstView(RateLimitMixin):
+            pass
+
+        class SecondView(RateLimitMixin):
+            pass
+
+        class OwnRateView(RateLimitMixin):
+            ratelimit_rate = "1/h"
+
+        FirstView().check_rate_limit(self.request)
+        with self.assertRaises(Ratelimited):
+            SecondView().check_rate_limit(self.request)
+        # views with their own rate are limited separately
+        OwnRateView().check_rate_limit(self.request)
@@ -1,5 +1,11 @@
-from django.test import TestCase
+import os
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
 from core.models import SystemParameter
+from core.system_parameters import get_system_parameter_store
 from django.contrib.contenttypes.models import ContentType
 from documents.models import Document
 
@@ -47,3 +53,50 @@ class SystemParameterTest(TestCase):
         assert isinstance(value, dict)
         assert value["one"] == 1
         assert value["two"] == 2
+
+    def test_list_with_content_type_is_resolved_in_bulk(self):
+        with self.assertNumQueries(2):
+            value = SystemParameter.get("MODELS")
+        assert [document.name for document in value] == ["Doc 1", "Doc 2"]
+
+    @patch.dict(os.environ, {"SP_STRING": "overridden"})
+    def test_env_override(self):
+        assert SystemParameter.get("STRING") == "overridden"
+
+
+@override_settings(SYSTEM_PARAMETERS_LOCAL_CACHE=True)
+class SystemParameterStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_system_parameter_store().clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            SystemParameter.objects.create(key="STRING", value="str_value")
+            SystemParameter.objects.create(key="DICT", value={"one": 1})
+
+    def test_parameters_loaded_once(self):
+        with self.assertNumQueries(1):
+            assert SystemParameter.get("STRING") == "str_value"
+            assert SystemParameter.get("DICT") == {"one": 1}
+            assert SystemParameter.get("MISSING", "default") == "default"
+
+    def test_values_are_copies(self):
+        SystemParameter.get("DICT")["one"] = 2
+        assert SystemParameter.get("DICT") == {"one": 1}
+
+    def test_changes_invalidate_parameters(self):
+        SystemParameter.get("STRING")
+        parameter = SystemParameter.objects.get(key="STRING")
+        parameter.set_value("new_value")
+        parameter.save()
+        assert SystemParameter.get("STRING") == "new_value"
+
+    def test_uncommitted_changes_are_not_stored(self):
+        SystemParameter.get("STRING")
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                parameter = SystemParameter.objects.get(key="STRING")
+                parameter.set_value("new_value")
+                parameter.save()
+                assert SystemParameter.get("STRING") == "new_value"
+                raise ValueError()
+        assert SystemParameter.get("STRING") == "str_value"
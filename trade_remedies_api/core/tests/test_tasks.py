@@ -1,12 +1,12 @@
 from unittest.mock import patch, Mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from notifications_python_client.errors import HTTPError
 
 from audit import AUDIT_TYPE_NOTIFY, AUDIT_TYPE_EVENT
 from audit.models import Audit
 from cases.models import Case
-from core.tasks import send_mail, SEND_MAIL_MAX_RETRIES, SEND_MAIL_COUNTDOWN
+from core.tasks import send_bulk_mail, send_mail, SEND_MAIL_MAX_RETRIES, SEND_MAIL_COUNTDOWN
 from core.user_context import UserContext
 from core.models import User
 
@@ -119,3 +119,64 @@ class SendMailTest(TestCase):
         )
         self.assertEqual(sync_send.call_count, 1)
         self.assertEqual(Audit.objects.all().count(), 1)
+
+
+@override_settings(RUN_ASYNC=False)
+@patch("core.tasks.get_worker_client")
+class SendBulkMailTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="test@user.com", name="Joe Public")  # /PS-IGNORE
+        self.case = Case.objects.create(
+            created_by=self.user, name="Untitled", user_context=UserContext(self.user)
+        )
+        Audit.objects.all().delete()
+        self.recipients = [
+            {
+                "email": f"user{index}@trade.gov.uk",  # /PS-IGNORE
+                "context": {"full_name": f"User {index}"},
+                "model": self.user,
+            }
+            for index in range(5)
+        ]
+        self.audit_kwargs = {"user": self.user, "case": self.case}
+
+    def test_bulk_send(self, get_worker_client):
+        client = get_worker_client()
+        client.send_email_notification.return_value = notify_response
+        sent = send_bulk_mail(
+            self.recipients,
+            "my-template-1",
+            context={"a": "b"},
+            audit_kwargs=self.audit_kwargs,
+            chunk_size=2,
+        )
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(client.send_email_notification.call_count, 5)
+        personalisation = client.send_email_notification.call_args.kwargs["personalisation"]
+        self.assertEqual(personalisation["a"], "b")
+        self.assertEqual(personalisation["full_name"], "User 4")
+        audits = Audit.objects.all()
+        self.assertEqual(audits.count(), 5)
+        for audit in audits:
+            self.assertEqual(audit.type, AUDIT_TYPE_NOTIFY)
+            self.assertEqual(audit.created_by, self.user)
+            self.assertEqual(audit.model_id, self.user.id)
+            self.assertEqual(audit.data["case_title"], str(self.case))
+            self.assertEqual(audit.data["send_report"]["id"], notify_response["id"])
+
+    def test_bulk_send_with_error(self, get_worker_client):
+        client = get_worker_client()
+        client.send_email_notification.side_effect = [
+            notify_response,
+            create_error_response(message="BadRequest"),
+        ]
+        send_bulk_mail(self.recipients[:2], "my-template-1", audit_kwargs=self.audit_kwargs)
+
+        self.assertEqual(client.send_email_notification.call_count, 2)
+        errors = [
+            audit.data["send_report"].get("error")
+            for audit in Audit.objects.all()
+            if "error" in audit.data["send_report"]
+        ]
+        self.assertEqual(errors, [["BadRequest"]])
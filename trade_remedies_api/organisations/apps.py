@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class OrganisationsConfig(AppConfig):
     name = "organisations"
+
+    def ready(self):
+        import organisations.receivers  # noqa F401
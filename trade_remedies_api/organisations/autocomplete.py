@@ -0,0 +1,131 @@
+"""
+Organisation autocomplete: search organisations by (partial) name or Companies House number.
+
+Names are matched against the normalised name_key, so the substring match is resolved
+with the trigram GIN index on it, and Companies House numbers are matched on a prefix of
+the normalised companies_house_key, which uses its pattern index. Results are ranked by
+prefix match, name similarity then recency, capped at AUTOCOMPLETE_LIMIT, and returned
+with an annotated case count.
+
+Each autocomplete keystroke is a new search, so results are cached briefly per search.
+Saving or deleting an organisation or organisation case role moves to a new cache
+version (see organisations.receivers), which invalidates every cached search at once.
+"""
+
+import hashlib
+import uuid
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import BooleanField, Case, Count, Q, Value, When
+
+from organisations.models import Organisation
+from organisations.utils import normalise_reference, normalise_text
+from security.constants import ROLE_PREPARING
+
+AUTOCOMPLETE_LIMIT = 50
+AUTOCOMPLETE_VERSION_CACHE_KEY = "organisation_autocomplete_version"
+AUTOCOMPLETE_CACHE_KEY = "organisation_autocomplete:{version}:{digest}"
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+AUTOCOMPLETE_FIELDS = ("id", "name", "address", "post_code", "companies_house_id")
+
+
+def get_autocomplete_version():
+    version = cache.get(AUTOCOMPLETE_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(AUTOCOMPLETE_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+def invalidate_organisation_autocomplete(*args, **kwargs):
+    """
+    Invalidate all cached autocomplete results by moving to a new cache version.
+    Can be connected directly as a signal receiver.
+    """
+    cache.set(AUTOCOMPLETE_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def autocomplete_queryset(
+    search_string, case_id=None, exclude_id=None, limit=AUTOCOMPLETE_LIMIT, queryset=None
+):
+    """
+    Return a queryset of the best matching organisations for a search string, as dicts of
+    AUTOCOMPLETE_FIELDS and their case_count. The organisations are searched in the given
+    queryset (e.g. the queryset of the viewset), or in all the organisations.
+    """
+    if queryset is None:
+        queryset = Organisation.objects.all()
+    name_query = normalise_text(search_string)
+    reference_query = normalise_reference(search_string)
+    if not name_query:
+        return queryset.none().values(*AUTOCOMPLETE_FIELDS)
+
+    match = Q(name_key__contains=name_query)
+    prefix_match = Q(name_key__startswith=name_query)
+    if reference_query:
+        match |= Q(companies_house_key__startswith=reference_query)
+        prefix_match |= Q(companies_house_key__startswith=reference_query)
+
+    queryset = queryset.filter(match, deleted_at__isnull=True)
+    if case_id:
+        # exclude organisations already associated with the case
+        queryset = queryset.exclude(organisationcaserole__case=case_id)
+    if exclude_id:
+        queryset = queryset.exclude(id=exclude_id)
+
+    return (
+        queryset.annotate(
+            prefix_match=Case(
+                When(prefix_match, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            similarity=TrigramSimilarity("name_key", name_query),
+        )
+        .order_by("-prefix_match", "-similarity", "-last_modified")
+        .values(*AUTOCOMPLETE_FIELDS)
+        .annotate(
+            case_count=Count(
+                "organisationcaserole",
+                filter=~Q(organisationcaserole__role_id=ROLE_PREPARING),
+            )
+        )[:limit]
+    )
+
+
+def autocomplete(search_string, case_id=None, exclude_id=None, queryset=None):
+    """
+    Return a list of the best matching organisations for a search string in a queryset
+    (see autocomplete_queryset), cached for AUTOCOMPLETE_CACHE_TIMEOUT seconds.
+    """
+    queryset_key = ""
+    if queryset is not None:
+        # results are cached per queryset searched, which may be restricted
+        try:
+            queryset_key = str(queryset.query)
+        except EmptyResultSet:
+            return []
+    search = "|".join(
+        [
+            normalise_text(search_string) or "",
+            str(case_id or ""),
+            str(exclude_id or ""),
+            queryset_key,
+        ]
+    )
+    cache_key = AUTOCOMPLETE_CACHE_KEY.format(
+        version=get_autocomplete_version(),
+        digest=hashlib.sha256(search.encode("utf8")).hexdigest(),
+    )
+    results = cache.get(cache_key)
+    if results is None:
+        results = [
+            {**organisation, "id": str(organisation["id"])}
+            for organisation in autocomplete_queryset(
+                search_string, case_id=case_id, exclude_id=exclude_id, queryset=queryset
+            )
+        ]
+        cache.set(cache_key, results, AUTOCOMPLETE_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,38 @@
+"""
+Cached organisation card data.
+
+The data required to render the organisation card (see Organisation.organisation_card_data)
+is cached per organisation. Writes to the organisation, its users, case roles, case contacts
+and invitations invalidate the card of the organisations involved (see organisations.receivers),
+changes elsewhere (e.g. to the cases themselves) are picked up when the card expires.
+"""
+
+from django.core.cache import cache
+
+ORGANISATION_CARD_CACHE_KEY = "organisation_card:{organisation_id}"
+ORGANISATION_CARD_CACHE_TIMEOUT = 60 * 10
+
+
+def get_organisation_card_data(organisation):
+    """
+    Return the organisation card data of an organisation, building and caching it if required.
+    """
+    cache_key = ORGANISATION_CARD_CACHE_KEY.format(organisation_id=organisation.id)
+    card_data = cache.get(cache_key)
+    if card_data is None:
+        card_data = organisation.organisation_card_data()
+        cache.set(cache_key, card_data, ORGANISATION_CARD_CACHE_TIMEOUT)
+    return card_data
+
+
+def invalidate_organisation_cards(*organisation_ids):
+    """
+    Invalidate the cached organisation card data of the given organisations.
+    """
+    cache.delete_many(
+        [
+            ORGANISATION_CARD_CACHE_KEY.format(organisation_id=organisation_id)
+            for organisation_id in organisation_ids
+            if organisation_id
+        ]
+    )
@@ -0,0 +1,203 @@
+import logging
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from organisations.models import (
+    DuplicateOrganisationMerge,
+    Organisation,
+    OrganisationMergeRecord,
+    SubmissionOrganisationMergeRecord,
+)
+from organisations.utils import ORGANISATION_MATCH_KEYS
+
+logger = logging.getLogger(__name__)
+
+# Pairs of organisations sharing a match key, or with similar names, scored in one
+# statement for a whole batch of organisations. The joins are resolved with the
+# match key indexes and the trigram index on name_key.
+_SCORE_PAIRS_SQL = """
+    SELECT
+        source.id,
+        candidate.id,
+        {key_matches} AS key_matches,
+        similarity(source.name_key, candidate.name_key) AS name_similarity
+    FROM organisations_organisation source
+    JOIN organisations_organisation candidate
+    ON candidate.id != source.id AND candidate.deleted_at IS NULL AND (
+        {key_conditions} OR source.name_key %% candidate.name_key
+    )
+    WHERE source.id = ANY(%s)
+"""
+
+
+class DuplicateOrganisationScanner:
+    """
+    Find potential duplicates across all organisations, equivalent to running
+    `Organisation.find_potential_duplicate_orgs` for each one of them.
+
+    Only organisations created or modified since their last search are scanned, a
+    batch at a time, so runs are incremental. Each batch is committed with its search
+    time, so an interrupted scan resumes where it stopped. Candidate pairs are blocked
+    on the normalised match keys and trigram similarity of the names, scored in SQL for
+    the whole batch, and potential duplicates are recorded for both organisations of a
+    pair with bulk inserts. Pending potential duplicates which no longer match are removed.
+    """
+
+    def __init__(self, batch_size=500, similarity_threshold=0.8):
+        self.batch_size = batch_size
+        self.similarity_threshold = similarity_threshold
+
+    def organisations_to_scan(self, after_id=None):
+        """
+        Return the ids of the organisations not searched since they last changed,
+        excluding those with a locked (ad-hoc) merge record.
+        """
+        organisations = Organisation.objects.filter(deleted_at__isnull=True)
+        if after_id:
+            organisations = organisations.filter(id__gt=after_id)
+        return (
+            organisations.filter(
+                Q(merge_record__isnull=True)
+                | Q(merge_record__last_searched__isnull=True)
+                | Q(last_modified__gt=F("merge_record__last_searched"))
+            )
+            .exclude(merge_record__locked=True)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def score_pairs(self, organisation_ids):
+        """
+        Return the (organisation id, candidate id, key matches, name similarity)
+        of all candidate pairs of the given organisations.
+        """
+        sql = _SCORE_PAIRS_SQL.format(
+            key_matches=" + ".join(
+                # a NULL key on either side would make the whole sum NULL
+                f"COALESCE((source.{key} = candidate.{key})::int, 0)"
+                for key in ORGANISATION_MATCH_KEYS
+            ),
+            key_conditions=" OR ".join(
+                f"source.{key} = candidate.{key}" for key in ORGANISATION_MATCH_KEYS
+            ),
+        )
+        with connection.cursor() as cursor:
+            # the threshold of the % operator, for the current transaction only
+            cursor.execute(
+                "SELECT set_config('pg_trgm.similarity_threshold', %s, true)",
+                [str(self.similarity_threshold)],
+            )
+            cursor.execute(sql, [list(organisation_ids)])
+            return cursor.fetchall()
+
+    def is_duplicate(self, key_matches, name_similarity):
+        return bool(key_matches) or (name_similarity or 0) >= self.similarity_threshold
+
+    def scan(self):
+        """
+        Scan all organisations due, returning the number of organisations scanned
+        and of new potential duplicates found.
+        """
+        scanned = found = 0
+        last_id = None
+        while True:
+            organisation_ids = list(self.organisations_to_scan(after_id=last_id)[: self.batch_size])
+            if not organisation_ids:
+                break
+            found += self.scan_batch(organisation_ids)
+            scanned += len(organisation_ids)
+            last_id = organisation_ids[-1]
+            logger.info(f"Scanned {scanned} organisations for duplicates, found {found}")
+        return {"scanned": scanned, "found": found}
+
+    @transaction.atomic
+    def scan_batch(self, organisation_ids):
+        """
+        Record the potential duplicates of a batch of organisations.
+        Returns the number of new potential duplicates.
+        """
+        now = timezone.now()
+        source_ids = set(organisation_ids)
+        matches = defaultdict(set)
+        for organisation_id, candidate_id, key_matches, name_similarity in self.score_pairs(
+            organisation_ids
+        ):
+            if self.is_duplicate(key_matches, name_similarity):
+                # duplication is symmetric, so both organisations get a potential duplicate
+                matches[organisation_id].add(candidate_id)
+                matches[candidate_id].add(organisation_id)
+
+        # make sure every organisation involved has a merge record
+        parent_ids = source_ids | set(matches)
+        existing_records = set(
+            OrganisationMergeRecord.objects.filter(parent_organisation__in=parent_ids).values_list(
+                "parent_organisation_id", flat=True
+            )
+        )
+        OrganisationMergeRecord.objects.bulk_create(
+            [
+                OrganisationMergeRecord(parent_organisation_id=parent_id)
+                for parent_id in parent_ids - existing_records
+            ]
+        )
+        locked_ids = set(
+            OrganisationMergeRecord.objects.filter(
+                parent_organisation__in=parent_ids, locked=True
+            ).values_list("parent_organisation_id", flat=True)
+        )
+
+        # remove the pending potential duplicates of the scanned organisations (in either
+        # direction) which no longer match
+        existing = DuplicateOrganisationMerge.objects.filter(
+            Q(merge_record__in=source_ids) | Q(child_organisation__in=source_ids)
+        ).exclude(merge_record__in=locked_ids)
+        existing_pairs = set()
+        stale_ids = []
+        affected_ids = set(parent_ids)
+        for duplicate_id, parent_id, child_id, status in existing.values_list(
+            "id", "merge_record_id", "child_organisation_id", "status"
+        ):
+            if child_id in matches.get(parent_id, ()):
+                existing_pairs.add((parent_id, child_id))
+            elif status == "pending":
+                stale_ids.append(duplicate_id)
+                affected_ids.add(parent_id)
+        DuplicateOrganisationMerge.objects.filter(id__in=stale_ids).delete()
+
+        new_duplicates = [
+            DuplicateOrganisationMerge(merge_record_id=parent_id, child_organisation_id=child_id)
+            for parent_id, child_ids in matches.items()
+            if parent_id not in locked_ids
+            for child_id in child_ids
+            if (parent_id, child_id) not in existing_pairs
+        ]
+        DuplicateOrganisationMerge.objects.bulk_create(new_duplicates)
+
+        # update the status of all affected merge records
+        affected_ids -= locked_ids
+        with_new_ids = {duplicate.merge_record_id for duplicate in new_duplicates}
+        with_pending_ids = set(
+            DuplicateOrganisationMerge.objects.filter(
+                merge_record__in=affected_ids, status="pending"
+            ).values_list("merge_record_id", flat=True)
+        )
+        OrganisationMergeRecord.objects.filter(
+            parent_organisation__in=with_new_ids | with_pending_ids
+        ).update(status="duplicates_found")
+        OrganisationMergeRecord.objects.filter(
+            parent_organisation__in=affected_ids - with_new_ids - with_pending_ids
+        ).update(status="no_duplicates_found")
+        SubmissionOrganisationMergeRecord.objects.filter(
+            organisation_merge_record__in=with_new_ids, status="complete"
+        ).update(status="not_started")
+        SubmissionOrganisationMergeRecord.objects.filter(
+            organisation_merge_record__in=with_pending_ids - with_new_ids, status="complete"
+        ).update(status="in_progress")
+
+        OrganisationMergeRecord.objects.filter(
+            parent_organisation__in=source_ids - locked_ids
+        ).update(last_searched=now)
+        return len(new_duplicates)
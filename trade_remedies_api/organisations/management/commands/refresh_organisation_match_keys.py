@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from organisations.models import Organisation
+from organisations.utils import ORGANISATION_MATCH_KEYS
+
+
+class Command(BaseCommand):
+    help = "Compute the normalised duplicate matching keys of all organisations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of organisations updated per query",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        source_fields = [field for field, _ in ORGANISATION_MATCH_KEYS.values()]
+        organisations = Organisation.objects.only("id", *source_fields).order_by("id")
+        batch = []
+        updated = 0
+        for organisation in organisations.iterator(chunk_size=batch_size):
+            organisation.set_match_keys()
+            batch.append(organisation)
+            if len(batch) >= batch_size:
+                updated += Organisation.objects.bulk_update(batch, list(ORGANISATION_MATCH_KEYS))
+                batch = []
+        if batch:
+            updated += Organisation.objects.bulk_update(batch, list(ORGANISATION_MATCH_KEYS))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed match keys of {updated} organisations"))
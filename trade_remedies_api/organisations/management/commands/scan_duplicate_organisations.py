@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from organisations.duplicates import DuplicateOrganisationScanner
+
+
+class Command(BaseCommand):
+    help = (
+        "Find potential duplicates of all organisations changed since their last search. "
+        "The scan is incremental and can be resumed if interrupted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of organisations scanned per transaction",
+        )
+        parser.add_argument(
+            "--similarity",
+            type=float,
+            default=0.8,
+            help="Minimum trigram similarity of names to consider organisations duplicates",
+        )
+
+    def handle(self, *args, **options):
+        result = DuplicateOrganisationScanner(
+            batch_size=options["batch_size"], similarity_threshold=options["similarity"]
+        ).scan()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scanned {result['scanned']} organisations, "
+                f"found {result['found']} potential duplicates"
+            )
+        )
@@ -0,0 +1,192 @@
+"""
+Set-based organisation merge engine.
+
+Merging a child organisation into a parent organisation re-associates all the records of the
+child (users, user cases, contacts, case roles, submissions and invitations) with the parent,
+then deletes the child. The full merge plan is computed up front from a handful of queries,
+and is then applied as a few UPDATE/DELETE statements inside one transaction. The plan can
+also be returned on its own (a dry run) to preview the merge.
+
+The statements bypass model signals and per-row audits: the derived data they would refresh
+(case listings, cached organisation cards, autocomplete results and case access maps) is
+refreshed explicitly, and the merge is audited once by the caller (see
+OrganisationMergeRecord.merge_organisations).
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cases.models.submission import Submission
+from contacts.models import Contact
+from security.constants import ROLE_AWAITING_APPROVAL, ROLE_PREPARING
+from security.models import OrganisationCaseRole, OrganisationUser, UserCase
+
+
+class OrganisationMerge:
+    """
+    Merge the child_organisation into the parent_organisation.
+
+    chosen_case_roles is an optional dict of case id to the id of the OrganisationCaseRole the
+    caseworkers want the merged organisation to keep in that case, when both organisations are
+    in the same case. If there is no preference for a case, the parent's role is kept, unless
+    the parent has not yet accepted it (awaiting approval or preparing), in which case the
+    child's role is kept. A ValueError is raised if a chosen role is not a role of either
+    organisation in that case.
+    """
+
+    def __init__(self, parent_organisation, child_organisation, chosen_case_roles=None):
+        self.parent_organisation = parent_organisation
+        self.child_organisation = child_organisation
+        self.chosen_case_roles = chosen_case_roles or {}
+        self._plan = None
+
+    def plan(self):
+        """
+        Return the merge plan, a JSON serialisable dict of the records that will be
+        moved to the parent organisation or deleted by the merge.
+        """
+        if self._plan is None:
+            self._plan = {
+                "parent_organisation": str(self.parent_organisation.id),
+                "child_organisation": str(self.child_organisation.id),
+                "organisation_users": self._plan_organisation_users(),
+                "case_roles": self._plan_case_roles(),
+                "user_cases": UserCase.objects.filter(
+                    organisation=self.child_organisation
+                ).count(),
+                "contacts": Contact.objects.filter(organisation=self.child_organisation).count(),
+                "submissions": Submission.objects.filter(
+                    organisation=self.child_organisation
+                ).count(),
+                "invitations": self._invitations().count(),
+            }
+        return self._plan
+
+    def _invitations(self):
+        from invitations.models import Invitation
+
+        return Invitation.objects.filter(organisation=self.child_organisation)
+
+    def _plan_organisation_users(self):
+        """
+        Users of the child organisation who are not members of the parent are moved to it,
+        the memberships of those who already are members are deleted.
+        """
+        parent_user_ids = set(
+            OrganisationUser.objects.filter(organisation=self.parent_organisation).values_list(
+                "user_id", flat=True
+            )
+        )
+        plan = {"move": [], "delete": []}
+        for organisation_user_id, user_id in (
+            OrganisationUser.objects.filter(organisation=self.child_organisation)
+            .order_by("created_at", "id")
+            .values_list("id", "user_id")
+        ):
+            action = "delete" if user_id in parent_user_ids else "move"
+            plan[action].append(str(organisation_user_id))
+        return plan
+
+    def _plan_case_roles(self):
+        """
+        Case roles of the child organisation in cases the parent is not in are moved to the
+        parent. In cases both organisations are in, the chosen role is kept (and moved to the
+        parent) and the other roles of both organisations are deleted.
+        """
+        roles_by_case = defaultdict(lambda: {"parent": [], "child": []})
+        case_roles = (
+            OrganisationCaseRole.objects.filter(
+                organisation__in=[self.parent_organisation, self.child_organisation]
+            )
+            .order_by("created_at", "id")
+            .values_list("id", "case_id", "role_id", "organisation_id")
+        )
+        for case_role_id, case_id, role_id, organisation_id in case_roles:
+            side = "parent" if organisation_id == self.parent_organisation.id else "child"
+            roles_by_case[case_id][side].append((str(case_role_id), role_id))
+
+        plan = {"move": [], "keep": {}, "delete": []}
+        for case_id, roles in roles_by_case.items():
+            if not roles["child"]:
+                continue
+            if not roles["parent"]:
+                plan["move"].extend(case_role_id for case_role_id, _ in roles["child"])
+                continue
+            if chosen_role_id := self.chosen_case_roles.get(str(case_id)):
+                # there has been a preference selected for this case, so we will use that
+                chosen_role_id = str(chosen_role_id)
+                if chosen_role_id not in {
+                    case_role_id for case_role_id, _ in roles["parent"] + roles["child"]
+                }:
+                    # keeping a stale choice would delete all the roles in the case
+                    raise ValueError(
+                        "The case role chosen is not a role of the organisations in the case",
+                        str(case_id),
+                    )
+            else:
+                chosen_role_id, parent_role = roles["parent"][0]
+                if parent_role in [ROLE_AWAITING_APPROVAL, ROLE_PREPARING]:
+                    # the parent org has not yet accepted the role,
+                    # so we will use the child org's role
+                    chosen_role_id = roles["child"][0][0]
+            plan["keep"][str(case_id)] = chosen_role_id
+            plan["delete"].extend(
+                case_role_id
+                for case_role_id, _ in roles["parent"] + roles["child"]
+                if case_role_id != chosen_role_id
+            )
+        return plan
+
+    @transaction.atomic
+    def apply(self):
+        """
+        Apply the merge plan, returning it.
+        """
+        from cases.models import CaseListing
+        from organisations.autocomplete import invalidate_organisation_autocomplete
+        from organisations.cards import invalidate_organisation_cards
+        from organisations.models import Organisation
+        from security.access import invalidate_case_access
+
+        plan = self.plan()
+        parent = self.parent_organisation
+        child = self.child_organisation
+
+        users = plan["organisation_users"]
+        OrganisationUser.objects.filter(id__in=users["delete"]).delete()
+        OrganisationUser.objects.filter(id__in=users["move"]).update(organisation=parent)
+
+        UserCase.objects.filter(organisation=child).update(organisation=parent)
+        # updating the contacts, this will also update the CaseContact object
+        Contact.objects.filter(organisation=child).update(organisation=parent)
+
+        case_roles = plan["case_roles"]
+        affected_case_ids = set(
+            OrganisationCaseRole.objects.filter(
+                Q(id__in=case_roles["move"]) | Q(id__in=case_roles["delete"])
+            ).values_list("case_id", flat=True)
+        ) | set(Submission.objects.filter(organisation=child).values_list("case_id", flat=True))
+        OrganisationCaseRole.objects.filter(id__in=case_roles["delete"]).delete()
+        OrganisationCaseRole.objects.filter(
+            id__in=case_roles["move"] + list(case_roles["keep"].values())
+        ).update(organisation=parent)
+
+        Submission.objects.filter(organisation=child).update(organisation=parent)
+        self._invitations().update(organisation=parent)
+
+        child.deleted_at = timezone.now()
+        Organisation.objects.filter(id=child.id).update(deleted_at=child.deleted_at)
+
+        def invalidate_caches():
+            invalidate_organisation_cards(parent.id, child.id)
+            invalidate_organisation_autocomplete()
+            invalidate_case_access()
+
+        CaseListing.objects.refresh_on_commit(*affected_case_ids)
+        # once committed only, so the dry runs of merges, which are rolled back, leave the
+        # caches alone
+        transaction.on_commit(invalidate_caches)
+        return plan
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.21 on 2026-10-19 12:05
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+from organisations.utils import ORGANISATION_MATCH_KEYS
+
+BATCH_SIZE = 1000
+
+
+def set_match_keys(apps, schema_editor):
+    """
+    Compute the match keys of the existing organisations, a batch at a time.
+    """
+    Organisation = apps.get_model("organisations", "Organisation")
+    source_fields = [field for field, _ in ORGANISATION_MATCH_KEYS.values()]
+    organisations = Organisation.objects.only("id", *source_fields).order_by("id")
+    batch = []
+    for organisation in organisations.iterator(chunk_size=BATCH_SIZE):
+        for key_field, (field, normalise) in ORGANISATION_MATCH_KEYS.items():
+            setattr(organisation, key_field, normalise(getattr(organisation, field)))
+        batch.append(organisation)
+        if len(batch) == BATCH_SIZE:
+            Organisation.objects.bulk_update(batch, list(ORGANISATION_MATCH_KEYS))
+            batch = []
+    if batch:
+        Organisation.objects.bulk_update(batch, list(ORGANISATION_MATCH_KEYS))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organisations", "0032_auto_20230620_1007"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organisation",
+            name="name_key",
+            field=models.CharField(blank=True, db_index=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name="organisation",
+            name="address_key",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="organisation",
+            name="duns_key",
+            field=models.CharField(blank=True, db_index=True, max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name="organisation",
+            name="companies_house_key",
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name="organisation",
+            name="vat_key",
+            field=models.CharField(blank=True, db_index=True, max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name="organisation",
+            name="eori_key",
+            field=models.CharField(blank=True, db_index=True, max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name="organisation",
+            name="website_key",
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="organisation",
+            index=django.contrib.postgres.indexes.HashIndex(
+                fields=["address_key"], name="organisation_address_key_idx"
+            ),
+        ),
+        migrations.RunPython(set_match_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-19 12:40
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("organisations", "0033_organisation_match_keys"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="organisation",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name_key"],
+                name="organisation_name_key_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -1,29 +1,27 @@
 import logging
 import uuid
+from collections import defaultdict
 from functools import singledispatch
 
-import django.db.models
-import requests
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, HashIndex
 from django.db import connection, models, transaction
-from django.db.models import F, Q, Value
-from django.db.models.functions import Replace
+from django.db.models import Exists, F, OuterRef, Prefetch, Q, Subquery
 from django.utils import timezone
 from django.utils.html import escape
 from django_countries.fields import CountryField
-from tldextract import tldextract
 
 from audit import AUDIT_TYPE_NOTIFY, AUDIT_TYPE_ORGANISATION_MERGED
 from audit.utils import audit_log
-from cases.constants import SUBMISSION_TYPE_REGISTER_INTEREST, TRA_ORGANISATION_ID
+from cases.constants import TRA_ORGANISATION_ID
 from cases.models.submission import Submission, Submission
 from contacts.models import CaseContact, CaseContact, Contact, Contact
 from core.base import BaseModel
 from core.models import SystemParameter
 from core.notifier import notify_contact_email, notify_footer
 from core.tasks import send_mail
-from core.utils import public_login_url, sql_get_list
+from core.utils import public_login_url
 from organisations.constants import (
     AWAITING_ORG_CASE_ROLE,
     NOT_IN_CASE_ORG_CASE_ROLES,
@@ -31,11 +29,11 @@ from organisations.constants import (
     REJECTED_ORG_CASE_ROLE,
 )
 from security.constants import (
-    ROLE_AWAITING_APPROVAL,
-    ROLE_PREPARING,
     SECURITY_GROUP_ORGANISATION_OWNER,
     SECURITY_GROUP_ORGANISATION_USER,
 )
+from organisations.utils import ORGANISATION_MATCH_KEYS
+from security.access import invalidate_case_access
 from security.models import OrganisationCaseRole, OrganisationUser, UserCase, get_security_group
 
 logger = logging.getLogger(__name__)
@@ -61,6 +59,7 @@ class OrganisationManager(models.Manager):
         parent_organisation,
         child_organisation,
         merge_record_object,
+        dry_run=False,
     ):
         """
         Merges the child_organisation into the parent_organisation, deleting the former.
@@ -68,92 +67,23 @@ class OrganisationManager(models.Manager):
         ----------
         parent_organisation : parent organisation that will retain its details (name..etc.)
         child_organisation : organisation to be merged - child organisation that will get swallowed into the parent
+        merge_record_object : merge record holding the caseworkers' chosen case roles
+        dry_run : True to only return the merge plan, without merging
         Returns
         -------
         The parent organisation object containing the records of both organisation_a and organisation_b
+        (or the merge plan if dry_run is True)
         """
-        from invitations.models import Invitation
-
-        with transaction.atomic():
-            # finding the users who are members of the child org, but not of the parent.
-            # we need to add those users to the parent
-            parent_organisation_users = [each.user for each in parent_organisation.users]
-            for org_user in child_organisation.users:
-                if org_user.user not in parent_organisation_users:
-                    org_user.organisation = parent_organisation
-                    org_user.save()
-                else:
-                    # the child org user is already a member of the parent org, delete
-                    org_user.delete()
-
-            # updating the UserCase objects of the child_org
-            UserCase.objects.filter(organisation=child_organisation).update(
-                organisation=parent_organisation
-            )
-
-            # updating the contacts, this will also update the CaseContact object
-            Contact.objects.filter(organisation=child_organisation).update(
-                organisation=parent_organisation
-            )
-
-            # updating all OrganisationCaseRole objects which are unique to the child organisation, and
-            # to cases which the parent_organisation doesn't have a corresponding
-            # OrganisationCaseRole object. If the parent org does have a corresponding OrganisationCaseRole object
-            # then we will rely on the chosen_case_roles dict on the merge_record which should contain
-            # the caseworkers preference, if it is not there for whatever reason, we will default to the
-            # parent's role in the case
-            parent_org_cases = OrganisationCaseRole.objects.filter(
-                organisation=parent_organisation
-            ).values_list("case_id")
-
-            OrganisationCaseRole.objects.filter(organisation=child_organisation).exclude(
-                case_id__in=parent_org_cases
-            ).update(organisation=parent_organisation)
-
-            shared_cases = OrganisationCaseRole.objects.filter(
-                organisation=child_organisation
-            ).filter(case_id__in=parent_org_cases)
-            if shared_cases:
-                for org_case_role in shared_cases:
-                    if (
-                        merge_record_object.chosen_case_roles
-                        and str(org_case_role.case.id) in merge_record_object.chosen_case_roles
-                    ):
-                        # there has been a preference selected for this case, so we will use that
-                        chosen_role_id = merge_record_object.chosen_case_roles[
-                            str(org_case_role.case.id)
-                        ]
-                        chosen_role = OrganisationCaseRole.objects.get(id=chosen_role_id)
-                    else:
-                        chosen_role = OrganisationCaseRole.objects.get(
-                            case=org_case_role.case, organisation=parent_organisation
-                        )
-                        if chosen_role.role.id in [ROLE_AWAITING_APPROVAL, ROLE_PREPARING]:
-                            # the parent org has not yet accepted the role,
-                            # so we will use the child org's role
-                            chosen_role = org_case_role
-
-                    chosen_role.organisation = parent_organisation
-                    chosen_role.save()
-
-                    # now we want to delete the other org case_roles from either
-                    # the parent or org to this case except for the chosen role
-                    OrganisationCaseRole.objects.filter(case=org_case_role.case).filter(
-                        Q(organisation=child_organisation) | Q(organisation=parent_organisation)
-                    ).exclude(id=chosen_role.id).delete()
-
-            # updating the submissions
-            Submission.objects.filter(organisation=child_organisation).update(
-                organisation=parent_organisation
-            )
-
-            # updating the invitations
-            Invitation.objects.filter(organisation=child_organisation).update(
-                organisation=parent_organisation
-            )
-
-            child_organisation.delete()
+        from organisations.merge import OrganisationMerge
 
+        merge = OrganisationMerge(
+            parent_organisation,
+            child_organisation,
+            chosen_case_roles=merge_record_object.chosen_case_roles,
+        )
+        if dry_run:
+            return merge.plan()
+        merge.apply()
         return parent_organisation
 
     @transaction.atomic
@@ -162,11 +92,12 @@ class OrganisationManager(models.Manager):
         Perform a similarity check on organisation names
         """
         limit = float(limit or 0.5)
+        # names are compared through their normalised key, so the join can use its trigram index
         _SQL = f"""
             SELECT set_limit({limit});
-            SELECT similarity(o1.name, o2.name) AS score, o1.name, o2.name
+            SELECT similarity(o1.name_key, o2.name_key) AS score, o1.name, o2.name
             FROM organisations_organisation o1 JOIN organisations_organisation o2
-            ON o1.name != o2.name AND o1.name % o2.name
+            ON o1.name != o2.name AND o1.name_key % o2.name_key
             WHERE o1.duplicate_of_id is null and o2.duplicate_of_id is null;
         """  # noqa
         with connection.cursor() as cursor:
@@ -182,6 +113,7 @@ class OrganisationManager(models.Manager):
         Merge two organisations records into one.
         parameter_map is a map of fields that need to be copied from the merge_with object
         """
+        from cases.models import CaseListing
         from contacts.models import Contact
         from invitations.models import Invitation
 
@@ -201,60 +133,62 @@ class OrganisationManager(models.Manager):
             )
         )
         # transfer usercases after finding clashes
-        sql = f"""select uc2.id from security_usercase uc1 join security_usercase uc2
-            on uc1.organisation_id='{organisation.id}'
-            and uc2.organisation_id = '{merge_with.id}'
-            and uc1.case_id=uc2.case_id and uc1.user_id=uc2.user_id
-            """
-        clash_list = sql_get_list(sql)
+        user_case_clashes = UserCase.objects.filter(
+            organisation=organisation, case=OuterRef("case"), user=OuterRef("user")
+        )
         try:
             results.append(
                 UserCase.objects.filter(organisation=merge_with)
-                .exclude(id__in=clash_list)
+                .exclude(Exists(user_case_clashes))
                 .update(organisation=organisation)
             )
         except Exception as e:
             raise ValueError("Same user has access to same case on behalf of both organisations")
 
         # transfer case_org_contacts after finding clashes
-        sql = f"""select cc2.id from contacts_casecontact cc1 join contacts_casecontact cc2
-            on cc1.organisation_id='{organisation.id}'
-            and cc2.organisation_id = '{merge_with.id}'
-            and cc1.case_id=cc2.case_id and cc1.contact_id=cc2.contact_id
-            """
-        clash_list = sql_get_list(sql)
+        case_contact_clashes = CaseContact.objects.filter(
+            organisation=organisation, case=OuterRef("case"), contact=OuterRef("contact")
+        )
         try:
             results.append(
                 CaseContact.objects.filter(organisation=merge_with)
-                .exclude(id__in=clash_list)
+                .exclude(Exists(case_contact_clashes))
                 .update(organisation=organisation)
             )
         except Exception as e:
             raise ValueError("Same contact is in both organisations")
 
         # Migrate cases (caseroles)
-        clash_cases = {}
-        for org_case in OrganisationCaseRole.objects.filter(organisation=organisation):
-            clash_cases[org_case.case.id] = org_case
-        for org_case in OrganisationCaseRole.objects.filter(organisation=merge_with):
-            clash = clash_cases.get(org_case.case.id)
-            if clash:
-                if org_case.role.key not in NOT_IN_CASE_ORG_CASE_ROLES:
-                    if (
-                        clash.role.key not in NOT_IN_CASE_ORG_CASE_ROLES
-                        and org_case.role.key != clash.role.key
-                    ):
-                        # Argh, both orgs are in the same case with different,
-                        # non awaiting roles - blow up!
-                        raise ValueError(
-                            "Cannot merge as organisations have different roles in a case",
-                            org_case.case.name,
-                        )
-                    # Pick the best possible role for the merged org
-                    clash.role = org_case.role
-                    clash.save()
-                clash_cases[org_case.case.id] = org_case
-                org_case.delete()
+        clash_cases = {
+            org_case.case_id: org_case
+            for org_case in OrganisationCaseRole.objects.filter(
+                organisation=organisation
+            ).select_related("role")
+        }
+        clashing_ids = {}
+        clash_role_updates = defaultdict(list)
+        for org_case in OrganisationCaseRole.objects.filter(
+            organisation=merge_with, case_id__in=clash_cases
+        ).select_related("role", "case"):
+            clash = clash_cases[org_case.case_id]
+            if org_case.role.key not in NOT_IN_CASE_ORG_CASE_ROLES:
+                if (
+                    clash.role.key not in NOT_IN_CASE_ORG_CASE_ROLES
+                    and org_case.role.key != clash.role.key
+                ):
+                    # Argh, both orgs are in the same case with different,
+                    # non awaiting roles - blow up!
+                    raise ValueError(
+                        "Cannot merge as organisations have different roles in a case",
+                        org_case.case.name,
+                    )
+                # Pick the best possible role for the merged org
+                clash_role_updates[org_case.role_id].append(clash.id)
+            clashing_ids[org_case.id] = org_case.case_id
+        for role_id, clash_ids in clash_role_updates.items():
+            OrganisationCaseRole.objects.filter(id__in=clash_ids).update(role_id=role_id)
+        OrganisationCaseRole.objects.filter(id__in=clashing_ids).delete()
+        CaseListing.objects.refresh_on_commit(*clashing_ids.values())
         results.append(
             OrganisationCaseRole.objects.filter(organisation=merge_with).update(
                 organisation=organisation
@@ -266,6 +200,7 @@ class OrganisationManager(models.Manager):
                 organisation=organisation
             )
         )
+        invalidate_case_access()
         updated = False
         for parameter, source in parameter_map.items():
             if source == "p2":
@@ -342,16 +277,19 @@ class OrganisationManager(models.Manager):
             except Organisation.DoesNotExist:
                 pass
         if organisation is None:
-            try:
-                organisations = Organisation.objects.filter(name=name, country=country)
-                # we can only reuse the organisation if the user is previously associated with it
-                for organisation in organisations:
-                    associated = user.is_associated_with(organisation)
-                    if associated:
-                        break
-                else:
-                    raise Organisation.DoesNotExist()
-            except Organisation.DoesNotExist:
+            # we can only reuse the organisation if the user is previously associated with it,
+            # either by membership or representation
+            organisation = (
+                Organisation.objects.filter(name=name, country=country)
+                .filter(
+                    Exists(UserCase.objects.filter(user=user, organisation=OuterRef("pk")))
+                    | Exists(
+                        OrganisationUser.objects.filter(user=user, organisation=OuterRef("pk"))
+                    )
+                )
+                .first()
+            )
+            if organisation is None:
                 organisation = Organisation(
                     created_by=user, user_context=[user], name=name, country=country
                 )
@@ -423,11 +361,30 @@ class Organisation(BaseModel):
     )
     json_data = models.JSONField(null=True, blank=True)
     draft = models.BooleanField(default=False)
+    # Normalised keys used to find potential duplicates, maintained on save
+    # (see organisations.utils.ORGANISATION_MATCH_KEYS)
+    name_key = models.CharField(max_length=500, null=True, blank=True, db_index=True)
+    address_key = models.TextField(null=True, blank=True)
+    duns_key = models.CharField(max_length=30, null=True, blank=True, db_index=True)
+    companies_house_key = models.CharField(max_length=50, null=True, blank=True, db_index=True)
+    vat_key = models.CharField(max_length=30, null=True, blank=True, db_index=True)
+    eori_key = models.CharField(max_length=30, null=True, blank=True, db_index=True)
+    website_key = models.CharField(max_length=100, null=True, blank=True, db_index=True)
 
     objects = OrganisationManager()
 
+    audit_exclude_fields = tuple(ORGANISATION_MATCH_KEYS)
+
     class Meta:
         permissions = (("merge_organisations", "Can merge organisations"),)
+        indexes = [
+            HashIndex(fields=["address_key"], name="organisation_address_key_idx"),
+            GinIndex(
+                fields=["name_key"],
+                name="organisation_name_key_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         if self.trade_association:
@@ -435,6 +392,19 @@ class Organisation(BaseModel):
         else:
             return self.name
 
+    def save(self, *args, **kwargs):
+        self.set_match_keys()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | set(ORGANISATION_MATCH_KEYS)
+        return super().save(*args, **kwargs)
+
+    def set_match_keys(self):
+        """
+        Compute the normalised duplicate matching keys from the current field values.
+        """
+        for key_field, (field, normalise) in ORGANISATION_MATCH_KEYS.items():
+            setattr(self, key_field, normalise(getattr(self, field)))
+
     @transaction.atomic
     def _potential_duplicate_orgs(self, fresh=False) -> "OrganisationMergeRecord":
         """
@@ -442,51 +412,6 @@ class Organisation(BaseModel):
         the given organisation.
         """
 
-        # first we check which organisations contain our lookup values
-        # A fuzzy search, because we can't do much manipulation of the db field values
-        # until it gets to be a python object after the db query
-
-        special_characters = (
-            "!",
-            "%",
-            "-",
-            "_",
-            "*",
-            "?",
-            ":",
-            ";",
-            ",",
-            ".",
-            "/",
-            "|",
-            " ",
-        )
-
-        def annotate_without_special_chars(
-            queryset: django.db.models.QuerySet, field: str
-        ) -> (str, django.db.models.QuerySet):
-            """
-            Annotate a queryset with a field that has all special characters removed
-            Parameters
-            ----------
-            queryset : the queryset to operate on
-            field : the name of the field to annotate
-
-            Returns
-            -------
-            tuple:
-                0 - the name of the annotated column with all special characters removed
-                1 - the queryset with the annotated columns
-            """
-            annotation_kwargs = {
-                f"{field}_sf{index}": Replace(
-                    field if index == 0 else f"{field}_sf{index - 1}", Value(each), Value("")
-                )
-                for index, each in enumerate(special_characters)
-            }
-            last_annotation = f"{field}_sf{len(special_characters) - 1}"
-            return last_annotation, queryset.annotate(**annotation_kwargs)
-
         potential_duplicates = Organisation.objects.exclude(id=self.id).exclude(
             deleted_at__isnull=False
         )
@@ -521,66 +446,17 @@ class Organisation(BaseModel):
         else:
             OrganisationMergeRecord.objects.create(parent_organisation=self)
 
-        if potential_duplicates:
-            q_objects = models.Q()
-
-            # filter fields that require an exact (case-insensitive) match
-            exact_match_fields = (
-                "name",
-                "address",
-                "duns_number",
-            )
-            for field in exact_match_fields:
-                value = getattr(self, field)
-                if value:
-                    query = {f"{field}__iexact": value}
-                    q_objects |= models.Q(**query)
-
-            # filter by reg_number and post_code, removing special characters
-            ignore_special_character_fields = ("companies_house_id",)
-
-            for field in ignore_special_character_fields:
-                value = getattr(self, field)
-                if value:
-                    value = "".join(c for c in value if c not in special_characters)
-                    if value:
-                        # making sure that the value is not empty after removing all special characters
-                        removed_special_chars = annotate_without_special_chars(
-                            potential_duplicates,
-                            field,
-                        )
-                        potential_duplicates = removed_special_chars[1]
-                        query = {f"{removed_special_chars[0]}__iexact": value}
-                        q_objects |= models.Q(**query)
-
-            # now we filter by the VAT number and EORI number
-            ignore_alpha_character_fields = (
-                "vat_number",
-                "eori_number",
-            )
-            for field in ignore_alpha_character_fields:
-                value = getattr(self, field)
-                if value:
-                    value = "".join(c for c in value if c.isdigit())
-                    if value:
-                        # making sure that the value is not empty after removing all non-digit characters
-                        removed_special_chars = annotate_without_special_chars(
-                            potential_duplicates,
-                            field,
-                        )
-                        potential_duplicates = removed_special_chars[1]
-                        query = {f"{removed_special_chars[0]}__icontains": value}
-                        q_objects |= models.Q(**query)
-
-            # now we filter by the URL, we only care about the domain name
-            # e.g. https://www.example.com.uk/ -> example
-            # e.g. https://www.hello.english.example.gov.uk/ -> example
-            if url := self.organisation_website:
-                domain = tldextract.extract(url).domain
-                q_objects |= models.Q(organisation_website__icontains=domain)
-
-            # applying the filter to the queryset
-            potential_duplicates = potential_duplicates.filter(q_objects)
+        # potential duplicates share at least one of the normalised matching keys,
+        # each lookup being a probe of the key's index
+        self.set_match_keys()
+        q_objects = models.Q()
+        for key_field in ORGANISATION_MATCH_KEYS:
+            value = getattr(self, key_field)
+            if value:
+                q_objects |= models.Q(**{key_field: value})
+        potential_duplicates = (
+            potential_duplicates.filter(q_objects) if q_objects else potential_duplicates.none()
+        )
 
         # Why did the cow cross the road? To get to the udder side.
         # lol.
@@ -588,10 +464,20 @@ class Organisation(BaseModel):
             # there are new potential duplicates
             # now we update the merge record and create DuplicateOrganisationMerge records for each
             # of the confirmed duplicates (if they don't already exist)
-            for potential_dup_org in potential_duplicates:
-                DuplicateOrganisationMerge.objects.get_or_create(
-                    merge_record=self.merge_record, child_organisation=potential_dup_org
+            existing_child_ids = set(
+                self.merge_record.duplicate_organisations.values_list(
+                    "child_organisation_id", flat=True
                 )
+            )
+            DuplicateOrganisationMerge.objects.bulk_create(
+                [
+                    DuplicateOrganisationMerge(
+                        merge_record=self.merge_record, child_organisation=potential_dup_org
+                    )
+                    for potential_dup_org in potential_duplicates
+                    if potential_dup_org.id not in existing_child_ids
+                ]
+            )
             self.merge_record.status = "duplicates_found"
 
             # change any existing complete merge records to not started
@@ -695,21 +581,30 @@ class Organisation(BaseModel):
             cases = cases.filter(user=requested_by)
         if initiated_only:
             cases = cases.filter(case__initiated_at__isnull=False)
-        cases = cases.values("organisation_id", "case_id").distinct()
-        _cache = {}
+        cases = list(
+            cases.values("organisation_id", "case_id")
+            .distinct()
+            .annotate(
+                has_non_draft_subs=Exists(
+                    Submission.objects.filter(
+                        organisation=OuterRef("organisation_id"),
+                        case=OuterRef("case_id"),
+                        status__default=False,
+                    )
+                )
+            )
+        )
+        organisations = Organisation.objects.in_bulk({uc["organisation_id"] for uc in cases})
+        related_case_objects = Case.objects.select_related("type", "stage").in_bulk(
+            {uc["case_id"] for uc in cases}
+        )
         related_cases = []
         for uc in cases:
-            if uc["organisation_id"] not in _cache:
-                _cache[uc["organisation_id"]] = Organisation.objects.get(id=uc["organisation_id"])
-            if uc["case_id"] not in _cache:
-                _cache[uc["case_id"]] = Case.objects.get(id=uc["case_id"])
             related_cases.append(
                 {
-                    "case": _cache[uc["case_id"]].to_embedded_dict(),
-                    "organisation": _cache[uc["organisation_id"]].to_embedded_dict(),
-                    "has_non_draft_subs": _cache[uc["organisation_id"]].has_non_draft_subs(
-                        _cache[uc["case_id"]]
-                    ),
+                    "case": related_case_objects[uc["case_id"]].to_embedded_dict(),
+                    "organisation": organisations[uc["organisation_id"]].to_embedded_dict(),
+                    "has_non_draft_subs": uc["has_non_draft_subs"],
                 }
             )
         return related_cases
@@ -964,71 +859,65 @@ class Organisation(BaseModel):
             ...
         ]
         """
+        from cases.models import Case
         from cases.services.v2.serializers import CaseSerializer
         from invitations.models import Invitation
 
         representations = []
 
+        corresponding_org_case_roles = OrganisationCaseRole.objects.filter(
+            organisation=OuterRef("organisation"), case=OuterRef("case")
+        )
         representative_case_contacts = (
             CaseContact.objects.filter(
                 contact__organisation=self,
             )
             .exclude(contact__organisation=F("organisation"))
             .distinct("case")
+            .select_related("organisation")
+            .prefetch_related(
+                Prefetch("case", queryset=CaseSerializer.eager_load_queryset(Case.objects.all()))
+            )
+            .annotate(
+                role_name=Subquery(corresponding_org_case_roles.values("role__name")[:1]),
+                role_validated_at=Subquery(corresponding_org_case_roles.values("validated_at")[:1]),
+                # has this case_contact been created as part of an invitation
+                invitation_approved_at=Subquery(
+                    Invitation.objects.filter(
+                        contact__organisation=self,
+                        case=OuterRef("case"),
+                        organisation=OuterRef("organisation"),
+                        invitation_type=2,
+                        approved_at__isnull=False,
+                    )
+                    .order_by("-last_modified")
+                    .values("approved_at")[:1]
+                ),
+            )
         )
         for case_contact in representative_case_contacts:
-            try:
-                corresponding_org_case_role = OrganisationCaseRole.objects.get(
-                    organisation=case_contact.organisation, case=case_contact.case
-                )
-            except OrganisationCaseRole.DoesNotExist:
+            if case_contact.role_name is None:
+                # there is no corresponding OrganisationCaseRole
                 continue
             representation = {
                 "on_behalf_of": case_contact.organisation.name,
                 "on_behalf_of_id": case_contact.organisation.id,
                 "case": CaseSerializer(case_contact.case).data,
-                "role": corresponding_org_case_role.role.name,
+                "role": case_contact.role_name,
             }
-            # now we need to find if this case_contact has been created as part of an ROI or an invitation
-            invitation = (
-                Invitation.objects.filter(
-                    contact__organisation=self,
-                    case=case_contact.case,
-                    organisation=case_contact.organisation,
-                    invitation_type=2,
-                    approved_at__isnull=False,
-                )
-                .order_by("-last_modified")
-                .first()
-            )
-            if invitation:
+            if invitation_approved_at := case_contact.invitation_approved_at:
                 representation.update(
-                    {"validated": invitation.approved_at, "validated_at": invitation.approved_at}
+                    {"validated": invitation_approved_at, "validated_at": invitation_approved_at}
                 )
-                representations.append(representation)
             else:
                 # maybe it's an ROI that got them here
-                try:
-                    (
-                        Submission.objects.filter(
-                            type_id=SUBMISSION_TYPE_REGISTER_INTEREST,
-                            contact__organisation=self,
-                            case=case_contact.case,
-                            organisation=case_contact.organisation,
-                        )
-                        .order_by("-last_modified")
-                        .first()
-                    )
-                    representation.update(
-                        {
-                            "validated": bool(corresponding_org_case_role.validated_at),
-                            "validated_at": corresponding_org_case_role.validated_at,
-                        }
-                    )
-                    representations.append(representation)
-                except Submission.DoesNotExist:
-                    ...
-                    # todo - log error here, how do they have access to this case
+                representation.update(
+                    {
+                        "validated": bool(case_contact.role_validated_at),
+                        "validated_at": case_contact.role_validated_at,
+                    }
+                )
+            representations.append(representation)
 
         return representations
 
@@ -1062,7 +951,7 @@ class Organisation(BaseModel):
             rejected_by__isnull=False,
             rejected_at__isnull=False,
             invitation_type=2,  # only rep invites
-        )
+        ).select_related("submission__case__type", "rejected_by")
         for invitation in rejected_invitations:
             rejections.append(
                 {
@@ -1083,7 +972,7 @@ class Organisation(BaseModel):
         # finding the interested party cases for this org which have been rejected
         rejected_org_case_roles = OrganisationCaseRole.objects.filter(
             organisation=self, role__key="rejected"
-        )
+        ).select_related("case__type", "validated_by")
         for rejected_org_case_role in rejected_org_case_roles:
             rejections.append(
                 {
@@ -1105,23 +994,13 @@ class Organisation(BaseModel):
         """
         Returns True if the organisation name matches the name on Companies House, False otherwise.
         """
-        from core.services.ch_proxy import COMPANIES_HOUSE_BASE_DOMAIN, COMPANIES_HOUSE_BASIC_AUTH
+        from core.companies_house import get_companies_house_client
 
         if registration_number := self.companies_house_id:
             if organisation_name := self.name:
-                headers = {"Authorization": f"Basic {COMPANIES_HOUSE_BASIC_AUTH}"}
-                response = requests.get(
-                    f"{COMPANIES_HOUSE_BASE_DOMAIN}/company/{registration_number}",
-                    headers=headers,
-                )
-                if response.status_code == 200:
-                    if (
-                        response.json().get(
-                            "company_name",
-                        )
-                        == organisation_name
-                    ):
-                        return True
+                company = get_companies_house_client().get_company(registration_number)
+                if company and company.get("company_name") == organisation_name:
+                    return True
         return False
 
     def organisation_card_data(self) -> dict:
@@ -1129,6 +1008,8 @@ class Organisation(BaseModel):
         Returns a dictionary containing the data required to render the organisation card on the
         front-end.
         """
+        from cases.models import Case
+        from cases.services.v2.serializers import CaseSerializer
         from organisations.services.v2.serializers import (
             OrganisationSerializer,
             OrganisationCaseRoleSerializer,
@@ -1174,18 +1055,38 @@ class Organisation(BaseModel):
             each for each in rejected_cases if each["type"] == "interested_party"
         ]
 
+        approved_organisation_case_roles = (
+            self.organisationcaserole_set.exclude(
+                role__key__in=[
+                    AWAITING_ORG_CASE_ROLE,
+                    REJECTED_ORG_CASE_ROLE,
+                    PREPARING_ORG_CASE_ROLE,
+                ]
+            )
+            .select_related(
+                "organisation",
+                "role",
+                "validated_by",
+                "auth_contact__organisation",
+                "auth_contact__userprofile__user",
+            )
+            .prefetch_related(
+                Prefetch("case", queryset=CaseSerializer.eager_load_queryset(Case.objects.all()))
+            )
+        )
         return_dict["approved_organisation_case_roles"] = [
             OrganisationCaseRoleSerializer(each, exclude=["organisation"]).data
-            for each in self.organisationcaserole_set.all()
-            if each.role.key
-            not in [AWAITING_ORG_CASE_ROLE, REJECTED_ORG_CASE_ROLE, PREPARING_ORG_CASE_ROLE]
+            for each in approved_organisation_case_roles
         ]
 
         return_dict["does_name_match_companies_house"] = self.does_name_match_companies_house()
 
+        organisation_users = self.organisationuser_set.select_related(
+            "user__twofactorauth"
+        ).prefetch_related("user__groups", "user__user_permissions")
         return_dict["users"] = [
             UserSerializer(each.user, exclude=["contact", "organisation"]).data
-            for each in self.organisationuser_set.all()
+            for each in organisation_users
         ]
 
         return return_dict
@@ -1225,15 +1126,7 @@ class Organisation(BaseModel):
         )
 
         if exclude_rejected:
-            exclude_ids = []
-            for user_case in user_cases:
-                if OrganisationCaseRole.objects.filter(
-                    case=user_case.case,
-                    organisation__organisationuser__user=user_case.user,
-                    role__key=REJECTED_ORG_CASE_ROLE,
-                ).exists():
-                    exclude_ids.append(user_case.id)
-            user_cases = user_cases.exclude(id__in=exclude_ids)
+            user_cases = user_cases.exclude_rejected()
 
         return user_cases
 
@@ -1303,7 +1196,8 @@ class OrganisationMergeRecord(BaseModel):
         organisation=None,
         notify_users=False,
         create_audit_log=False,
-    ) -> "Organisation":
+        dry_run=False,
+    ):
         """
         Merges the duplicate organisations into the parent organisation.
         Parameters
@@ -1311,29 +1205,60 @@ class OrganisationMergeRecord(BaseModel):
         organisation : the parent organisation to merge the duplicates into
         notify_users : True if you want the users to be notified of the merge
         create_audit_log : True if you want to create an audit log of the merge
+        dry_run : True to only return the merge plans, without merging
 
         Returns
         -------
-        Organisation
+        Organisation, or the list of merge plans (one per duplicate organisation, in the order
+        they are merged, each planned against the result of the previous merges) if dry_run
+        is True
         """
+        from organisations.merge import OrganisationMerge
+
         if not organisation:
             organisation = self.parent_organisation
 
+        potential_duplicates = (
+            self.potential_duplicates()
+            .filter(status="attributes_selected")
+            .select_related("child_organisation", "merge_record__parent_organisation")
+        )
+        if dry_run:
+            from organisations.decorators import no_commit_transaction
+
+            @no_commit_transaction
+            def plan_merges():
+                # the merges are applied in a transaction which is not committed, so each plan
+                # accounts for the duplicates merged into the parent before it
+                return [
+                    OrganisationMerge(
+                        organisation,
+                        potential_duplicate_organisation.child_organisation,
+                        chosen_case_roles=self.chosen_case_roles,
+                    ).apply()
+                    for potential_duplicate_organisation in potential_duplicates
+                ]
+
+            return plan_merges()
+
         ids_merged = []
-        for potential_duplicate_organisation in self.potential_duplicates().filter(
-            status="attributes_selected"
-        ):
+        merge_plans = []
+        for potential_duplicate_organisation in potential_duplicates:
             # going through the potential duplicates and applying the attributes from each
             # duplicate selected by the caseworkers to the draft organisation
             potential_duplicate_organisation._apply_selections(
                 organisation=organisation,
             )
 
-            # now we finally run the merge_organisations method to re-associate the child
-            # objects (UserCase, OrganisationUser, OrganisationCaseRole...etc.) with the
+            # now we finally merge the organisations to re-associate the child objects
+            # (UserCase, OrganisationUser, OrganisationCaseRole...etc.) with the
             # draft organisation
-            Organisation.objects.merge_organisations(
-                organisation, potential_duplicate_organisation.child_organisation, self
+            merge_plans.append(
+                OrganisationMerge(
+                    organisation,
+                    potential_duplicate_organisation.child_organisation,
+                    chosen_case_roles=self.chosen_case_roles,
+                ).apply()
             )
             ids_merged.append(potential_duplicate_organisation.child_organisation.id)
 
@@ -1363,7 +1288,7 @@ class OrganisationMergeRecord(BaseModel):
             audit_log(
                 audit_type=AUDIT_TYPE_ORGANISATION_MERGED,
                 model=self,
-                data={"organisations_merged_with": ids_merged},
+                data={"organisations_merged_with": ids_merged, "merge_plans": merge_plans},
             )
 
         # finally, we check if the OrganisationMergeRecord was 'locked', meaning that it was the
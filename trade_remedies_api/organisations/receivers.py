@@ -0,0 +1,83 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from contacts.models import CaseContact
+from core.models import User
+from invitations.models import Invitation
+from organisations.autocomplete import invalidate_organisation_autocomplete
+from organisations.cards import invalidate_organisation_cards
+from organisations.models import Organisation
+from security.models import OrganisationCaseRole, OrganisationUser, UserCase
+
+# Changes to organisations, or to the cases they are in, invalidate the cached autocomplete
+# results
+for autocomplete_model in (Organisation, OrganisationCaseRole):
+    post_save.connect(invalidate_organisation_autocomplete, sender=autocomplete_model)
+    post_delete.connect(invalidate_organisation_autocomplete, sender=autocomplete_model)
+
+
+@receiver(post_save, sender=Organisation)
+@receiver(post_delete, sender=Organisation)
+def invalidate_organisation_card(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    invalidate_organisation_cards(instance.id)
+
+
+@receiver(post_save, sender=OrganisationUser)
+@receiver(post_delete, sender=OrganisationUser)
+def invalidate_organisation_user_card(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    invalidate_organisation_cards(instance.organisation_id)
+
+
+@receiver(post_save, sender=OrganisationCaseRole)
+@receiver(post_delete, sender=OrganisationCaseRole)
+def invalidate_case_role_organisation_cards(sender, instance, **kwargs):
+    """
+    Invalidate the card of the organisation, and of the organisations representing it in the case.
+    """
+    if kwargs.get("raw"):
+        return
+    invalidate_organisation_cards(
+        instance.organisation_id,
+        *CaseContact.objects.filter(
+            case_id=instance.case_id, organisation_id=instance.organisation_id
+        ).values_list("contact__organisation_id", flat=True),
+    )
+
+
+@receiver(post_save, sender=CaseContact)
+@receiver(post_delete, sender=CaseContact)
+@receiver(post_save, sender=Invitation)
+@receiver(post_delete, sender=Invitation)
+def invalidate_contact_organisation_card(sender, instance, **kwargs):
+    """
+    Invalidate the card of the organisation of the contact representing (or invited to represent)
+    an organisation.
+    """
+    if kwargs.get("raw") or not instance.contact_id:
+        return
+    invalidate_organisation_cards(instance.contact.organisation_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_organisation_cards(sender, instance, update_fields=None, **kwargs):
+    if kwargs.get("raw") or update_fields == frozenset(["last_login"]):
+        return
+    invalidate_organisation_cards(
+        *OrganisationUser.objects.filter(user=instance).values_list("organisation_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=UserCase)
+@receiver(post_delete, sender=UserCase)
+def invalidate_user_case_organisation_cards(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    invalidate_organisation_cards(
+        *OrganisationUser.objects.filter(user_id=instance.user_id).values_list(
+            "organisation_id", flat=True
+        )
+    )
@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from cases.models import Submission
 from config.viewsets import BaseModelViewSet
 from core.models import User
+from organisations.autocomplete import autocomplete
+from organisations.cards import get_organisation_card_data
 from organisations.decorators import no_commit_transaction
 from organisations.models import (
     DuplicateOrganisationMerge,
@@ -64,35 +66,19 @@ class OrganisationViewSet(BaseModelViewSet):
         url_name="search_by_company_name",
     )
     def search_by_company_name(self, request, *args, **kwargs):
-        search_string = request.GET["company_name"]
-        case_id = request.GET.get("case_id")
-        exclude_id = request.GET.get("exclude_id")
-
-        queryset = self.get_queryset()
-
-        # get organisations by name
-        matching_organisations = queryset.filter(
-            Q(name__icontains=search_string) | Q(companies_house_id__icontains=search_string)
-        )
-
-        # if we recieve a case_id, then exclude if organisation is already associated with the case
-        if case_id:
-            matching_organisations = matching_organisations.exclude(
-                organisation__organisationcaserole__case=case_id,
-            )
-
-        if exclude_id:
-            # if we are passed an exclude_id in the request.GET,
-            # then exclude the organisation with that ID from the results.
-            # used in cases where there are 2 autocompletes on one page
-            matching_organisations = matching_organisations.exclude(id=exclude_id)
+        """Autocomplete organisations by name or Companies House number.
 
+        If we receive a case_id, organisations already associated with the case are excluded.
+        If we receive an exclude_id, the organisation with that ID is excluded from the results,
+        used in cases where there are 2 autocompletes on one page.
+        """
         return Response(
-            OrganisationSerializer(
-                instance=matching_organisations,
-                many=True,
-                fields=["name", "address", "post_code", "companies_house_id", "id", "case_count"],
-            ).data
+            autocomplete(
+                request.GET["company_name"],
+                case_id=request.GET.get("case_id"),
+                exclude_id=request.GET.get("exclude_id"),
+                queryset=self.get_queryset(),
+            )
         )
 
     @action(
@@ -123,9 +109,11 @@ class OrganisationViewSet(BaseModelViewSet):
         1. The normal OrganisationSerializer isn't slowed down by this expensive operation
         2. The address card can be rendered on the fly without having to make a separate request
         3. Changes to what is displayed in the organisation card can just be done in one place
+
+        The card data is cached per organisation, see organisations.cards.
         """
         organisation_object = self.get_object()
-        return Response(organisation_object.organisation_card_data())
+        return Response(get_organisation_card_data(organisation_object))
 
 
 class OrganisationCaseRoleViewSet(BaseModelViewSet):
@@ -187,6 +175,19 @@ class OrganisationMergeRecordViewSet(BaseModelViewSet):
         )
         return Response(OrganisationSerializer(merged_organisation, fields=["id"]).data)
 
+    @action(
+        detail=True,
+        methods=["get"],
+        url_name="get_merge_plan",
+    )
+    def get_merge_plan(self, request, *args, **kwargs):
+        """
+        Returns the plans of merging each duplicate organisation with selected attributes into the
+        parent organisation (the records that will be moved or deleted), without merging them.
+        """
+        merge_record = self.get_object()
+        return Response(merge_record.merge_organisations(dry_run=True))
+
     @action(
         detail=True,
         methods=["get"],
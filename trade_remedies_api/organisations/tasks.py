@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from organisations.duplicates import DuplicateOrganisationScanner
+
+
+@shared_task
+def scan_duplicate_organisations(batch_size=500):
+    """
+    Task to find potential duplicates of all organisations changed since their last search.
+    """
+    return DuplicateOrganisationScanner(batch_size=batch_size).scan()
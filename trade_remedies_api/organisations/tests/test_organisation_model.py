@@ -1,12 +1,15 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from cases.constants import SUBMISSION_TYPE_REGISTER_INTEREST
-from cases.models import Submission
+from cases.models import Case, Product, Submission
 from config.test_bases import CaseSetupTestMixin
 from contacts.models import CaseContact, Contact
 from invitations.models import Invitation
+from organisations.cards import get_organisation_card_data
 from organisations.models import Organisation
-from security.models import OrganisationCaseRole
+from security.models import OrganisationCaseRole, OrganisationUser, UserCase
 
 
 class TestOrganisationRepresentativeCases(CaseSetupTestMixin):
@@ -77,3 +80,84 @@ class TestOrganisationRepresentativeCases(CaseSetupTestMixin):
         assert representative_cases[0]["role"] == self.applicant_case_role.name
         assert representative_cases[0]["validated"]
         assert representative_cases[0]["validated_at"] == self.now
+
+
+class TestOrganisationCardData(CaseSetupTestMixin):
+    """Tests the organisation_card_data() method on the Organisation model."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.contact_object.organisation = self.organisation
+        self.contact_object.save()
+
+    def add_representation(self, name):
+        """self.organisation represents a new organisation on a new case"""
+        case = Case.objects.create(name=name, type=self.case_type_object)
+        Product.objects.create(sector=self.sector_object, name="product", case=case)
+        represented_organisation = Organisation.objects.create(name=name)
+        OrganisationCaseRole.objects.create(
+            case=case,
+            organisation=represented_organisation,
+            role=self.applicant_case_role,
+            validated_at=timezone.now(),
+        )
+        OrganisationCaseRole.objects.create(
+            case=case, organisation=self.organisation, role=self.contributor_case_role
+        )
+        CaseContact.objects.create(
+            contact=self.contact_object, case=case, organisation=represented_organisation
+        )
+
+    def test_organisation_card_data_queries_bounded(self):
+        self.add_representation("Org A")
+        with CaptureQueriesContext(connection) as baseline:
+            card_data = self.organisation.organisation_card_data()
+        assert len(card_data["representative_cases"]) == 1
+        assert len(card_data["approved_organisation_case_roles"]) == 1
+
+        self.add_representation("Org B")
+        self.add_representation("Org C")
+        with CaptureQueriesContext(connection) as queries:
+            card_data = self.organisation.organisation_card_data()
+        assert len(card_data["representative_cases"]) == 3
+        assert len(card_data["approved_organisation_case_roles"]) == 3
+        assert len(queries) == len(baseline)
+
+    def test_organisation_card_data_cached(self):
+        card_data = get_organisation_card_data(self.organisation)
+        assert card_data["representative_cases"] == []
+        with self.assertNumQueries(0):
+            assert get_organisation_card_data(self.organisation) == card_data
+
+        # related writes invalidate the cached card
+        self.add_representation("Org A")
+        card_data = get_organisation_card_data(self.organisation)
+        assert len(card_data["representative_cases"]) == 1
+
+
+class TestOrganisationGetUserCases(CaseSetupTestMixin):
+    """Tests the get_user_cases() method on the Organisation model."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        OrganisationUser.objects.create(
+            organisation=self.organisation, user=self.user, security_group=self.owner_group
+        )
+        self.rejected_case = Case.objects.create(name="rejected case", type=self.case_type_object)
+        OrganisationCaseRole.objects.create(
+            organisation=self.organisation,
+            case=self.rejected_case,
+            role=self.rejected_case_role,
+        )
+        UserCase.objects.create(
+            user=self.user, case=self.case_object, organisation=self.organisation
+        )
+        UserCase.objects.create(
+            user=self.user, case=self.rejected_case, organisation=self.organisation
+        )
+
+    def test_get_user_cases_excludes_rejected(self):
+        assert self.organisation.get_user_cases(exclude_rejected=False).count() == 2
+        with self.assertNumQueries(1):
+            user_cases = list(self.organisation.get_user_cases())
+        assert [user_case.case_id for user_case in user_cases] == [self.case_object.id]
@@ -0,0 +1,52 @@
+from django.test import TestCase
+
+from organisations.duplicates import DuplicateOrganisationScanner
+from organisations.models import DuplicateOrganisationMerge, Organisation, OrganisationMergeRecord
+
+
+class TestDuplicateOrganisationScanner(TestCase):
+    def setUp(self) -> None:
+        self.organisation_1 = Organisation.objects.create(
+            name="Fake Company LTD", vat_number="GB12 34 56 78"
+        )
+        self.organisation_2 = Organisation.objects.create(name="Other", vat_number="12345678")
+        self.organisation_3 = Organisation.objects.create(name="Unrelated")
+
+    def duplicate_pairs(self):
+        return set(
+            DuplicateOrganisationMerge.objects.values_list(
+                "merge_record_id", "child_organisation_id"
+            )
+        )
+
+    def test_scan_finds_duplicates_both_ways(self):
+        result = DuplicateOrganisationScanner(batch_size=2).scan()
+
+        assert result == {"scanned": 3, "found": 2}
+        assert self.duplicate_pairs() == {
+            (self.organisation_1.id, self.organisation_2.id),
+            (self.organisation_2.id, self.organisation_1.id),
+        }
+        statuses = dict(
+            OrganisationMergeRecord.objects.values_list("parent_organisation_id", "status")
+        )
+        assert statuses[self.organisation_1.id] == "duplicates_found"
+        assert statuses[self.organisation_3.id] == "no_duplicates_found"
+        assert not OrganisationMergeRecord.objects.filter(last_searched__isnull=True).exists()
+
+    def test_scan_is_incremental(self):
+        scanner = DuplicateOrganisationScanner()
+        scanner.scan()
+        assert scanner.scan() == {"scanned": 0, "found": 0}
+
+        # a change makes the organisation due again, and removes the stale duplicates
+        self.organisation_2.vat_number = "999"
+        self.organisation_2.save()
+        assert scanner.scan() == {"scanned": 1, "found": 0}
+        assert self.duplicate_pairs() == set()
+
+    def test_similar_names(self):
+        Organisation.objects.create(name="Fake Company Ltd.")
+        DuplicateOrganisationScanner(similarity_threshold=0.6).scan()
+        duplicates = DuplicateOrganisationMerge.objects.filter(merge_record=self.organisation_1.id)
+        assert duplicates.count() == 2
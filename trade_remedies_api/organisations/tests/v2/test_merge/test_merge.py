@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group
+
+from audit import AUDIT_TYPE_ORGANISATION_MERGED
+from audit.models import Audit
+from cases.models import Case
+from config.test_bases import password
+from core.models import User
+from organisations.merge import OrganisationMerge
+from organisations.models import Organisation
+from organisations.tests.v2.test_merge import MergeTestBase
+from security.constants import SECURITY_GROUP_ORGANISATION_USER
+from security.models import OrganisationCaseRole, OrganisationUser, UserCase
+
+
+class TestOrganisationMerge(MergeTestBase):
+    def setUp(self):
+        super().setUp()
+        self.parent = self.organisation_1
+        self.child = self.organisation_2
+        group = Group.objects.get(name=SECURITY_GROUP_ORGANISATION_USER)
+
+        # a user of both organisations, and a user of the child only
+        self.shared_user = OrganisationUser.objects.create(
+            organisation=self.child, user=self.user, security_group=group
+        )
+        OrganisationUser.objects.create(
+            organisation=self.parent, user=self.user, security_group=group
+        )
+        child_user = User.objects.create_user(
+            email="child@example.com", password=password  # /PS-IGNORE
+        )
+        self.child_user = OrganisationUser.objects.create(
+            organisation=self.child, user=child_user, security_group=group
+        )
+        UserCase.objects.create(user=child_user, case=self.case_object, organisation=self.child)
+
+        # both organisations are in the case, the child only in another case
+        self.parent_role = OrganisationCaseRole.objects.create(
+            organisation=self.parent, case=self.case_object, role=self.contributor_case_role
+        )
+        self.child_role = OrganisationCaseRole.objects.create(
+            organisation=self.child, case=self.case_object, role=self.applicant_case_role
+        )
+        self.other_case = Case.objects.create(name="other case", type=self.case_type_object)
+        self.child_only_role = OrganisationCaseRole.objects.create(
+            organisation=self.child, case=self.other_case, role=self.applicant_case_role
+        )
+        self.chosen_case_roles = {str(self.case_object.id): str(self.child_role.id)}
+
+    def test_plan(self):
+        plan = OrganisationMerge(
+            self.parent, self.child, chosen_case_roles=self.chosen_case_roles
+        ).plan()
+
+        assert plan["organisation_users"] == {
+            "move": [str(self.child_user.id)],
+            "delete": [str(self.shared_user.id)],
+        }
+        assert plan["case_roles"] == {
+            "move": [str(self.child_only_role.id)],
+            "keep": {str(self.case_object.id): str(self.child_role.id)},
+            "delete": [str(self.parent_role.id)],
+        }
+        assert plan["user_cases"] == 1
+        # a dry run does not change anything
+        assert OrganisationUser.objects.filter(organisation=self.child).count() == 2
+        assert not Organisation.objects.get(id=self.child.id).deleted_at
+
+    def test_chosen_case_role_must_be_in_the_case(self):
+        chosen_case_roles = {str(self.case_object.id): str(self.child_only_role.id)}
+        with self.assertRaises(ValueError):
+            OrganisationMerge(self.parent, self.child, chosen_case_roles=chosen_case_roles).apply()
+        assert OrganisationCaseRole.objects.filter(
+            id__in=[self.parent_role.id, self.child_role.id]
+        ).count() == 2
+
+    def test_apply(self):
+        OrganisationMerge(self.parent, self.child, chosen_case_roles=self.chosen_case_roles).apply()
+
+        assert not OrganisationUser.objects.filter(organisation=self.child).exists()
+        assert OrganisationUser.objects.filter(organisation=self.parent).count() == 2
+        assert set(
+            OrganisationCaseRole.objects.filter(organisation=self.parent).values_list(
+                "id", flat=True
+            )
+        ) == {self.child_role.id, self.child_only_role.id}
+        assert not OrganisationCaseRole.objects.filter(id=self.parent_role.id).exists()
+        assert UserCase.objects.filter(organisation=self.parent).count() == 1
+        assert Organisation.objects.get(id=self.child.id).deleted_at
+
+    def test_merge_record_dry_run(self):
+        self.merge_record.chosen_case_roles = self.chosen_case_roles
+        self.merge_record.save()
+        self.merge_record.duplicate_organisations.filter(child_organisation=self.child).update(
+            status="attributes_selected"
+        )
+
+        with patch("organisations.autocomplete.invalidate_organisation_autocomplete") as invalidate:
+            plans = self.merge_record.merge_organisations(dry_run=True)
+        # the dry run is rolled back, so the caches are not invalidated
+        invalidate.assert_not_called()
+        assert len(plans) == 1
+        assert plans[0]["child_organisation"] == str(self.child.id)
+        assert not Organisation.objects.get(id=self.child.id).deleted_at
+
+        self.merge_record.merge_organisations(create_audit_log=True)
+        assert Organisation.objects.get(id=self.child.id).deleted_at
+        audit = Audit.objects.get(type=AUDIT_TYPE_ORGANISATION_MERGED)
+        assert audit.data["merge_plans"] == plans
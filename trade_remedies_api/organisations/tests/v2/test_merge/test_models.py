@@ -1,3 +1,5 @@
+from django.core.management import call_command
+
 from config.test_bases import CaseSetupTestMixin
 from organisations.models import Organisation
 from organisations.tests.v2.test_merge import MergeTestBase
@@ -86,6 +88,25 @@ class TestOrganisationFindPotentialDuplicates(CaseSetupTestMixin):
         assert merge_record.potential_duplicates()
         assert len(merge_record.potential_duplicates()) == 1
 
+    def test_match_keys(self):
+        assert self.organisation_object.name_key == "fake company ltd"
+        assert self.organisation_object.companies_house_key == "REPREG12345"
+        assert self.organisation_object.vat_key == "12345678"
+        assert self.organisation_object.eori_key == "123456789012"
+        assert self.organisation_object.website_key == "example"
+
+    def test_match_keys_updated_on_save(self):
+        self.organisation_object.vat_number = "GB 99-88"
+        self.organisation_object.save(update_fields=["vat_number"])
+        self.organisation_object.refresh_from_db()
+        assert self.organisation_object.vat_key == "9988"
+
+    def test_refresh_match_keys_command(self):
+        Organisation.objects.filter(id=self.organisation_object.id).update(name_key=None)
+        call_command("refresh_organisation_match_keys")
+        self.organisation_object.refresh_from_db()
+        assert self.organisation_object.name_key == "fake company ltd"
+
 
 class TestOrganisationMergeRecordModel(MergeTestBase):
     def test_potential_duplicates_order(self):
@@ -1,3 +1,5 @@
+import base64
+import json
 from unittest.mock import patch
 
 from django.contrib.auth.models import Group
@@ -10,7 +12,7 @@ from core.models import User
 from invitations.models import Invitation
 from organisations.models import Organisation
 from security.constants import SECURITY_GROUP_ORGANISATION_USER
-from security.models import UserCase
+from security.models import OrganisationCaseRole, UserCase
 from test_functional import FunctionalTestBase
 
 new_name = "new name"
@@ -49,3 +51,86 @@ class TestOrganisationViewSet(CaseSetupTestMixin, FunctionalTestBase):
 
         matches = response.json()
         assert len(matches) == 2
+
+    def test_search_by_company_name_in_viewset_queryset(self):
+        filter_parameters = {"name": "Test Organisation 1"}
+        response = self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "test",
+                "filter_parameters": base64.urlsafe_b64encode(
+                    json.dumps(filter_parameters).encode()
+                ).decode(),
+            },
+        )
+
+        matches = response.json()
+        assert [match["name"] for match in matches] == ["Test Organisation 1"]
+
+    def test_search_by_company_name_ranking(self):
+        Organisation.objects.create(name="Another Test Organisation")
+        response = self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "test",
+            },
+        )
+
+        names = [match["name"] for match in response.json()]
+        assert len(names) == 4
+        assert names[-1] == "Another Test Organisation"
+
+    def test_search_by_company_name_companies_house_id(self):
+        Organisation.objects.create(name="Registered", companies_house_id="01234567")
+        response = self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "0123",
+            },
+        )
+
+        matches = response.json()
+        assert len(matches) == 1
+        assert matches[0]["companies_house_id"] == "01234567"
+
+    def test_search_by_company_name_case(self):
+        OrganisationCaseRole.objects.create(
+            organisation=self.organisation,
+            case=self.case_object,
+            role=self.applicant_case_role,
+        )
+        response = self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "test company",
+            },
+        )
+        matches = response.json()
+        assert len(matches) == 1
+        assert matches[0]["case_count"] == 1
+
+        response = self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "test company",
+                "case_id": self.case_object.id,
+            },
+        )
+        assert response.json() == []
+
+    def test_search_by_company_name_cache_invalidated(self):
+        self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "test",
+            },
+        )
+        Organisation.objects.create(name="Test Organisation 3")
+        response = self.client.get(
+            "/api/v2/organisations/search_by_company_name/",
+            data={
+                "company_name": "test",
+            },
+        )
+
+        assert len(response.json()) == 4
@@ -0,0 +1,51 @@
+from tldextract import tldextract
+
+# Characters ignored when comparing reference numbers
+SPECIAL_CHARACTERS = ("!", "%", "-", "_", "*", "?", ":", ";", ",", ".", "/", "|", " ")
+
+
+def normalise_text(value):
+    """
+    Return a case-insensitive, whitespace collapsed key for free text values
+    such as names and addresses.
+    """
+    return " ".join((value or "").lower().split()) or None
+
+
+def normalise_reference(value):
+    """
+    Return a key for a reference number, ignoring case and special characters.
+    e.g. "Rep Reg:12345" -> "REPREG12345"
+    """
+    return "".join(c for c in (value or "") if c not in SPECIAL_CHARACTERS).upper() or None
+
+
+def normalise_digits(value):
+    """
+    Return a key made of the digits of a value only.
+    e.g. "GB12 34 56 78" -> "12345678"
+    """
+    return "".join(c for c in (value or "") if c.isdigit()) or None
+
+
+def normalise_website(value):
+    """
+    Return the domain name of a website, ignoring subdomains and the public suffix.
+    e.g. https://www.hello.english.example.gov.uk/ -> example
+    """
+    if not value:
+        return None
+    return tldextract.extract(value).domain.lower() or None
+
+
+# The normalised key columns of an organisation used to find potential duplicates,
+# mapped to the field they are computed from and their normalisation function
+ORGANISATION_MATCH_KEYS = {
+    "name_key": ("name", normalise_text),
+    "address_key": ("address", normalise_text),
+    "duns_key": ("duns_number", normalise_text),
+    "companies_house_key": ("companies_house_id", normalise_reference),
+    "vat_key": ("vat_number", normalise_digits),
+    "eori_key": ("eori_number", normalise_digits),
+    "website_key": ("organisation_website", normalise_website),
+}
@@ -0,0 +1,114 @@
+"""
+Case access map: the cases a user can access, and what they can do in them.
+
+Authorising a user for a case on behalf of an organisation (CaseSecurityMixin.has_case_access,
+OrganisationCaseRoleManager.can_do_action) depends on the organisation's role in the case,
+the user's security group in the organisation and the user's explicit access to the case.
+Rather than querying those for each check, all the (organisation, case) pairs a user has
+access to are computed in one query, with the role of the organisation in the case and the
+actions it allows, and the map is cached per user.
+
+Saving or deleting an organisation user, user case, organisation case role or case role moves
+to a new cache version (see security.receivers), which invalidates every cached map at once.
+Bulk updates of these models, which send no signals, must call invalidate_case_access.
+"""
+
+import uuid
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from security.constants import SECURITY_GROUP_ORGANISATION_OWNER
+
+CASE_ACCESS_VERSION_CACHE_KEY = "case_access_version"
+CASE_ACCESS_CACHE_KEY = "case_access:{version}:{user_id}"
+CASE_ACCESS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_case_access_version():
+    version = cache.get(CASE_ACCESS_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(CASE_ACCESS_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+def invalidate_case_access(*args, **kwargs):
+    """
+    Invalidate all cached case access maps by moving to a new cache version.
+    Can be connected directly as a signal receiver.
+    """
+
+    def move_to_new_version():
+        cache.set(CASE_ACCESS_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+    move_to_new_version()
+    # again once committed, as a map may have been cached from the state before the change
+    # by another request in the meantime
+    transaction.on_commit(move_to_new_version)
+
+
+def access_key(organisation, case):
+    """
+    Return the key of an organisation and case (instances or ids) in a case access map.
+    """
+    return str(getattr(organisation, "id", organisation)), str(getattr(case, "id", case))
+
+
+def build_case_access_map(user):
+    """
+    Return the case access map of a user, computed in one query: a dict of the
+    (organisation id, case id) pairs (see access_key) the user has access to, to a dict of:
+        role: the id of the role of the organisation in the case
+        actions: the set of ids of the actions allowed by the role
+        member: True if the user is a member of the organisation
+
+    The user has access to a case on behalf of an organisation if the organisation has a
+    role in the case, and the user is either an owner of the organisation or has been given
+    access to the case.
+    """
+    from security.models import CaseRole, OrganisationCaseRole, OrganisationUser, UserCase
+
+    organisation_users = OrganisationUser.objects.filter(
+        user_id=user.id, organisation_id=OuterRef("organisation_id")
+    )
+    case_roles = (
+        OrganisationCaseRole.objects.annotate(
+            owner=Exists(
+                organisation_users.filter(security_group__name=SECURITY_GROUP_ORGANISATION_OWNER)
+            ),
+            user_case=Exists(UserCase.objects.filter(user_id=user.id, case_id=OuterRef("case_id"))),
+        )
+        .filter(Q(owner=True) | Q(user_case=True))
+        .annotate(
+            member=Exists(organisation_users),
+            actions=ArraySubquery(
+                CaseRole.actions.through.objects.filter(caserole_id=OuterRef("role_id")).values(
+                    "caseaction_id"
+                )
+            ),
+        )
+        .values_list("organisation_id", "case_id", "role_id", "actions", "member")
+    )
+    return {
+        access_key(organisation_id, case_id): {
+            "role": role_id,
+            "actions": frozenset(actions),
+            "member": member,
+        }
+        for organisation_id, case_id, role_id, actions, member in case_roles
+    }
+
+
+def get_case_access_map(user):
+    """
+    Return the case access map of a user, cached for CASE_ACCESS_CACHE_TIMEOUT seconds.
+    """
+    cache_key = CASE_ACCESS_CACHE_KEY.format(version=get_case_access_version(), user_id=user.id)
+    access_map = cache.get(cache_key)
+    if access_map is None:
+        access_map = build_case_access_map(user)
+        cache.set(cache_key, access_map, CASE_ACCESS_CACHE_TIMEOUT)
+    return access_map
@@ -0,0 +1,40 @@
+from rest_framework import authentication
+
+from security.principal import attach_principal
+from security.token_cache import CachedToken, get_token_cache
+
+
+class PrincipalAuthenticationMixin:
+    """
+    Attach a security principal (see security.principal) to the authenticated user.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            attach_principal(result[0])
+        return result
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """
+    Token authentication through the token cache (see security.token_cache), attaching a
+    security principal with the cached security groups to the authenticated user.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        cached_token = token_cache.get(key)
+        if cached_token is None:
+            # read before loading the token, so a change committed meanwhile is not cached
+            generation = token_cache.get_generation(key)
+            user, token = super().authenticate_credentials(key)
+            cached_token = CachedToken(token, user, user.groups.values_list("name", flat=True))
+            token_cache.set(key, cached_token, generation)
+        user, token = cached_token.credentials()
+        attach_principal(user, group_names=cached_token.group_names)
+        return user, token
+
+
+class SessionAuthentication(PrincipalAuthenticationMixin, authentication.SessionAuthentication):
+    pass
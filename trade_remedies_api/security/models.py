@@ -12,13 +12,16 @@ shortcuts to determine this access for any given model or to assign it.
 """
 
 from django.db import models
+from django.db.models import Exists, OuterRef, Subquery
 from functools import singledispatch
 from django.contrib.auth.models import Group
 from django.conf import settings
 from django.utils import timezone
 from core.base import SimpleBaseModel
-from organisations.constants import CONTRIBUTOR_ORG_CASE_ROLE
+from organisations.constants import CONTRIBUTOR_ORG_CASE_ROLE, REJECTED_ORG_CASE_ROLE
+from security.access import access_key, get_case_access_map
 from security.constants import ROLE_PREPARING
+from security.principal import group_name
 
 
 @singledispatch
@@ -144,15 +147,9 @@ class OrganisationCaseRoleManager(models.Manager):
             The user has access to the case as part of this organisation
             (i.e. they have been granted access or are admin)
         """
-        org_role = self.filter(
-            organisation=organisation,
-            organisation__organisationuser__user=user,
-            case=case,
-            role__actions=get_action(action),
-        )
-        if org_role and user.has_case_access(case, organisation):
-            return True
-        return False
+        access = user.case_access_map.get(access_key(organisation, case))
+        action_id = getattr(action, "id", action)
+        return bool(access and access["member"] and action_id in access["actions"])
 
     def assign_organisation_case_role(
         self,
@@ -366,6 +363,64 @@ class OrganisationUser(SimpleBaseModel):
         return _dict
 
 
+class UserCaseQuerySet(models.QuerySet):
+    def exclude_rejected(self):
+        """
+        Exclude the user cases where an organisation the user belongs to
+        has been rejected from the case.
+        """
+        return self.exclude(
+            Exists(
+                OrganisationCaseRole.objects.filter(
+                    case=OuterRef("case"),
+                    organisation__organisationuser__user=OuterRef("user"),
+                    role__key=REJECTED_ORG_CASE_ROLE,
+                )
+            )
+        )
+
+    def annotate_organisation_case_role(self):
+        """
+        Annotate each user case with the id of the case role held in the case
+        by the organisation the user represents.
+        """
+        org_case_role = (
+            OrganisationCaseRole.objects.filter(
+                case=OuterRef("case_id"), organisation=OuterRef("organisation_id")
+            )
+            .order_by("id")
+            .values("id")[:1]
+        )
+        return self.annotate(organisation_case_role_id=Subquery(org_case_role))
+
+    def with_organisation_case_roles(self):
+        """
+        Evaluate the user cases, setting on each one the `organisation_case_role` held
+        in the case by the organisation the user represents (or None).
+        Runs two queries regardless of the number of user cases.
+        """
+        user_cases = list(self.annotate_organisation_case_role())
+        org_case_roles = OrganisationCaseRole.objects.select_related(
+            "organisation",
+            "role",
+            "case",
+            "validated_by",
+            "approved_by",
+            "auth_contact",
+        ).in_bulk(
+            {
+                user_case.organisation_case_role_id
+                for user_case in user_cases
+                if user_case.organisation_case_role_id
+            }
+        )
+        for user_case in user_cases:
+            user_case.organisation_case_role = org_case_roles.get(
+                user_case.organisation_case_role_id
+            )
+        return user_cases
+
+
 class UserCase(SimpleBaseModel):
     """
     Case access per user set explicitly. Organisation Administrator users will have implicit access
@@ -395,6 +450,8 @@ class UserCase(SimpleBaseModel):
         related_name="confirmed_by",
     )
 
+    objects = UserCaseQuerySet.as_manager()
+
     class Meta:
         unique_together = ["user", "case", "organisation"]
 
@@ -450,6 +507,9 @@ class UserCase(SimpleBaseModel):
 
 
 class CaseSecurityMixin:
+    # The security principal attached to the user at authentication (see security.principal)
+    security_principal = None
+
     def user_case_role(self, organisation, case):
         """
         Return the role of a user, via their organisation, to a case
@@ -468,21 +528,22 @@ class CaseSecurityMixin:
         """
         return OrganisationUser.objects.user_organisation_security_group(self, organisation)
 
+    @property
+    def case_access_map(self):
+        """
+        The case access map of the user (see security.access)
+        """
+        if self.security_principal:
+            return self.security_principal.case_access_map
+        return get_case_access_map(self)
+
     def has_case_access(self, case, organisation):
         """
         Returns True if the user has access to a given case for an organisation.
         That is True if the user is either an admin of the the organisation which is a participant
         in the case, or the user has explicit access to it.
         """
-        can_access = self.organisation_security_group(organisation) == get_security_group(
-            "Organisation Owner"
-        )
-        participant_organisation = OrganisationCaseRole.objects.has_organisation_case_role(
-            organisation=organisation, case=case
-        )
-        if not can_access:
-            can_access = UserCase.objects.filter(case=case, user=self).exists()
-        return can_access and participant_organisation
+        return access_key(organisation, case) in self.case_access_map
 
     def has_group(self, group):
         """
@@ -490,4 +551,6 @@ class CaseSecurityMixin:
         TRA users can be assigned security groups which allows them broader access
         :param group: The Group instance or name
         """
-        return get_security_group(group) in self.get_groups()
+        if self.security_principal:
+            return self.security_principal.has_group(group)
+        return self.groups.filter(name=group_name(group)).exists()
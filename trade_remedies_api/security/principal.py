@@ -0,0 +1,127 @@
+"""
+The security principal of an authenticated request.
+
+Permission checks made while serving a request (group permissions of views, organisation and
+case access, TRA membership) all need the user's security groups and organisation memberships.
+Rather than each check querying them again, the authentication classes (see
+security.authentication) attach a SecurityPrincipal to the authenticated user, which loads
+them once, in one query each, the first time they are needed.
+"""
+
+import uuid
+from functools import cached_property
+
+from django.contrib.auth.models import Group
+
+from security.constants import SECURITY_GROUPS_TRA, SECURITY_GROUPS_TRA_ADMINS
+
+
+def group_name(group):
+    return group.name if isinstance(group, Group) else group
+
+
+def organisation_key(organisation):
+    """
+    Return the id of an organisation given as an instance, a UUID or a string, or None.
+    """
+    organisation_id = getattr(organisation, "id", organisation)
+    if organisation_id is None or isinstance(organisation_id, uuid.UUID):
+        return organisation_id
+    try:
+        return uuid.UUID(str(organisation_id))
+    except ValueError:
+        return None
+
+
+class SecurityPrincipal:
+    """
+    The security groups and organisation memberships of a user, resolved once.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def __repr__(self):
+        return f"<SecurityPrincipal: {self.user}>"
+
+    @cached_property
+    def group_names(self):
+        """
+        The names of the security groups the user is directly assigned.
+        """
+        return frozenset(self.user.groups.values_list("name", flat=True))
+
+    @cached_property
+    def organisation_security_groups(self):
+        """
+        A dict of the id of each organisation the user is a member of, to the name of the
+        user's security group in it.
+        """
+        from security.models import OrganisationUser
+
+        return dict(
+            OrganisationUser.objects.filter(user_id=self.user.id).values_list(
+                "organisation_id", "security_group__name"
+            )
+        )
+
+    @cached_property
+    def case_access_map(self):
+        """
+        The case access map of the user (see security.access).
+        """
+        from security.access import get_case_access_map
+
+        return get_case_access_map(self.user)
+
+    def has_group(self, group):
+        """
+        Return True if the user is directly assigned the given security group (instance or name).
+        """
+        return group_name(group) in self.group_names
+
+    def has_groups(self, groups):
+        """
+        Return True if the user is directly assigned any of the given security groups.
+        """
+        return any(self.has_group(group) for group in groups)
+
+    def is_tra(self, manager=False, with_role=None):
+        """
+        See User.is_tra
+        """
+        if with_role:
+            with_role = [with_role] if isinstance(with_role, str) else with_role
+            return self.has_groups(with_role)
+        return self.has_groups(SECURITY_GROUPS_TRA_ADMINS if manager else SECURITY_GROUPS_TRA)
+
+    def is_member(self, organisation):
+        """
+        Return True if the user is a member of an organisation (instance or id).
+        """
+        return organisation_key(organisation) in self.organisation_security_groups
+
+    def organisation_security_group(self, organisation):
+        """
+        Return the name of the user's security group in an organisation (instance or id),
+        or None.
+        """
+        return self.organisation_security_groups.get(organisation_key(organisation))
+
+
+def attach_principal(user, group_names=None):
+    """
+    Attach a new security principal to an authenticated user, returning it.
+    The names of the user's security groups can be given if they are already known.
+    """
+    user.security_principal = SecurityPrincipal(user)
+    if group_names is not None:
+        user.security_principal.group_names = frozenset(group_names)
+    return user.security_principal
+
+
+def get_principal(user):
+    """
+    Return the security principal attached to a user, or a new (unattached) one.
+    """
+    return getattr(user, "security_principal", None) or SecurityPrincipal(user)
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from security.access import invalidate_case_access
+from security.models import CaseRole, OrganisationCaseRole, OrganisationUser, UserCase
+from security.token_cache import invalidate_tokens, invalidate_user_tokens
+
+User = get_user_model()
+
+# Changes to memberships, case access or case roles invalidate the cached case access maps
+for access_model in (OrganisationUser, UserCase, OrganisationCaseRole, CaseRole):
+    post_save.connect(invalidate_case_access, sender=access_model)
+    post_delete.connect(invalidate_case_access, sender=access_model)
+m2m_changed.connect(invalidate_case_access, sender=CaseRole.actions.through)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cached_tokens(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalidate the cached tokens of a user when it changes (e.g. password change, deactivation)
+    """
+    if kwargs.get("raw") or update_fields == frozenset(["last_login"]):
+        return
+    invalidate_user_tokens(instance.id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_group_members_cached_tokens(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate the cached tokens of users whose security groups change
+    """
+    if action in ("post_add", "post_remove"):
+        invalidate_user_tokens(*(pk_set if reverse else [instance.pk]))
+    elif action == "pre_clear":
+        user_ids = instance.user_set.values_list("id", flat=True) if reverse else [instance.pk]
+        invalidate_user_tokens(*user_ids)
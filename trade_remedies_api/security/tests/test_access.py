@@ -0,0 +1,64 @@
+from django.core.cache import cache
+
+from config.test_bases import CaseSetupTestMixin
+from security.access import (
+    access_key,
+    build_case_access_map,
+    get_case_access_map,
+    get_case_access_version,
+)
+from security.models import CaseAction, OrganisationCaseRole, UserCase
+
+
+class TestCaseAccessMap(CaseSetupTestMixin):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.view_case = CaseAction.objects.create(id="VIEW_CASE", name="View case")
+        self.applicant_case_role.actions.add(self.view_case)
+        OrganisationCaseRole.objects.create(
+            organisation=self.organisation, case=self.case_object, role=self.applicant_case_role
+        )
+        self.key = access_key(self.organisation, self.case_object)
+
+    def test_owner_has_access(self):
+        self.user.assign_to_organisation(self.organisation, self.owner_group)
+        with self.assertNumQueries(1):
+            access_map = build_case_access_map(self.user)
+        assert access_map == {
+            self.key: {
+                "role": self.applicant_case_role.id,
+                "actions": frozenset(["VIEW_CASE"]),
+                "member": True,
+            }
+        }
+        assert self.user.has_case_access(self.case_object, self.organisation)
+        assert self.user.can_do("VIEW_CASE", self.organisation, self.case_object)
+        assert not self.user.can_do("UPLOAD_DOCUMENT", self.organisation, self.case_object)
+
+    def test_user_needs_case_access(self):
+        self.user.assign_to_organisation(self.organisation, self.user_group)
+        assert not self.user.has_case_access(self.case_object, self.organisation)
+
+        UserCase.objects.create(
+            user=self.user, case=self.case_object, organisation=self.organisation
+        )
+        assert self.user.has_case_access(self.case_object, self.organisation)
+        assert self.user.can_do(self.view_case, self.organisation, self.case_object)
+
+    def test_map_is_cached_and_invalidated(self):
+        self.user.assign_to_organisation(self.organisation, self.owner_group)
+        get_case_access_map(self.user)
+        with self.assertNumQueries(0):
+            assert self.key in get_case_access_map(self.user)
+
+        OrganisationCaseRole.objects.filter(organisation=self.organisation).delete()
+        assert get_case_access_map(self.user) == {}
+
+    def test_map_is_invalidated_on_commit(self):
+        self.user.assign_to_organisation(self.organisation, self.owner_group)
+        with self.captureOnCommitCallbacks(execute=True):
+            OrganisationCaseRole.objects.filter(organisation=self.organisation).delete()
+            # cached by a concurrent request before the change is committed
+            version = get_case_access_version()
+        assert get_case_access_version() != version
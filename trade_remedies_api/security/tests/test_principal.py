@@ -0,0 +1,55 @@
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from config.test_bases import OrganisationSetupTestMixin
+from core.services.base import ResponseSuccess, TradeRemediesApiView
+from security.constants import SECURITY_GROUP_ORGANISATION_OWNER, SECURITY_GROUPS_TRA_ADMINS
+from security.principal import SecurityPrincipal
+
+
+class PrincipalTestView(TradeRemediesApiView):
+    # no groups are allowed for GET, so GET requests validate access to the organisation
+    allowed_groups = {"POST": SECURITY_GROUPS_TRA_ADMINS}
+
+    def get(self, request, *args, **kwargs):
+        return ResponseSuccess(
+            {
+                "tra": request.user.is_tra(),
+                "owner": request.user.has_group(SECURITY_GROUP_ORGANISATION_OWNER),
+            }
+        )
+
+
+class TestSecurityPrincipal(OrganisationSetupTestMixin):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user.assign_to_organisation(self.organisation, self.owner_group)
+
+    def test_groups_are_resolved_once(self):
+        principal = SecurityPrincipal(self.user)
+        with self.assertNumQueries(1):
+            assert principal.has_group(self.owner_group)
+            assert principal.has_groups(["Nope", SECURITY_GROUP_ORGANISATION_OWNER])
+            assert not principal.is_tra()
+            assert not principal.is_tra(manager=True)
+
+    def test_organisation_memberships_are_resolved_once(self):
+        principal = SecurityPrincipal(self.user)
+        with self.assertNumQueries(1):
+            assert principal.is_member(self.organisation)
+            assert principal.is_member(str(self.organisation.id))
+            assert not principal.is_member("not-an-id")
+            assert (
+                principal.organisation_security_group(self.organisation.id)
+                == SECURITY_GROUP_ORGANISATION_OWNER
+            )
+
+    def test_authenticated_request_query_count(self):
+        token, _ = Token.objects.get_or_create(user=self.user)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {token.key}")
+        # the token and user, the organisation, then the groups and memberships of the user
+        with self.assertNumQueries(4):
+            response = PrincipalTestView.as_view()(request, organisation_id=self.organisation.id)
+        assert response.status_code == 200
+        assert response.data["response"]["owner"] is True
+        assert response.data["response"]["tra"] is False
@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from config.test_bases import UserSetupTestBase
+from security.authentication import TokenAuthentication
+from security.constants import SECURITY_GROUP_ORGANISATION_OWNER
+from security.token_cache import CachedToken, TokenCache, get_token_cache
+
+
+class TestTokenAuthentication(UserSetupTestBase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.token, _ = Token.objects.get_or_create(user=self.user)
+
+    def authenticate(self):
+        return TokenAuthentication().authenticate_credentials(self.token.key)
+
+    def test_authentication_is_cached(self):
+        user, token = self.authenticate()
+        assert user == self.user
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+            assert user.security_principal.has_group(SECURITY_GROUP_ORGANISATION_OWNER)
+        assert token.user is user
+        # each request gets its own copy of the user
+        assert user is not self.authenticate()[0]
+
+    def test_password_is_not_cached(self):
+        self.authenticate()
+        cached_token = get_token_cache().get(self.token.key)
+        assert self.user.password not in cached_token.user_values
+        user, _ = cached_token.credentials()
+        assert "password" in user.get_deferred_fields()
+        assert user.email == self.user.email
+
+    def test_cache_invalidated_on_commit(self):
+        token_cache = get_token_cache()
+        # a concurrent request loads the state before the change is committed...
+        generation = token_cache.get_generation(self.token.key)
+        cached_token = CachedToken(self.token, self.user, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        # ...and only gets to cache it after the change has been invalidated
+        token_cache.set(self.token.key, cached_token, generation)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cache_invalidated_on_user_change(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_cache_invalidated_on_group_change(self):
+        self.authenticate()
+        self.user.groups.remove(self.owner_group)
+        user, _ = self.authenticate()
+        assert not user.security_principal.has_group(SECURITY_GROUP_ORGANISATION_OWNER)
+
+    def test_cache_invalidated_on_token_delete(self):
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_stats(self):
+        token_cache = get_token_cache()
+        before = token_cache.stats()
+        self.authenticate()
+        self.authenticate()
+        stats = token_cache.stats()
+        assert stats["misses"] == before["misses"] + 1
+        assert stats["local_hits"] == before["local_hits"] + 1
+
+
+class TestTokenCache(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 0
+        self.token_cache = TokenCache(max_size=2, local_timeout=10, clock=lambda: self.now)
+
+    def store(self, key):
+        self.token_cache.set(key, key, self.token_cache.get_generation(key))
+
+    def test_local_tier_is_lru(self):
+        for key in ("a", "b"):
+            self.store(key)
+        self.token_cache.get("a")
+        self.store("c")
+        assert list(self.token_cache.local) == ["a", "c"]
+        # evicted entries are still in the shared tier
+        assert self.token_cache.get("b") == "b"
+        assert self.token_cache.stats()["hits"] == 1
+
+    def test_local_entries_expire(self):
+        self.store("a")
+        self.now = 11
+        assert self.token_cache.get("a") == "a"
+        stats = self.token_cache.stats()
+        assert stats["local_hits"] == 0
+        assert stats["hits"] == 1
+        assert stats["hit_ratio"] == 1
+
+    def test_invalidate(self):
+        self.store("a")
+        self.token_cache.invalidate("a")
+        assert self.token_cache.get("a") is None
+        assert self.token_cache.stats()["misses"] == 1
+
+    def test_stale_generation_is_not_cached(self):
+        generation = self.token_cache.get_generation("a")
+        self.token_cache.invalidate("a")
+        self.token_cache.set("a", "a", generation)
+        assert self.token_cache.get("a") is None
+        assert self.token_cache.local == {}
@@ -0,0 +1,229 @@
+"""
+Cache of authenticated API tokens.
+
+The frontends make many API calls per page, each authenticated with the user's token, so the
+user and security groups of a token are cached rather than loaded for every call: in a small
+in-process LRU cache first, then in the shared cache. Entries are invalidated when the token
+is deleted, or the user is saved (password change, deactivation...) or changes groups (see
+security.receivers), and again once the change is committed. The in-process tier of other
+processes cannot be reached, so its entries are only kept for a few seconds
+(AUTH_TOKEN_LOCAL_CACHE_TIMEOUT), which bounds their staleness.
+
+Entries of the shared tier are stored with the generation of their token, read before the
+token and user are loaded from the database, and invalidating a token moves it to a new
+generation: an entry loaded before a change, but stored after its invalidation, is stored
+under the old generation and never served.
+
+Only the fields of the user listed in CACHED_USER_FIELDS are cached (not its password or login
+codes): the other fields of the users rebuilt from the cache are deferred, and loaded from the
+database if used.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+AUTH_TOKEN_CACHE_KEY = "auth_token:{digest}"
+AUTH_TOKEN_GENERATION_CACHE_KEY = "auth_token_generation:{digest}"
+
+CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "name",
+    "first_name",
+    "last_name",
+    "is_staff",
+    "is_active",
+    "is_superuser",
+    "created_at",
+    "last_modified",
+    "deleted_at",
+    "last_login",
+    "auto_assign",
+)
+CACHED_TOKEN_FIELDS = ("key", "user_id", "created")
+
+
+class CachedToken:
+    """
+    An authenticated token, the cached fields of its user and the names of the user's
+    security groups.
+    """
+
+    def __init__(self, token, user, group_names):
+        self.db = token._state.db
+        self.token_values = tuple(getattr(token, field) for field in CACHED_TOKEN_FIELDS)
+        self.user_values = tuple(getattr(user, field) for field in CACHED_USER_FIELDS)
+        self.group_names = frozenset(group_names)
+
+    def credentials(self):
+        """
+        Return the user and token rebuilt from the cached fields, for use by a single request.
+        """
+        from django.contrib.auth import get_user_model
+        from rest_framework.authtoken.models import Token
+
+        user = get_user_model().from_db(self.db, CACHED_USER_FIELDS, self.user_values)
+        token = Token.from_db(self.db, CACHED_TOKEN_FIELDS, self.token_values)
+        token.user = user
+        return user, token
+
+
+class TokenCache:
+    """
+    A two tier (in-process LRU, then shared) cache of CachedTokens, keyed by token key.
+    Hit ratios are logged every `report_every` lookups, and returned by `stats`.
+    """
+
+    def __init__(
+        self,
+        max_size=1024,
+        local_timeout=10,
+        timeout=300,
+        report_every=1000,
+        clock=time.monotonic,
+    ):
+        self.max_size = max_size
+        self.local_timeout = local_timeout
+        self.timeout = timeout
+        self.report_every = report_every
+        self.clock = clock
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.local_hits = self.hits = self.misses = 0
+
+    @staticmethod
+    def cache_key(key):
+        return AUTH_TOKEN_CACHE_KEY.format(digest=hashlib.sha256(key.encode("utf8")).hexdigest())
+
+    @staticmethod
+    def generation_key(key):
+        return AUTH_TOKEN_GENERATION_CACHE_KEY.format(
+            digest=hashlib.sha256(key.encode("utf8")).hexdigest()
+        )
+
+    def get_generation(self, key):
+        """
+        Return the current generation of a token key, to be read before loading the token
+        from the database and passed to `set`.
+        """
+        generation_key = self.generation_key(key)
+        generation = cache.get(generation_key)
+        if generation is None:
+            cache.add(generation_key, uuid.uuid4().hex, None)
+            generation = cache.get(generation_key)
+        return generation
+
+    def get(self, key):
+        """
+        Return the CachedToken of a token key, or None.
+        """
+        with self.lock:
+            entry = self.local.get(key)
+            if entry and entry[0] > self.clock():
+                self.local.move_to_end(key)
+                self.record("local_hits")
+                return entry[1]
+            self.local.pop(key, None)
+        values = cache.get_many([self.cache_key(key), self.generation_key(key)])
+        generation, cached_token = values.get(self.cache_key(key)) or (None, None)
+        with self.lock:
+            if cached_token is None or generation != values.get(self.generation_key(key)):
+                self.record("misses")
+                return None
+            self.set_local(key, cached_token)
+            self.record("hits")
+        return cached_token
+
+    def set(self, key, cached_token, generation):
+        """
+        Cache the CachedToken of a token key, loaded at the given generation (see
+        `get_generation`), unless the token has been invalidated since.
+        """
+        if cache.get(self.generation_key(key)) != generation:
+            return
+        cache.set(self.cache_key(key), (generation, cached_token), self.timeout)
+        with self.lock:
+            self.set_local(key, cached_token)
+
+    def set_local(self, key, cached_token):
+        self.local[key] = (self.clock() + self.local_timeout, cached_token)
+        self.local.move_to_end(key)
+        while len(self.local) > self.max_size:
+            self.local.popitem(last=False)
+
+    def invalidate(self, *keys):
+        if not keys:
+            return
+        cache.set_many({self.generation_key(key): uuid.uuid4().hex for key in keys}, None)
+        cache.delete_many([self.cache_key(key) for key in keys])
+        with self.lock:
+            for key in keys:
+                self.local.pop(key, None)
+
+    def record(self, outcome):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        lookups = self.local_hits + self.hits + self.misses
+        if self.report_every and lookups % self.report_every == 0:
+            logger.info(f"Token cache stats: {self.stats()}")
+
+    def stats(self):
+        """
+        Return the number of lookups, hits per tier and misses, and the hit ratios.
+        """
+        lookups = self.local_hits + self.hits + self.misses
+        return {
+            "lookups": lookups,
+            "local_hits": self.local_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "local_hit_ratio": self.local_hits / lookups if lookups else 0,
+            "hit_ratio": (self.local_hits + self.hits) / lookups if lookups else 0,
+        }
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    """
+    Return the token cache of the current process.
+    """
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(
+            max_size=settings.AUTH_TOKEN_LOCAL_CACHE_SIZE,
+            local_timeout=settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT,
+            timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT,
+        )
+    return _token_cache
+
+
+def invalidate_user_tokens(*user_ids):
+    """
+    Invalidate the cached tokens of the given users, now and once committed (the tokens may
+    have been cached again from the state before the change by another request in the meantime).
+    """
+    from rest_framework.authtoken.models import Token
+
+    if user_ids:
+        keys = list(Token.objects.filter(user_id__in=user_ids).values_list("key", flat=True))
+        invalidate_tokens(*keys)
+
+
+def invalidate_tokens(*keys):
+    """
+    Invalidate cached tokens by key, now and once committed.
+    """
+    if keys:
+        get_token_cache().invalidate(*keys)
+        transaction.on_commit(lambda: get_token_cache().invalidate(*keys))
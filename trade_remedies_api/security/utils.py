@@ -1,6 +1,6 @@
 import logging
 
-from security.models import OrganisationUser
+from security.principal import get_principal
 from organisations.models import get_organisation
 from cases.models import get_case
 from django.contrib.auth.models import Group, Permission
@@ -16,11 +16,10 @@ def validate_user_organisation(user, organisation):
     or is a case worker.
     TODO: At the moment TRA side is fairly open. Consider this.
     """
-    if user.is_tra():
+    principal = get_principal(user)
+    if principal.is_tra():
         return True
-    organisation = get_organisation(organisation)
-    org_user = OrganisationUser.objects.filter(organisation=organisation, user=user).exists()
-    return org_user
+    return principal.is_member(organisation)
 
 
 def validate_user_case(user, case, organisation):
@@ -28,7 +27,7 @@ def validate_user_case(user, case, organisation):
     Validate the user has access to this case and organisation
     Fairly simplistic at the moment
     """
-    if user.is_tra():
+    if get_principal(user).is_tra():
         return True
     case = get_case(case)
     organisation = get_organisation(organisation)